@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Sweep-line geometry for sets of axis-aligned AOI rectangles.
+
+Rectangles are (x0, y0, x1, y1) tuples. A vertical line sweeps the
+rectangles' left and right edges in x order while a segment tree over the
+distinct y coordinates tracks, for the rectangles currently crossing the
+line, the covered length and the sum of squared coverage counts. Integrating
+both along x gives, in O(n log n):
+
+- the union area (covered by at least one rectangle)
+- the summed pairwise intersection area, from the integral of C(C-1)/2
+  where C is the number of rectangles covering a point
+
+The number of overlapping pairs comes from a second sweep that, as each
+rectangle enters, counts the active rectangles whose y interval meets its
+own with two Fenwick trees. Rectangles that only touch along an edge do not
+overlap, and degenerate (zero-area) rectangles are ignored.
+
+Only the standard library is used, so the scorer can call it without
+importing numpy.
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Rect = Tuple[float, float, float, float]
+
+
+def _proper(rects: Sequence[Rect]) -> List[Rect]:
+    return [r for r in rects if r[2] > r[0] and r[3] > r[1]]
+
+
+def sweep_areas(rects: Sequence[Rect]) -> Tuple[float, float]:
+    """(union area, summed pairwise intersection area) of the rectangles."""
+    rects = _proper(rects)
+    if not rects:
+        return 0.0, 0.0
+    ys = sorted({y for r in rects for y in (r[1], r[3])})
+    m = len(ys) - 1
+    size = 4 * m
+    count = [0] * size
+    covered = [0.0] * size
+    s1 = [0.0] * size  # sum of length * count over the node's span
+    s2 = [0.0] * size  # sum of length * count**2
+
+    def update(node, lo, hi, l, r, d):
+        if l <= lo and hi <= r:
+            count[node] += d
+        else:
+            mid = (lo + hi) // 2
+            if l < mid:
+                update(2 * node, lo, mid, l, r, d)
+            if r > mid:
+                update(2 * node + 1, mid, hi, l, r, d)
+        # Counts are never pushed down: a node's own count applies on top of
+        # its children's aggregates
+        a = count[node]
+        length = ys[hi] - ys[lo]
+        if hi - lo == 1:
+            c1 = c2 = cv = 0.0
+        else:
+            left, right = 2 * node, 2 * node + 1
+            c1, c2, cv = s1[left] + s1[right], s2[left] + s2[right], covered[left] + covered[right]
+        covered[node] = length if a > 0 else cv
+        s1[node] = c1 + a * length
+        s2[node] = c2 + 2 * a * c1 + a * a * length
+
+    events = []
+    for x0, y0, x1, y1 in rects:
+        lo, hi = bisect_left(ys, y0), bisect_left(ys, y1)
+        events.append((x0, 1, lo, hi))
+        events.append((x1, -1, lo, hi))
+    events.sort()
+
+    union = squares = 0.0
+    previous = events[0][0]
+    for x, d, lo, hi in events:
+        if x != previous:
+            union += covered[1] * (x - previous)
+            squares += s2[1] * (x - previous)
+            previous = x
+        update(1, 0, m, lo, hi, d)
+
+    total = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects)
+    # sum C^2 = sum C + 2 * sum over pairs, and sum C integrates to the total area
+    return union, max((squares - total) / 2, 0.0)
+
+
+def overlapping_pairs(rects: Sequence[Rect]) -> int:
+    """Number of rectangle pairs whose intersection has positive area."""
+    rects = _proper(rects)
+    if not rects:
+        return 0
+    ys = sorted({y for r in rects for y in (r[1], r[3])})
+    n = len(ys)
+    starts = [0] * (n + 1)  # Fenwick trees over y ranks of active y0 / y1
+    ends = [0] * (n + 1)
+
+    def add(tree, i, d):
+        i += 1
+        while i <= n:
+            tree[i] += d
+            i += i & -i
+
+    def prefix(tree, i):
+        """Active entries with rank < i."""
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    events = []
+    for x0, y0, x1, y1 in rects:
+        lo, hi = bisect_left(ys, y0), bisect_left(ys, y1)
+        # At equal x, leaving (0) sorts before entering (1): touching edges do not overlap
+        events.append((x0, 1, lo, hi))
+        events.append((x1, 0, lo, hi))
+    events.sort()
+
+    active = pairs = 0
+    for _x, entering, lo, hi in events:
+        if not entering:
+            add(starts, lo, -1)
+            add(ends, hi, -1)
+            active -= 1
+            continue
+        below = prefix(ends, lo + 1)              # active y1 <= y0
+        above = active - prefix(starts, hi)       # active y0 >= y1
+        pairs += active - below - above
+        add(starts, lo, 1)
+        add(ends, hi, 1)
+        active += 1
+    return pairs
+
+
+def union_area(rects: Sequence[Rect]) -> float:
+    """Area covered by at least one rectangle."""
+    return sweep_areas(rects)[0]
+
+
+def pairwise_overlaps(rects: Sequence[Rect]) -> Tuple[int, float]:
+    """Number of overlapping pairs and their summed intersection area."""
+    return overlapping_pairs(rects), sweep_areas(rects)[1]
+
+
+def clip(rects: Sequence[Rect], width: float, height: float) -> List[Rect]:
+    """Rectangles cut to the image area; those entirely outside it are dropped."""
+    clipped = [(max(x0, 0), max(y0, 0), min(x1, width), min(y1, height)) for x0, y0, x1, y1 in rects]
+    return _proper(clipped)
+
+
+def analyze_rects(rects: Sequence[Rect], width: Optional[float] = None,
+                  height: Optional[float] = None) -> Dict:
+    """Overlap and coverage summary of one stimulus' AOIs.
+
+    Coverage is the share of the image (when its size is known) covered by
+    the union of the AOIs, after clipping them to the image.
+    """
+    union, overlap = sweep_areas(rects)
+    coverage = None
+    if width and height:
+        coverage = round(sweep_areas(clip(rects, width, height))[0] / (width * height), 6)
+    return {"overlapping_pairs": overlapping_pairs(rects), "overlap_area": overlap,
+            "union_area": union, "coverage": coverage}
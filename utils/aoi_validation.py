@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Content-aware validation of AOI definitions against the stimulus images.
+
+Every AOI rectangle in aois/aois_definition.json must reference a known
+stimulus and lie within that stimulus image. Per stimulus the report also
+gives the overlapping AOI pairs, the total pairwise overlap area and the
+share of the image covered by the union of its AOIs (sweep-line geometry
+from aoi_geometry.py). With --write the totals are stored in the
+definition's validation block, including coverage_completeness.
+
+Image sizes are read from the JPEG/PNG headers only; pixels are never
+decoded. Sizes are cached by content hash, and the (mtime, size) stamp of
+each image maps to its hash, so an unchanged image is neither re-hashed nor
+re-parsed and identical images under different names are parsed once.
+"""
+
+import io
+import os
+import json
+import struct
+import tarfile
+import tempfile
+import zipfile
+from typing import Dict, List, Optional, Tuple
+
+from aoi_geometry import Rect, analyze_rects
+from study_snapshot import HEAD_CAPTURE_BYTES, ArchiveSnapshot, StudySnapshot, open_study, study_scope
+
+AOIS_PATH = "aois/aois_definition.json"
+STIMULI_METADATA_PATH = "stimuli/stimuli_metadata.json"
+STIMULI_RAW_DIR = "stimuli/stimuli_raw"
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+IMAGE_SIZE_CACHE_PATH = os.path.join("outputs", "image_sizes.json")
+REPORT_PATH = os.path.join("outputs", "aoi_validation.json")
+# Failures to read a study's AOI inputs (files, JSON, archive members); any
+# other exception is a bug and propagates
+READ_ERRORS = (OSError, ValueError, KeyError, EOFError, tarfile.TarError, zipfile.BadZipFile)
+CACHE_VERSION = 1
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Start-of-frame markers carry the frame size; C4, C8 and CC are not frames
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+JPEG_STANDALONE_MARKERS = set(range(0xD0, 0xD9)) | {0x01}
+
+# -------------------- Image headers --------------------
+
+def _jpeg_size(f) -> Optional[Tuple[int, int]]:
+    while True:
+        byte = f.read(1)
+        while byte and byte != b"\xff":
+            byte = f.read(1)
+        while byte == b"\xff":  # fill bytes
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker in (0xD9, 0xDA):  # end of image or scan data before any frame header
+            return None
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+        if length < 2:  # corrupt segment length
+            return None
+        if marker in JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            _precision, height, width = struct.unpack(">BHH", frame)
+            return width, height
+        f.read(length - 2)
+
+
+def image_size(f) -> Optional[Tuple[int, int]]:
+    """(width, height) from a PNG or JPEG header, None for anything else."""
+    head = f.read(2)
+    if head == b"\xff\xd8":
+        return _jpeg_size(f)
+    head += f.read(6)
+    if head == PNG_SIGNATURE:
+        ihdr = f.read(16)
+        if len(ihdr) < 16 or ihdr[4:8] != b"IHDR":
+            return None
+        return struct.unpack(">II", ihdr[8:16])
+    return None
+
+
+class ImageSizeCache:
+    """Image sizes keyed by content hash, with file stamps mapping to hashes.
+
+    Archive members have no stamps and are parsed directly; headers are a
+    few kilobytes at most.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.files: Dict[str, Dict] = {}
+        self.sizes: Dict[str, List[int]] = {}
+        self.parsed = 0
+        if path:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    self.files, self.sizes = data["files"], data["sizes"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def _parse(self, study: StudySnapshot, relpath: str) -> Optional[Tuple[int, int]]:
+        self.parsed += 1
+        try:
+            # Archives serve image heads from their single streaming pass
+            head = study.read_head(relpath)
+            size = image_size(io.BytesIO(head))
+            if size is None and len(head) == HEAD_CAPTURE_BYTES:
+                # Frame header behind metadata segments longer than the head
+                with study.open(relpath, "rb") as f:
+                    size = image_size(f)
+            return size
+        except (OSError, struct.error):
+            return None
+
+    def size_of(self, study: StudySnapshot, relpath: str) -> Optional[Tuple[int, int]]:
+        if isinstance(study, ArchiveSnapshot):
+            return self._parse(study, relpath)
+        path = os.path.abspath(os.path.join(study.root, relpath))
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        stamp = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        entry = self.files.get(path)
+        if entry and all(entry.get(k) == v for k, v in stamp.items()):
+            digest = entry["sha256"]
+        else:
+            from preprocessing_checkpoints import hash_file
+            digest = hash_file(path)
+            self.files[path] = dict(stamp, sha256=digest)
+        if digest not in self.sizes:
+            size = self._parse(study, relpath)
+            if size is None:
+                return None
+            self.sizes[digest] = list(size)
+        width, height = self.sizes[digest]
+        return width, height
+
+    def save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".image_sizes-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "files": self.files, "sizes": self.sizes}, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+# Shared by scoring runs in this process
+_memory_cache = ImageSizeCache()
+
+# -------------------- Validation --------------------
+
+def stimulus_images(study: StudySnapshot) -> Dict[str, Optional[str]]:
+    """Stimulus id -> image path relative to the study (None if the file is missing).
+
+    Ids come from stimuli_metadata.json; images in stimuli_raw not listed
+    there resolve by file name stem. Raises (see READ_ERRORS) when the
+    metadata exists but cannot be read.
+    """
+    images: Dict[str, Optional[str]] = {}
+    raw = study.listdir(STIMULI_RAW_DIR) if study.isdir(STIMULI_RAW_DIR) else []
+    for name in raw:
+        stem, ext = os.path.splitext(name)
+        if ext.lower() in IMAGE_EXTENSIONS:
+            images[stem] = f"{STIMULI_RAW_DIR}/{name}"
+    try:
+        metadata = study.load_json(STIMULI_METADATA_PATH)
+    except FileNotFoundError:
+        metadata = {}
+    if not isinstance(metadata, dict):
+        raise ValueError(f"{STIMULI_METADATA_PATH} is not a JSON object")
+    stimuli = metadata.get("stimuli", [])
+    for stimulus in stimuli if isinstance(stimuli, list) else []:
+        if not isinstance(stimulus, dict) or "stimulus_id" not in stimulus:
+            continue
+        file_name = stimulus.get("file_name")
+        relpath = f"{STIMULI_RAW_DIR}/{file_name}" if file_name else None
+        images[str(stimulus["stimulus_id"])] = relpath if relpath and study.isfile(relpath) else None
+    return images
+
+
+def _rect(aoi) -> Optional[Rect]:
+    try:
+        c = aoi["coordinates"]
+        x, y, w, h = (float(c[k]) for k in ("x", "y", "width", "height"))
+    except (KeyError, TypeError, ValueError):
+        return None
+    return x, y, x + w, y + h
+
+
+def validate_aois(root=".", cache: Optional[ImageSizeCache] = None) -> Optional[Dict]:
+    """AOI validation report, or None when the study defines no AOI list.
+
+    Raises like StudySnapshot.load_json when the definition is missing or
+    not valid JSON, and ValueError when it is not a JSON object.
+    """
+    with study_scope(root) as study:
+        cache = cache or _memory_cache
+        data = study.load_json(AOIS_PATH)
+        if not isinstance(data, dict):
+            raise ValueError(f"{AOIS_PATH} is not a JSON object")
+        aois = data.get("aois")
+        if not isinstance(aois, list) or not aois:
+            return None
+
+        images = stimulus_images(study)
+        by_stimulus: Dict[str, List[Tuple[str, Rect]]] = {}
+        unresolved, malformed = [], []
+        for i, aoi in enumerate(aois):
+            aoi_id = str(aoi.get("aoi_id", f"#{i}")) if isinstance(aoi, dict) else f"#{i}"
+            rect = _rect(aoi) if isinstance(aoi, dict) else None
+            if rect is None:
+                malformed.append(aoi_id)
+                continue
+            stimulus_id = str(aoi.get("stimulus_id", ""))
+            if stimulus_id not in images:
+                unresolved.append(aoi_id)
+                continue
+            by_stimulus.setdefault(stimulus_id, []).append((aoi_id, rect))
+
+        stimuli, out_of_bounds = {}, []
+        for stimulus_id, entries in sorted(by_stimulus.items()):
+            image = images[stimulus_id]
+            size = cache.size_of(study, image) if image else None
+            rects = [rect for _, rect in entries]
+            width, height = size if size else (None, None)
+            report = {"image": image, "width": width, "height": height, "aoi_count": len(entries),
+                      "out_of_bounds": []}
+            report.update(analyze_rects(rects, width, height))
+            if size:
+                report["out_of_bounds"] = [aoi_id for aoi_id, (x0, y0, x1, y1) in entries
+                                           if x0 < 0 or y0 < 0 or x1 > width or y1 > height]
+            out_of_bounds += report["out_of_bounds"]
+            stimuli[stimulus_id] = report
+
+        # AOIs on a stimulus without an image (studies need not ship screenshots)
+        # cannot be checked against its bounds but are not at fault; those on an
+        # image whose header cannot be read do not count as valid
+        unchecked = [aoi_id for stimulus_id, entries in sorted(by_stimulus.items())
+                     if stimuli[stimulus_id]["image"] is None for aoi_id, _ in entries]
+        unreadable = [aoi_id for stimulus_id, entries in sorted(by_stimulus.items())
+                      if stimuli[stimulus_id]["image"] and stimuli[stimulus_id]["width"] is None
+                      for aoi_id, _ in entries]
+        invalid = len(unresolved) + len(malformed) + len(out_of_bounds) + len(unreadable)
+        return {
+            "aoi_count": len(aois),
+            "valid_fraction": (len(aois) - invalid) / len(aois),
+            "unresolved": unresolved,
+            "malformed": malformed,
+            "out_of_bounds": out_of_bounds,
+            "unreadable": unreadable,
+            "unchecked": unchecked,
+            "unchecked_stimuli": sorted(s for s, r in stimuli.items() if r["width"] is None),
+            "stimuli": stimuli,
+        }
+
+
+def validation_block(report: Dict) -> Dict:
+    """Totals for the definition's validation block.
+
+    coverage_completeness is the share of all sized stimulus images covered
+    by AOIs, weighting each stimulus by its image area.
+    """
+    sized = [r for r in report["stimuli"].values() if r["coverage"] is not None]
+    image_area = sum(r["width"] * r["height"] for r in sized)
+    covered = sum(r["coverage"] * r["width"] * r["height"] for r in sized)
+    return {
+        "coverage_completeness": round(covered / image_area, 6) if image_area else 0.0,
+        "overlapping_pairs": sum(r["overlapping_pairs"] for r in report["stimuli"].values()),
+        "overlap_area": sum(r["overlap_area"] for r in report["stimuli"].values()),
+        "aois_out_of_bounds": len(report["out_of_bounds"]),
+        "unresolved_aois": len(report["unresolved"]),
+        "stimuli": {stimulus_id: {key: r[key] for key in ("aoi_count", "overlapping_pairs", "overlap_area", "coverage")}
+                    for stimulus_id, r in report["stimuli"].items()},
+    }
+
+
+def update_aois_definition(report: Dict, path: str = AOIS_PATH):
+    """Merge the computed totals into the validation block, keeping hand-filled keys."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    data["validation"] = dict(data.get("validation") or {}, **validation_block(report))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def aoi_content_factor(study: StudySnapshot) -> float:
+    """Share of AOIs that resolve to a stimulus and lie within its image.
+
+    1.0 when there is nothing to verify, 0.0 when the AOIs cannot be
+    validated; reasons for deductions are noted on the snapshot. AOIs on
+    stimuli without an image cannot be checked and are not deducted.
+    """
+    try:
+        report = validate_aois(study)
+    except READ_ERRORS as e:
+        study.note(f"{AOIS_PATH}: AOIs could not be validated ({type(e).__name__}: {e})")
+        return 0.0
+    if report is None:
+        return 1.0
+    for key, reason in (("unresolved", "reference unknown stimuli"), ("malformed", "lack x/y/width/height"),
+                        ("out_of_bounds", "lie outside their stimulus image"),
+                        ("unreadable", "have an unreadable stimulus image")):
+        if report[key]:
+            study.note(f"{AOIS_PATH}: {len(report[key])} AOI(s) {reason}")
+    return report["valid_fraction"]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate AOI rectangles against stimulus image bounds")
+    parser.add_argument("root", nargs="?", default=".", help="Study directory or archive")
+    parser.add_argument("--output", default=REPORT_PATH)
+    parser.add_argument("--cache", default=IMAGE_SIZE_CACHE_PATH, help="Persistent image size cache")
+    parser.add_argument("--write", action="store_true",
+                        help="Store overlap and coverage totals in the definition's validation block")
+    args = parser.parse_args()
+
+    cache = ImageSizeCache(args.cache)
+    with open_study(args.root) as study:
+        report = validate_aois(study, cache)
+    cache.save()
+    if report is None:
+        print(f"ℹ️ No AOIs defined in {AOIS_PATH}")
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"🎯 {report['aoi_count']} AOI(s), {report['valid_fraction']*100:.1f}% valid: {args.output}")
+    for key in ("unresolved", "malformed", "out_of_bounds", "unreadable"):
+        if report[key]:
+            print(f"❌ {key}: {', '.join(report[key][:10])}{' ...' if len(report[key]) > 10 else ''}")
+    if report["unchecked"]:
+        print(f"ℹ️ {len(report['unchecked'])} AOI(s) on stimuli without an image were not checked against bounds")
+    print(f"🖼️ {cache.parsed} image header(s) parsed")
+    if args.write:
+        if not os.path.isdir(args.root):
+            print("⚠️ --write needs a study directory, not an archive")
+            return
+        update_aois_definition(report, os.path.join(args.root, AOIS_PATH))
+        block = validation_block(report)
+        print(f"📝 validation.coverage_completeness = {block['coverage_completeness']:.4f}, "
+              f"{block['overlapping_pairs']} overlapping pair(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Batch scoring of many REPL.et study directories and archives.
+
+Discovers study roots under a directory tree, scores them in-process across
+a process pool (repl_et_score.score_study) and streams one record per study
+to a JSONL or CSV summary as results arrive, so a partial summary is usable
+while a large registry is still being scored. Radar charts are not drawn
+while scoring; they are rendered afterwards, from the summary, only when
+requested.
+"""
+
+import os
+import csv
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional
+
+from repl_et_score import CHECKS, score_study
+from study_snapshot import COMPONENT_DIRS, is_archive
+
+STUDY_MARKER = "metadata.json"
+# Directories without metadata.json still count as studies with this many components
+MIN_COMPONENT_DIRS = 3
+SKIP_DIRS = {"node_modules", "__pycache__", "outputs", "venv", "site-packages"}
+
+SUMMARY_FIELDS = ["study_root", "overall"] + list(CHECKS) + ["elapsed_s", "error"]
+
+# -------------------- Discovery --------------------
+
+def is_study_root(names) -> bool:
+    names = set(names)
+    return STUDY_MARKER in names or len(names & COMPONENT_DIRS) >= MIN_COMPONENT_DIRS
+
+
+def discover_study_roots(tree: str) -> Iterator[str]:
+    """Yield study roots under ``tree`` in sorted walk order.
+
+    Study directories and study archives (.zip, .tar, ...) are both roots;
+    a directory's archives follow it. Hidden directories and SKIP_DIRS are
+    pruned, and so are the component and data directories of a study,
+    which hold study files rather than nested studies.
+    """
+    for dirpath, dirnames, filenames in os.walk(tree):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS)
+        if is_study_root(dirnames + filenames):
+            yield os.path.normpath(dirpath)
+            dirnames[:] = [d for d in dirnames if d not in COMPONENT_DIRS and d != "data"]
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            if not name.startswith(".") and is_archive(path):
+                yield os.path.normpath(path)
+
+# -------------------- Scoring --------------------
+
+def score_record(root: str) -> Dict:
+    """Summary record for one study; failures are reported, not raised."""
+    start = time.perf_counter()
+    record: Dict = {"study_root": root}
+    try:
+        scores = score_study(root)
+        record["overall"] = sum(scores.values()) / len(scores)
+        record.update(scores)
+        record["error"] = ""
+    except Exception as e:
+        record["overall"] = None
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["elapsed_s"] = round(time.perf_counter() - start, 4)
+    return record
+
+
+class SummaryWriter:
+    """Append records to a JSONL or CSV summary, flushing after each one."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.format = "csv" if path.endswith(".csv") else "jsonl"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._csv = None
+        if self.format == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+            self._csv.writeheader()
+
+    def write(self, record: Dict):
+        if self._csv is not None:
+            self._csv.writerow(record)
+        else:
+            self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def score_tree(tree: str, summary_path: str, workers: Optional[int] = None,
+               chunksize: int = 8) -> List[Dict]:
+    """Score every study under ``tree``, streaming records to ``summary_path``.
+
+    Records are written in completion order; the returned list is sorted by
+    study root.
+    """
+    roots = list(discover_study_roots(tree))
+    records = []
+    with SummaryWriter(summary_path) as writer:
+        def emit(batch):
+            for record in batch:
+                writer.write(record)
+                records.append(record)
+
+        if workers == 1 or len(roots) <= 1:
+            emit(map(score_record, roots))
+        else:
+            # Batches of roots per task keep process round-trips off the hot path
+            batches = [roots[i:i + chunksize] for i in range(0, len(roots), chunksize)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for future in as_completed([pool.submit(_score_batch, batch) for batch in batches]):
+                    emit(future.result())
+    return sorted(records, key=lambda r: r["study_root"])
+
+
+def _score_batch(roots: List[str]) -> List[Dict]:
+    return [score_record(root) for root in roots]
+
+# -------------------- Deferred charts --------------------
+
+def load_summary(path: str) -> List[Dict]:
+    if path.endswith(".csv"):
+        with open(path, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            for name in CHECKS:
+                row[name] = float(row[name]) if row.get(name) not in (None, "") else None
+        return rows
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def render_charts(records: List[Dict], charts_dir: str, fmt: str = "svg") -> List[str]:
+    """Radar chart per successfully scored study, named after its root.
+
+    ``fmt`` is "svg" (no plotting dependencies) or "png" (matplotlib).
+    """
+    from repl_et_score import render_score_chart, render_score_svg
+
+    render = render_score_chart if fmt == "png" else render_score_svg
+
+    os.makedirs(charts_dir, exist_ok=True)
+    paths = []
+    for record in records:
+        if record.get("error"):
+            continue
+        scores = {name: record[name] for name in CHECKS}
+        root = os.path.normpath(record["study_root"])
+        name = "root" if root == "." else root.replace(os.sep, "__")
+        chart_path = os.path.join(charts_dir, f"{name}.{fmt}")
+        render(scores, chart_path)
+        paths.append(chart_path)
+    return paths
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Score all REPL.et studies under a directory tree")
+    parser.add_argument("tree", nargs="?", default=".")
+    parser.add_argument("--summary", default=os.path.join("outputs", "batch_scores.jsonl"),
+                        help="Summary path (.jsonl or .csv)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--charts", metavar="DIR", default=None,
+                        help="Also render a radar chart per study into DIR")
+    parser.add_argument("--charts-only", action="store_true",
+                        help="Render charts from an existing --summary without rescoring")
+    parser.add_argument("--png", action="store_true", help="Render charts as PNG with matplotlib instead of SVG")
+    args = parser.parse_args()
+    fmt = "png" if args.png else "svg"
+
+    if args.charts_only:
+        paths = render_charts(load_summary(args.summary), args.charts or os.path.join("outputs", "charts"), fmt)
+        print(f"📈 {len(paths)} radar chart(s) from {args.summary}")
+        return
+
+    start = time.perf_counter()
+    records = score_tree(args.tree, args.summary, args.workers)
+    failed = [r for r in records if r["error"]]
+    print(f"📊 Scored {len(records)} study root(s) in {time.perf_counter() - start:.1f}s: {args.summary}")
+    for record in failed:
+        print(f"❌ {record['study_root']}: {record['error']}")
+    if args.charts:
+        paths = render_charts(records, args.charts, fmt)
+        print(f"📈 {len(paths)} radar chart(s): {args.charts}")
+
+
+if __name__ == "__main__":
+    main()
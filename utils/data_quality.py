@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Sliding-window data-quality metrics for eye-tracking recordings.
+
+Computes, per trial and per participant:
+- data loss (fraction of invalid samples)
+- RMS-S2S precision (root mean square of sample-to-sample distances)
+- STD precision (dispersion of valid samples around their trial mean;
+  per participant, pooled from the trials' sums of squared deviations)
+- validity windows: sliding windows (500 ms by default) whose fraction of
+  valid samples falls below the validity threshold (0.85 by default)
+
+Windows span the sample timestamps, starting at each sample; a window
+holding fewer samples than the sampling rate implies (dropped samples)
+counts the missing ones as invalid.
+
+All trials of the corpus are concatenated and processed in one vectorized
+pass: per-trial sums use np.bincount over a trial index, window ends come
+from one np.searchsorted over the timestamps and window validity uses a
+cumulative sum, so the cost is O(n log n) in the total samples. Precision
+is in the units of the input positions (pixels, or degrees once converted).
+
+Results are written as tables under data/analysis/ and summarised into the
+``data_quality`` block of validity/validity.json.
+"""
+
+import os
+import re
+import json
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+DEFAULT_VALIDITY_THRESHOLD = 0.85
+DEFAULT_WINDOW_MS = 500.0
+DEFAULT_SAMPLING_RATE_HZ = 60.0
+
+TRACKER_SPECS_PATH = os.path.join("equipment", "tracker_specs.json")
+PREPROCESSING_PATH = os.path.join("preprocessing", "preprocessing.json")
+VALIDITY_PATH = os.path.join("validity", "validity.json")
+QUALITY_DIR = os.path.join("data", "analysis")
+TRIAL_TABLE_NAME = "quality_trials.csv"
+PARTICIPANT_TABLE_NAME = "quality_participants.csv"
+
+# (participant_id, trial_id, t_ms, x, y)
+TrialSamples = Tuple[str, str, np.ndarray, np.ndarray, np.ndarray]
+
+# -------------------- Settings --------------------
+
+def sampling_rate_from_tracker(path: str = TRACKER_SPECS_PATH) -> float:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return float(json.load(f).get("sampling_rate_hz", DEFAULT_SAMPLING_RATE_HZ))
+    except Exception:
+        return DEFAULT_SAMPLING_RATE_HZ
+
+
+def quality_settings_from_spec(path: str = PREPROCESSING_PATH) -> Dict[str, float]:
+    """Validity threshold and window length named in preprocessing.json, if any."""
+    settings = {"validity_threshold": DEFAULT_VALIDITY_THRESHOLD, "window_ms": DEFAULT_WINDOW_MS}
+    if not os.path.exists(path):
+        return settings
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for step in data.get("steps") or data.get("preprocessing_steps") or []:
+        params = step.get("parameters", {})
+        if "eye_tracking_validity_threshold" in params:
+            settings["validity_threshold"] = float(params["eye_tracking_validity_threshold"])
+        window = params.get("data_validity_window")
+        if window:
+            match = re.search(r"(\d+(?:\.\d+)?)\s*ms", str(window))
+            if match:
+                settings["window_ms"] = float(match.group(1))
+    return settings
+
+# -------------------- Inputs --------------------
+
+def trials_from_container(reader, participant_id: Optional[str] = None) -> Iterator[TrialSamples]:
+    """Yield trials from a gaze_container.GazeContainerReader."""
+    for pid, sid, bid, tid in reader.iter_trials(participant_id):
+        data = reader.read_trial(pid, sid, bid, tid, columns=["t", "x", "y"])
+        yield pid, f"{sid}/{bid}/{tid}", data["t"], data["x"], data["y"]
+
+# -------------------- Metrics --------------------
+
+def _per_trial(values: np.ndarray, index: np.ndarray, n_trials: int) -> np.ndarray:
+    return np.bincount(index, weights=values, minlength=n_trials)
+
+
+def compute_quality(trials: Iterable[TrialSamples], sampling_rate_hz: float,
+                    validity_threshold: float = DEFAULT_VALIDITY_THRESHOLD,
+                    window_ms: float = DEFAULT_WINDOW_MS) -> pd.DataFrame:
+    """Per-trial quality table for a whole corpus, computed in one pass."""
+    participant_ids, trial_ids, ts, xs, ys = [], [], [], [], []
+    for pid, tid, t, x, y in trials:
+        participant_ids.append(pid)
+        trial_ids.append(tid)
+        ts.append(np.asarray(t, dtype=np.float64))
+        xs.append(np.asarray(x, dtype=np.float64))
+        ys.append(np.asarray(y, dtype=np.float64))
+
+    n_trials = len(trial_ids)
+    lengths = np.array([len(x) for x in xs], dtype=np.int64)
+    x = np.concatenate(xs) if xs else np.empty(0)
+    y = np.concatenate(ys) if ys else np.empty(0)
+    trial = np.repeat(np.arange(n_trials), lengths)
+    valid = np.isfinite(x) & np.isfinite(y)
+
+    n_valid = np.bincount(trial, weights=valid, minlength=n_trials)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        data_loss = 1.0 - n_valid / lengths
+
+        # STD precision, centred per trial to avoid cancellation at pixel scale
+        xv = np.where(valid, x, 0.0)
+        yv = np.where(valid, y, 0.0)
+        mean_x = _per_trial(xv, trial, n_trials) / n_valid
+        mean_y = _per_trial(yv, trial, n_trials) / n_valid
+        dev = np.where(valid, (x - mean_x[trial]) ** 2 + (y - mean_y[trial]) ** 2, 0.0)
+        std_ss = _per_trial(dev, trial, n_trials)
+        std_precision = np.sqrt(std_ss / n_valid)
+
+        # RMS-S2S over consecutive valid samples of the same trial
+        step = np.diff(x) ** 2 + np.diff(y) ** 2
+        pairs = (trial[1:] == trial[:-1]) & np.isfinite(step)
+        s2s_sum = np.bincount(trial[1:][pairs], weights=step[pairs], minlength=n_trials)
+        s2s_count = np.bincount(trial[1:][pairs], minlength=n_trials)
+        rms_s2s = np.sqrt(s2s_sum / s2s_count)
+
+    # Sliding validity windows over the timestamps. Trials are laid end to
+    # end on one time axis, a window apart, so one searchsorted finds every
+    # window's end without crossing a trial; half a sample period of slack
+    # keeps float timestamps on the right side of a window boundary.
+    period = 1000.0 / sampling_rate_hz
+    expected = max(window_ms / period, 1.0)
+    t = np.concatenate(ts) if ts else np.empty(0)
+    first, last = np.cumsum(lengths) - lengths, np.cumsum(lengths) - 1
+    spans = np.array([tt[-1] - tt[0] if tt.size else 0.0 for tt in ts])
+    offsets = np.cumsum(spans + window_ms + period) - (spans + window_ms + period)
+    axis = t - t[first[trial]] + offsets[trial]
+    reach = window_ms - period / 2
+    starts = np.flatnonzero(axis + reach <= axis[last[trial]] + period / 2)
+    ends = np.searchsorted(axis, axis[starts] + reach)
+    cumulative = np.concatenate(([0], np.cumsum(valid, dtype=np.int64)))
+    window_validity = (cumulative[ends] - cumulative[starts]) / np.maximum(ends - starts, expected)
+    flagged = window_validity < validity_threshold
+    n_windows = np.bincount(trial[starts], minlength=n_trials)
+    flagged_windows = np.bincount(trial[starts][flagged], minlength=n_trials)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        flagged_fraction = flagged_windows / n_windows
+
+    return pd.DataFrame({
+        "participant_id": participant_ids,
+        "trial_id": trial_ids,
+        "n_samples": lengths,
+        "n_valid": n_valid.astype(np.int64),
+        "data_loss": data_loss,
+        "rms_s2s": rms_s2s,
+        "std_precision": std_precision,
+        "std_ss": std_ss,
+        "s2s_sum": s2s_sum,
+        "s2s_count": s2s_count,
+        "n_windows": n_windows,
+        "flagged_windows": flagged_windows,
+        "flagged_fraction": flagged_fraction,
+        "below_threshold": (1.0 - data_loss) < validity_threshold,
+    })
+
+
+def summarize_participants(trial_table: pd.DataFrame,
+                           validity_threshold: float = DEFAULT_VALIDITY_THRESHOLD) -> pd.DataFrame:
+    """Aggregate the per-trial table to one row per participant.
+
+    STD precision pools the trials' squared deviations from their own
+    means, so it is the dispersion of all the participant's valid samples
+    with between-trial offsets removed.
+    """
+    grouped = trial_table.groupby("participant_id", sort=True)
+    table = grouped.agg(
+        n_trials=("trial_id", "count"),
+        n_samples=("n_samples", "sum"),
+        n_valid=("n_valid", "sum"),
+        s2s_sum=("s2s_sum", "sum"),
+        s2s_count=("s2s_count", "sum"),
+        std_ss=("std_ss", "sum"),
+        n_windows=("n_windows", "sum"),
+        flagged_windows=("flagged_windows", "sum"),
+        trials_below_threshold=("below_threshold", "sum"),
+    ).reset_index()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        table["data_loss"] = 1.0 - table["n_valid"] / table["n_samples"]
+        table["rms_s2s"] = np.sqrt(table["s2s_sum"] / table["s2s_count"])
+        table["std_precision"] = np.sqrt(table["std_ss"] / table["n_valid"])
+        table["flagged_fraction"] = table["flagged_windows"] / table["n_windows"]
+    table["below_threshold"] = (1.0 - table["data_loss"]) < validity_threshold
+    return table
+
+# -------------------- Outputs --------------------
+
+def write_quality_tables(trial_table: pd.DataFrame, participant_table: pd.DataFrame,
+                         output_dir: str = QUALITY_DIR) -> Tuple[str, str]:
+    os.makedirs(output_dir, exist_ok=True)
+    trial_path = os.path.join(output_dir, TRIAL_TABLE_NAME)
+    participant_path = os.path.join(output_dir, PARTICIPANT_TABLE_NAME)
+    trial_table.to_csv(trial_path, index=False)
+    participant_table.to_csv(participant_path, index=False)
+    return trial_path, participant_path
+
+
+def _finite_or_none(value) -> Optional[float]:
+    value = float(value)
+    return round(value, 6) if np.isfinite(value) else None
+
+
+def quality_summary(trial_table: pd.DataFrame, participant_table: pd.DataFrame,
+                    validity_threshold: float, window_ms: float) -> Dict:
+    """The ``data_quality`` block stored in validity.json."""
+    return {
+        "validity_threshold": validity_threshold,
+        "validity_window_ms": window_ms,
+        "participants": int(len(participant_table)),
+        "trials": int(len(trial_table)),
+        "mean_data_loss": _finite_or_none(participant_table["data_loss"].mean()),
+        "median_rms_s2s": _finite_or_none(participant_table["rms_s2s"].median()),
+        "median_std_precision": _finite_or_none(participant_table["std_precision"].median()),
+        "trials_with_flagged_windows": int((trial_table["flagged_windows"] > 0).sum()),
+        "participants_below_threshold": sorted(
+            participant_table.loc[participant_table["below_threshold"], "participant_id"].astype(str)
+        ),
+    }
+
+
+def update_validity_json(summary: Dict, path: str = VALIDITY_PATH):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    data["data_quality"] = summary
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    import argparse
+    from gaze_container import DEFAULT_CONTAINER_PATH, GazeContainerReader
+
+    parser = argparse.ArgumentParser(description="Compute eye-tracking data-quality metrics")
+    parser.add_argument("--container", default=DEFAULT_CONTAINER_PATH)
+    parser.add_argument("--output-dir", default=QUALITY_DIR)
+    parser.add_argument("--no-validity-update", action="store_true",
+                        help="Do not write the summary into validity/validity.json")
+    args = parser.parse_args()
+
+    settings = quality_settings_from_spec()
+    rate = sampling_rate_from_tracker()
+    with GazeContainerReader(args.container) as reader:
+        trials = compute_quality(trials_from_container(reader), rate, **settings)
+    participants = summarize_participants(trials, settings["validity_threshold"])
+    trial_path, participant_path = write_quality_tables(trials, participants, args.output_dir)
+    print(f"📄 Trial quality: {trial_path}")
+    print(f"📄 Participant quality: {participant_path}")
+
+    if not args.no_validity_update:
+        summary = quality_summary(trials, participants, settings["validity_threshold"], settings["window_ms"])
+        update_validity_json(summary)
+        print(f"📝 {VALIDITY_PATH} updated with data-quality summary")
+
+
+if __name__ == "__main__":
+    main()
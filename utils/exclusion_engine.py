@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Automated exclusion engine for the criteria listed in collection/protocol.json.
+
+Each free-text criterion is compiled into a vectorized predicate over the
+precomputed quality tables written by data_quality.py (one row per trial and
+one per participant). Evaluating the predicates produces an exclusion table
+with one row per excluded participant or trial and the criterion behind it.
+
+Results are cached under data/analysis/exclusion_cache/, keyed on the
+criteria, the thresholds and the hashes of the input tables, so repeated
+analysis runs reuse the same exclusion table until something changes. Only
+the MAX_CACHED_TABLES most recently used tables are kept.
+"""
+
+import os
+import re
+import json
+import shutil
+import pandas as pd
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from data_quality import (
+    QUALITY_DIR, TRIAL_TABLE_NAME, PARTICIPANT_TABLE_NAME, PREPROCESSING_PATH,
+    DEFAULT_VALIDITY_THRESHOLD, quality_settings_from_spec
+)
+from preprocessing_checkpoints import hash_file, hash_parameters
+
+PROTOCOL_PATH = os.path.join("collection", "protocol.json")
+EXCLUSIONS_PATH = os.path.join(QUALITY_DIR, "exclusions.csv")
+CACHE_DIR = os.path.join(QUALITY_DIR, "exclusion_cache")
+MAX_CACHED_TABLES = 4
+
+EXCLUSION_COLUMNS = ["participant_id", "trial_id", "level", "criterion"]
+ID_COLUMNS = ["participant_id", "trial_id"]
+
+
+@dataclass
+class Criterion:
+    text: str
+    level: str  # "trial" or "participant"
+    predicate: Callable[[pd.DataFrame], pd.Series]
+
+
+# -------------------- Criterion compilation --------------------
+
+def _percent(text: str) -> Optional[float]:
+    match = re.search(r"(\d+(?:\.\d+)?)\s*%", text)
+    return float(match.group(1)) / 100.0 if match else None
+
+
+def _data_loss_criteria(text: str, settings: Dict) -> List[Criterion]:
+    # "excessive data loss" uses the validity threshold; "data loss > 20%" its own
+    limit = _percent(text)
+    if limit is None:
+        limit = 1.0 - settings["validity_threshold"]
+    predicate = lambda table: table["data_loss"] > limit
+    return [Criterion(text, "trial", predicate), Criterion(text, "participant", predicate)]
+
+
+def _incomplete_session_criteria(text: str, settings: Dict) -> List[Criterion]:
+    expected = settings.get("expected_trials")
+    if not expected:
+        # Without a trial count, an all-invalid trial is the only evidence
+        return [Criterion(text, "trial", lambda table: table["n_valid"] == 0)]
+    return [
+        Criterion(text, "participant", lambda table: table["n_trials"] < expected),
+        Criterion(text, "trial", lambda table: table["n_valid"] == 0),
+    ]
+
+
+def _flagged_window_criteria(text: str, settings: Dict) -> List[Criterion]:
+    limit = _percent(text)
+    limit = 0.5 if limit is None else limit
+    return [Criterion(text, "trial", lambda table: table["flagged_fraction"] > limit)]
+
+
+# (pattern, builder) pairs tried in order against each lower-cased criterion
+CRITERIA_RULES: List[Tuple[str, Callable[[str, Dict], List[Criterion]]]] = [
+    (r"data loss|missing data|track(ing)? loss", _data_loss_criteria),
+    (r"incomplete|did not complete|unfinished", _incomplete_session_criteria),
+    (r"invalid window|validity window|flagged window", _flagged_window_criteria),
+]
+
+
+def study_root(protocol_path: str = PROTOCOL_PATH) -> str:
+    """Study directory of a protocol.json at its usual place, collection/protocol.json."""
+    return os.path.dirname(os.path.dirname(os.path.abspath(protocol_path)))
+
+
+def load_protocol(protocol_path: str = PROTOCOL_PATH) -> Tuple[List[str], Optional[int]]:
+    """Exclusion criteria and expected main-trial count from protocol.json."""
+    with open(protocol_path, encoding="utf-8") as f:
+        protocol = json.load(f)
+    criteria = [str(c) for c in protocol.get("exclusion_criteria", [])]
+    expected = protocol.get("session_structure", {}).get("main_trials")
+    return criteria, int(expected) if expected else None
+
+
+def compile_criteria(criteria: List[str], settings: Dict) -> Tuple[List[Criterion], List[str]]:
+    """Compile criteria into predicates; also return those no rule understands."""
+    compiled: List[Criterion] = []
+    unrecognized: List[str] = []
+    for text in criteria:
+        lowered = text.lower()
+        for pattern, builder in CRITERIA_RULES:
+            if re.search(pattern, lowered):
+                compiled.extend(builder(text, settings))
+                break
+        else:
+            unrecognized.append(text)
+    return compiled, unrecognized
+
+# -------------------- Evaluation --------------------
+
+def evaluate_exclusions(trial_table: pd.DataFrame, participant_table: pd.DataFrame,
+                        criteria: List[Criterion]) -> pd.DataFrame:
+    """Exclusion table with one row per (participant or trial, criterion)."""
+    frames = []
+    for criterion in criteria:
+        if criterion.level == "trial":
+            hits = trial_table.loc[criterion.predicate(trial_table).fillna(False).astype(bool),
+                                   ["participant_id", "trial_id"]]
+        else:
+            hits = participant_table.loc[criterion.predicate(participant_table).fillna(False).astype(bool),
+                                         ["participant_id"]].assign(trial_id="")
+        frames.append(hits.assign(level=criterion.level, criterion=criterion.text))
+
+    if not frames:
+        return pd.DataFrame(columns=EXCLUSION_COLUMNS)
+    table = pd.concat(frames, ignore_index=True)[EXCLUSION_COLUMNS]
+    return table.sort_values(["participant_id", "trial_id", "criterion"], kind="stable").reset_index(drop=True)
+
+
+def excluded_participants(exclusions: pd.DataFrame) -> List[str]:
+    return sorted(exclusions.loc[exclusions["level"] == "participant", "participant_id"].astype(str).unique())
+
+
+def _read_table(path: str) -> pd.DataFrame:
+    """Quality or exclusion table as written by to_csv.
+
+    Only empty fields are missing values; ids such as "NA" stay strings and
+    empty ids (participant-level rows) stay "".
+    """
+    table = pd.read_csv(path, dtype={c: str for c in ID_COLUMNS}, keep_default_na=False, na_values=[""])
+    return table.fillna({c: "" for c in ID_COLUMNS if c in table.columns})
+
+
+def cache_key(criteria: List[str], settings: Dict, input_paths: List[str]) -> str:
+    return hash_parameters({
+        "criteria": criteria,
+        "settings": settings,
+        "inputs": [hash_file(p) for p in input_paths],
+    })
+
+
+def prune_cache(cache_dir: str = CACHE_DIR, keep: int = MAX_CACHED_TABLES):
+    """Delete all but the ``keep`` most recently used cached tables."""
+    try:
+        entries = [e for e in os.scandir(cache_dir) if e.is_file() and e.name.endswith(".csv")]
+    except FileNotFoundError:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime_ns, reverse=True)
+    for entry in entries[keep:]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+def run_exclusions(protocol_path: str = PROTOCOL_PATH,
+                   quality_dir: str = QUALITY_DIR,
+                   output_path: str = EXCLUSIONS_PATH,
+                   cache_dir: str = CACHE_DIR,
+                   validity_threshold: Optional[float] = None) -> Tuple[pd.DataFrame, bool]:
+    """Evaluate (or reuse) the exclusion table; returns (table, reused_from_cache).
+
+    Without ``validity_threshold``, the threshold comes from the study's
+    preprocessing.json, next to the protocol's collection/ directory.
+    """
+    criteria, expected_trials = load_protocol(protocol_path)
+    if validity_threshold is None:
+        spec_path = os.path.join(study_root(protocol_path), PREPROCESSING_PATH)
+        validity_threshold = quality_settings_from_spec(spec_path).get("validity_threshold",
+                                                                       DEFAULT_VALIDITY_THRESHOLD)
+    settings = {"validity_threshold": validity_threshold, "expected_trials": expected_trials}
+
+    trial_path = os.path.join(quality_dir, TRIAL_TABLE_NAME)
+    participant_path = os.path.join(quality_dir, PARTICIPANT_TABLE_NAME)
+    key = cache_key(criteria, settings, [trial_path, participant_path])
+    cached = os.path.join(cache_dir, f"{key}.csv")
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    if os.path.exists(cached):
+        # Mark as recently used so pruning keeps it
+        os.utime(cached)
+        shutil.copyfile(cached, output_path)
+        return _read_table(cached), True
+
+    compiled, unrecognized = compile_criteria(criteria, settings)
+    for text in unrecognized:
+        print(f"⚠️ Exclusion criterion not evaluated automatically: {text}")
+
+    trial_table = _read_table(trial_path)
+    participant_table = _read_table(participant_path)
+    exclusions = evaluate_exclusions(trial_table, participant_table, compiled)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # Make room first, so the table written now is never the one removed
+    prune_cache(cache_dir, MAX_CACHED_TABLES - 1)
+    exclusions.to_csv(cached, index=False)
+    shutil.copyfile(cached, output_path)
+    return exclusions, False
+
+
+def main():
+    exclusions, reused = run_exclusions()
+    source = "cache" if reused else "quality tables"
+    print(f"🚫 {len(exclusions)} exclusion(s) from {source}: {EXCLUSIONS_PATH}")
+    participants = excluded_participants(exclusions)
+    if participants:
+        print(f"👤 Excluded participants: {', '.join(participants)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Fixation-algorithm agreement harness (I-VT vs I-DT).
+
+Runs two event detectors on identical inputs (the same filtered samples,
+converted to degrees once) and measures how well they agree:
+- sample level: Cohen's kappa of the fixation/non-fixation labels over
+  valid samples
+- event level: fixations of one detector that overlap a fixation of the
+  other, with the onset and offset differences of the matched pairs
+
+Interval matching is vectorized with np.searchsorted over the sorted event
+boundaries. Participants are sharded across worker processes, each reading
+its own trials from the gaze container, and the result is a per-participant
+agreement report.
+"""
+
+import os
+import re
+import json
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from gaze_events import detect_fixations_idt, detect_fixations_ivt, events_to_mask
+from fixation_sweep import PREPROCESSING_PATH, SweepTrial, ivt_defaults_from_spec
+
+AGREEMENT_OUTPUT_PATH = os.path.join("data", "analysis", "fixation_agreement.csv")
+DEFAULT_DISPERSION_THRESHOLD = 1.2
+# Sample-level kappa claimed in the preprocessing spec
+TARGET_KAPPA = 0.85
+
+# -------------------- Settings --------------------
+
+def detector_settings_from_spec(path: str = PREPROCESSING_PATH) -> Dict[str, float]:
+    """I-VT threshold, I-DT dispersion and minimum duration from preprocessing.json."""
+    settings = ivt_defaults_from_spec(path)
+    settings["dispersion_threshold"] = DEFAULT_DISPERSION_THRESHOLD
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        for step in data.get("steps") or data.get("preprocessing_steps") or []:
+            params = step.get("parameters", {})
+            for key in ("dispersion_threshold", "dispersion_threshold_deg"):
+                match = re.search(r"\d+(?:\.\d+)?", str(params.get(key, "")))
+                if match:
+                    settings["dispersion_threshold"] = float(match.group(0))
+    return settings
+
+# -------------------- Agreement measures --------------------
+
+def cohens_kappa_counts(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """2x2 confusion counts [[nn, ny], [yn, yy]] of two boolean label vectors."""
+    return np.bincount(a.astype(np.int64) * 2 + b.astype(np.int64), minlength=4).reshape(2, 2)
+
+
+def kappa_from_counts(counts: np.ndarray) -> float:
+    total = counts.sum()
+    if total == 0:
+        return float("nan")
+    observed = np.trace(counts) / total
+    expected = float((counts.sum(axis=1) * counts.sum(axis=0)).sum()) / total ** 2
+    if expected == 1.0:
+        return 1.0 if observed == 1.0 else float("nan")
+    return float((observed - expected) / (1.0 - expected))
+
+
+def match_intervals(onsets_a: np.ndarray, offsets_a: np.ndarray,
+                    onsets_b: np.ndarray, offsets_b: np.ndarray) -> np.ndarray:
+    """For each interval of A, the index of the B interval it overlaps most (-1 if none).
+
+    Both sets must be sorted and non-overlapping within themselves, as
+    fixations of one detector are.
+    """
+    if onsets_a.size == 0 or onsets_b.size == 0:
+        return np.full(onsets_a.size, -1, dtype=np.int64)
+    first = np.searchsorted(offsets_b, onsets_a, side="left")
+    last = np.searchsorted(onsets_b, offsets_a, side="right") - 1
+    counts = np.maximum(last - first + 1, 0)
+
+    # Every overlapping (A, B) pair; O(n + m) since neither set self-overlaps
+    a_idx = np.repeat(np.arange(onsets_a.size), counts)
+    b_idx = first[a_idx] + np.arange(a_idx.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    overlap = np.minimum(offsets_a[a_idx], offsets_b[b_idx]) - np.maximum(onsets_a[a_idx], onsets_b[b_idx])
+
+    best = np.full(onsets_a.size, -1, dtype=np.int64)
+    order = np.lexsort((-overlap, a_idx))
+    group_start = np.ones(order.size, dtype=bool)
+    group_start[1:] = a_idx[order][1:] != a_idx[order][:-1]
+    best[a_idx[order][group_start]] = b_idx[order][group_start]
+    return best
+
+
+def compare_events(events_a: Dict[str, np.ndarray], events_b: Dict[str, np.ndarray]) -> Dict[str, float]:
+    match_ab = match_intervals(events_a["onset_index"], events_a["offset_index"],
+                               events_b["onset_index"], events_b["offset_index"])
+    match_ba = match_intervals(events_b["onset_index"], events_b["offset_index"],
+                               events_a["onset_index"], events_a["offset_index"])
+    matched = match_ab >= 0
+    onset_diff = np.abs(events_a["onset_ms"][matched] - events_b["onset_ms"][match_ab[matched]])
+    offset_diff = np.abs(events_a["offset_ms"][matched] - events_b["offset_ms"][match_ab[matched]])
+    return {
+        "matched_a": int(matched.sum()),
+        "matched_b": int((match_ba >= 0).sum()),
+        "onset_diff_sum_ms": float(onset_diff.sum()),
+        "offset_diff_sum_ms": float(offset_diff.sum()),
+    }
+
+# -------------------- Harness --------------------
+
+def participant_agreement(participant_id: str, trials: Sequence[SweepTrial], geometry=None,
+                          velocity_threshold: float = 35.0, dispersion_threshold: float = DEFAULT_DISPERSION_THRESHOLD,
+                          min_duration_ms: float = 80.0) -> Dict:
+    """Agreement of I-VT and I-DT over all trials of one participant."""
+    counts = np.zeros((2, 2), dtype=np.int64)
+    totals = {"ivt_fixations": 0, "idt_fixations": 0, "matched_a": 0, "matched_b": 0,
+              "onset_diff_sum_ms": 0.0, "offset_diff_sum_ms": 0.0}
+    for _pid, _tid, _stimulus, t, x, y in trials:
+        if geometry is not None:
+            x, y = geometry.px_to_deg(x, y)
+        t = np.asarray(t, dtype=np.float64)
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        ivt = detect_fixations_ivt(t, x, y, velocity_threshold, min_duration_ms)
+        idt = detect_fixations_idt(t, x, y, dispersion_threshold, min_duration_ms)
+
+        valid = np.isfinite(x) & np.isfinite(y)
+        counts += cohens_kappa_counts(events_to_mask(ivt, t.size)[valid], events_to_mask(idt, t.size)[valid])
+        totals["ivt_fixations"] += len(ivt["onset_index"])
+        totals["idt_fixations"] += len(idt["onset_index"])
+        for key, value in compare_events(ivt, idt).items():
+            totals[key] += value
+
+    matched = totals["matched_a"]
+    n_events = totals["ivt_fixations"] + totals["idt_fixations"]
+    return {
+        "participant_id": participant_id,
+        "n_trials": len(trials),
+        "n_valid_samples": int(counts.sum()),
+        "kappa": kappa_from_counts(counts),
+        "ivt_fixations": totals["ivt_fixations"],
+        "idt_fixations": totals["idt_fixations"],
+        "matched_ivt": totals["matched_a"],
+        "matched_idt": totals["matched_b"],
+        "event_agreement": (totals["matched_a"] + totals["matched_b"]) / n_events if n_events else float("nan"),
+        "mean_onset_diff_ms": totals["onset_diff_sum_ms"] / matched if matched else float("nan"),
+        "mean_offset_diff_ms": totals["offset_diff_sum_ms"] / matched if matched else float("nan"),
+    }
+
+
+def agreement_report(trials: Sequence[SweepTrial], geometry=None, **settings) -> pd.DataFrame:
+    """Per-participant agreement for in-memory trials (single process)."""
+    by_participant: Dict[str, List[SweepTrial]] = {}
+    for trial in trials:
+        by_participant.setdefault(trial[0], []).append(trial)
+    rows = [participant_agreement(pid, by_participant[pid], geometry, **settings)
+            for pid in sorted(by_participant)]
+    return pd.DataFrame(rows)
+
+
+def _container_shard(args: Tuple[str, str, Optional[str], Dict]) -> Dict:
+    from gaze_container import GazeContainerReader
+    from fixation_sweep import trials_from_container
+    from screen_geometry import load_screen_geometry
+
+    container_path, participant_id, screen_setup_path, settings = args
+    geometry = load_screen_geometry(screen_setup_path) if screen_setup_path else None
+    with GazeContainerReader(container_path) as reader:
+        trials = trials_from_container(reader, participant_id)
+    return participant_agreement(participant_id, trials, geometry, **settings)
+
+
+def agreement_from_container(container_path: str, screen_setup_path: Optional[str] = None,
+                             workers: Optional[int] = None, **settings) -> pd.DataFrame:
+    """Per-participant agreement over a gaze container, one process per shard."""
+    from gaze_container import GazeContainerReader
+
+    with GazeContainerReader(container_path) as reader:
+        participants = reader.participants()
+    jobs = [(container_path, pid, screen_setup_path, settings) for pid in participants]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rows = list(pool.map(_container_shard, jobs))
+    return pd.DataFrame(rows)
+
+
+def main():
+    import argparse
+    from gaze_container import DEFAULT_CONTAINER_PATH
+    from screen_geometry import SCREEN_SETUP_PATH
+
+    parser = argparse.ArgumentParser(description="Measure I-VT vs I-DT fixation agreement")
+    parser.add_argument("--container", default=DEFAULT_CONTAINER_PATH)
+    parser.add_argument("--output", default=AGREEMENT_OUTPUT_PATH)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    settings = detector_settings_from_spec()
+    report = agreement_from_container(args.container, SCREEN_SETUP_PATH, args.workers, **settings)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    report.to_csv(args.output, index=False)
+
+    median_kappa = report["kappa"].median()
+    status = "✅" if median_kappa >= TARGET_KAPPA else "⚠️"
+    print(f"📄 Agreement report: {args.output}")
+    print(f"{status} Median sample-level kappa: {median_kappa:.3f} (target > {TARGET_KAPPA})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Parameter sweep for I-VT fixation detection thresholds.
+
+Tests how sensitive fixation measures are to the velocity threshold and the
+minimum fixation duration named in preprocessing.json (35 deg/s, 80 ms).
+Everything that does not depend on the grid is computed once for the whole
+corpus: filtering, pixel-to-degree conversion, velocities and the AOI boxes.
+Candidate fixation runs (and their centroids and AOI hits) depend only on
+the velocity threshold, so they are found once per threshold; each minimum
+duration is then just a mask over those runs. Thresholds are evaluated in
+parallel threads over the shared arrays.
+
+The result is a tidy table with one row per (parameter set, participant,
+trial) and the fixation measures as columns.
+"""
+
+import os
+import re
+import json
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from gaze_events import build_event_table, classify_ivt, compute_velocity, find_runs
+from gaze_filtering import filter_trials
+
+PREPROCESSING_PATH = os.path.join("preprocessing", "preprocessing.json")
+AOIS_PATH = os.path.join("aois", "aois_definition.json")
+SWEEP_OUTPUT_PATH = os.path.join("data", "analysis", "fixation_sweep.csv")
+
+DEFAULT_VELOCITY_THRESHOLD = 35.0
+DEFAULT_MIN_DURATION_MS = 80.0
+
+# (participant_id, trial_id, stimulus_id or None, t_ms, x_px, y_px)
+SweepTrial = Tuple[str, str, Optional[str], np.ndarray, np.ndarray, np.ndarray]
+
+MEASURE_COLUMNS = [
+    "fixation_count", "total_fixation_duration_ms", "mean_fixation_duration_ms",
+    "aoi_fixation_count", "aoi_dwell_ms",
+]
+
+# -------------------- Inputs --------------------
+
+def ivt_defaults_from_spec(path: str = PREPROCESSING_PATH) -> Dict[str, float]:
+    """Velocity threshold and minimum duration from the fixation step, if present."""
+    defaults = {"velocity_threshold": DEFAULT_VELOCITY_THRESHOLD, "min_duration_ms": DEFAULT_MIN_DURATION_MS}
+    if not os.path.exists(path):
+        return defaults
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for step in data.get("steps") or data.get("preprocessing_steps") or []:
+        name = str(step.get("step") or step.get("step_name") or "").lower()
+        if "fixation" not in name:
+            continue
+        params = step.get("parameters", {})
+        for key, target in [("velocity_threshold", "velocity_threshold"), ("minimum_duration", "min_duration_ms")]:
+            match = re.search(r"\d+(?:\.\d+)?", str(params.get(key, "")))
+            if match:
+                defaults[target] = float(match.group(0))
+    return defaults
+
+
+def load_aoi_boxes(path: str = AOIS_PATH) -> Dict[str, np.ndarray]:
+    """AOI rectangles per stimulus as (n, 4) arrays of x0, y0, x1, y1."""
+    with open(path, encoding="utf-8") as f:
+        aois = json.load(f).get("aois", [])
+    boxes: Dict[str, List[List[float]]] = {}
+    for aoi in aois:
+        c = aoi["coordinates"]
+        boxes.setdefault(aoi["stimulus_id"], []).append(
+            [c["x"], c["y"], c["x"] + c["width"], c["y"] + c["height"]])
+    return {stimulus: np.array(rows, dtype=np.float64) for stimulus, rows in boxes.items()}
+
+
+def trials_from_container(reader, participant_id: Optional[str] = None) -> List[SweepTrial]:
+    """Sweep inputs from a gaze_container.GazeContainerReader."""
+    trials = []
+    for key in reader.iter_trials(participant_id):
+        data = reader.read_trial(*key, columns=["t", "x", "y"])
+        stimulus = reader.trial_attrs(*key).get("stimulus_id")
+        trials.append((key[0], "/".join(key[1:]), stimulus, data["t"], data["x"], data["y"]))
+    return trials
+
+# -------------------- Shared intermediates --------------------
+
+@dataclass
+class SharedArrays:
+    t: np.ndarray
+    x_px: np.ndarray
+    y_px: np.ndarray
+    velocity: np.ndarray
+    trial_index: np.ndarray
+    participant_ids: List[str]
+    trial_ids: List[str]
+    stimulus_ids: List[Optional[str]]
+
+
+def prepare_shared(trials: Sequence[SweepTrial], geometry=None,
+                   savgol: Optional[Tuple[int, int]] = None,
+                   median_window: Optional[int] = None) -> SharedArrays:
+    """Filter, convert and differentiate all trials once.
+
+    ``geometry`` is a screen_geometry.ScreenGeometry; without it positions
+    are used as-is and thresholds are in position units per second.
+    """
+    if not trials:
+        return SharedArrays(t=np.empty(0), x_px=np.empty(0), y_px=np.empty(0), velocity=np.empty(0),
+                            trial_index=np.empty(0, dtype=np.int64), participant_ids=[], trial_ids=[],
+                            stimulus_ids=[])
+    columns = [{"t": t, "x": x, "y": y} for _pid, _tid, _sid, t, x, y in trials]
+    if savgol or median_window:
+        columns = filter_trials(columns, savgol=savgol, median_window=median_window)
+
+    lengths = np.array([len(c["t"]) for c in columns], dtype=np.int64)
+    t = np.concatenate([c["t"] for c in columns]).astype(np.float64)
+    x_px = np.concatenate([c["x"] for c in columns]).astype(np.float64)
+    y_px = np.concatenate([c["y"] for c in columns]).astype(np.float64)
+
+    if geometry is not None:
+        x_deg, y_deg = geometry.px_to_deg(x_px, y_px)
+    else:
+        x_deg, y_deg = x_px, y_px
+    velocity = compute_velocity(t, x_deg, y_deg)
+    # Differences across trial boundaries are meaningless
+    ends = np.cumsum(lengths)
+    velocity[ends[lengths > 0] - 1] = np.nan
+    velocity[(ends - lengths)[lengths > 0]] = np.nan
+
+    return SharedArrays(
+        t=t, x_px=x_px, y_px=y_px, velocity=velocity,
+        trial_index=np.repeat(np.arange(len(trials)), lengths),
+        participant_ids=[tr[0] for tr in trials],
+        trial_ids=[tr[1] for tr in trials],
+        stimulus_ids=[tr[2] for tr in trials],
+    )
+
+
+def _aoi_hits(x: np.ndarray, y: np.ndarray, stimuli: np.ndarray,
+              aoi_boxes: Dict[str, np.ndarray]) -> np.ndarray:
+    hits = np.zeros(x.size, dtype=bool)
+    for stimulus in np.unique(stimuli):
+        boxes = aoi_boxes.get(stimulus)
+        if boxes is None or not boxes.size:
+            continue
+        rows = np.flatnonzero(stimuli == stimulus)
+        px, py = x[rows, None], y[rows, None]
+        inside = (px >= boxes[:, 0]) & (px <= boxes[:, 2]) & (py >= boxes[:, 1]) & (py <= boxes[:, 3])
+        hits[rows] = inside.any(axis=1)
+    return hits
+
+# -------------------- Sweep --------------------
+
+def _evaluate_threshold(shared: SharedArrays, velocity_threshold: float,
+                        min_durations: Sequence[float], max_duration_ms: Optional[float],
+                        aoi_boxes: Dict[str, np.ndarray]) -> pd.DataFrame:
+    mask = classify_ivt(shared.velocity, velocity_threshold)
+    starts, ends = find_runs(mask)
+    # All candidate runs; minimum durations are applied below as masks
+    runs = build_event_table(shared.t, shared.x_px, shared.y_px, starts, ends, 0, -np.inf, max_duration_ms)
+    run_trial = shared.trial_index[runs["onset_index"]]
+    stimuli = np.array([shared.stimulus_ids[i] or "" for i in run_trial], dtype=object)
+    on_aoi = _aoi_hits(runs["x"], runs["y"], stimuli, aoi_boxes)
+
+    n_trials = len(shared.trial_ids)
+    frames = []
+    for min_duration in min_durations:
+        keep = runs["duration_ms"] >= min_duration
+        trial_of = run_trial[keep]
+        durations = runs["duration_ms"][keep]
+        count = np.bincount(trial_of, minlength=n_trials)
+        total = np.bincount(trial_of, weights=durations, minlength=n_trials)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+        frames.append(pd.DataFrame({
+            "velocity_threshold": velocity_threshold,
+            "min_duration_ms": min_duration,
+            "participant_id": shared.participant_ids,
+            "trial_id": shared.trial_ids,
+            "fixation_count": count,
+            "total_fixation_duration_ms": total,
+            "mean_fixation_duration_ms": mean,
+            "aoi_fixation_count": np.bincount(trial_of[on_aoi[keep]], minlength=n_trials),
+            "aoi_dwell_ms": np.bincount(trial_of[on_aoi[keep]], weights=durations[on_aoi[keep]],
+                                        minlength=n_trials),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def sweep_fixations(trials: Sequence[SweepTrial], velocity_thresholds: Sequence[float],
+                    min_durations: Sequence[float], geometry=None,
+                    aoi_boxes: Optional[Dict[str, np.ndarray]] = None,
+                    savgol: Optional[Tuple[int, int]] = None,
+                    median_window: Optional[int] = None,
+                    max_duration_ms: Optional[float] = None,
+                    workers: Optional[int] = None) -> pd.DataFrame:
+    """Tidy table of fixation measures for every (threshold, min duration) pair."""
+    shared = prepare_shared(trials, geometry, savgol, median_window)
+    aoi_boxes = aoi_boxes or {}
+    thresholds = sorted(set(float(v) for v in velocity_thresholds))
+    durations = sorted(set(float(d) for d in min_durations))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(
+            lambda threshold: _evaluate_threshold(shared, threshold, durations, max_duration_ms, aoi_boxes),
+            thresholds))
+    if not frames:
+        return pd.DataFrame(columns=["velocity_threshold", "min_duration_ms", "participant_id", "trial_id"]
+                            + MEASURE_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    import argparse
+    from gaze_container import DEFAULT_CONTAINER_PATH, GazeContainerReader
+    from screen_geometry import load_screen_geometry
+
+    defaults = ivt_defaults_from_spec()
+    parser = argparse.ArgumentParser(description="Sweep I-VT fixation detection thresholds")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[defaults["velocity_threshold"]],
+                        help="Velocity thresholds (degrees/second)")
+    parser.add_argument("--min-durations", type=float, nargs="+", default=[defaults["min_duration_ms"]],
+                        help="Minimum fixation durations (ms)")
+    parser.add_argument("--container", default=DEFAULT_CONTAINER_PATH)
+    parser.add_argument("--output", default=SWEEP_OUTPUT_PATH)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    aoi_boxes = load_aoi_boxes() if os.path.exists(AOIS_PATH) else {}
+    with GazeContainerReader(args.container) as reader:
+        trials = trials_from_container(reader)
+    table = sweep_fixations(trials, args.thresholds, args.min_durations,
+                            geometry=load_screen_geometry(), aoi_boxes=aoi_boxes, workers=args.workers)
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    table.to_csv(args.output, index=False)
+    n_sets = len(set(args.thresholds)) * len(set(args.min_durations))
+    print(f"📊 {n_sets} parameter set(s) over {len(trials)} trial(s): {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Hierarchical compressed container for processed eye-tracking samples.
+
+Implements the ``output_format.eye_tracking`` layout of the preprocessing
+spec: an HDF5 file with one group per participant/session/block/trial. Each
+trial holds a single 2-D ``samples`` dataset (rows = samples, columns named
+in its ``columns`` attribute), gzip-compressed and chunked so that a whole
+trial sits in one or a few chunks. Reading one trial therefore decompresses
+only that trial's chunks, never the rest of the participant.
+"""
+
+import os
+import re
+import json
+import h5py
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_CONTAINER_PATH = os.path.join("data", "processed", "eye_tracking.h5")
+DEFAULT_COMPRESSION_LEVEL = 6
+
+# Upper bound on the uncompressed size of one chunk; trials smaller than
+# this are stored as a single chunk.
+CHUNK_TARGET_BYTES = 1024 * 1024
+
+SAMPLES_DATASET = "samples"
+
+TrialKey = Tuple[str, str, str, str]
+
+
+def compression_level_from_spec(preprocessing_path: str) -> int:
+    """Read the gzip level from ``output_format.eye_tracking.compression``."""
+    if not os.path.exists(preprocessing_path):
+        return DEFAULT_COMPRESSION_LEVEL
+    with open(preprocessing_path, encoding="utf-8") as f:
+        data = json.load(f)
+    compression = str(data.get("output_format", {}).get("eye_tracking", {}).get("compression", ""))
+    match = re.search(r"gzip\D*(\d)", compression)
+    return int(match.group(1)) if match else DEFAULT_COMPRESSION_LEVEL
+
+
+def trial_chunk_shape(n_samples: int, n_columns: int) -> Tuple[int, int]:
+    """Chunk shape holding a whole trial, capped at CHUNK_TARGET_BYTES."""
+    max_rows = max(CHUNK_TARGET_BYTES // (8 * n_columns), 1)
+    return max(min(n_samples, max_rows), 1), n_columns
+
+
+def _group_path(*ids: str) -> str:
+    for value in ids:
+        if not value or "/" in str(value):
+            raise ValueError(f"Invalid container id: {value!r}")
+    return "/".join(str(v) for v in ids)
+
+
+class TrialColumn:
+    """Lazy, sliceable view of one column of a stored trial.
+
+    Slicing reads only the overlapping chunks, so views can be handed to
+    gaze_events.detect_fixations_ivt_chunked() for out-of-core processing.
+    """
+
+    def __init__(self, dataset: h5py.Dataset, index: int):
+        self._dataset = dataset
+        self._index = index
+
+    def __len__(self) -> int:
+        return self._dataset.shape[0]
+
+    def __getitem__(self, rows) -> np.ndarray:
+        return self._dataset[rows, self._index]
+
+
+class GazeContainerWriter:
+    """Write per-trial sample tables into the participant/session/block/trial tree."""
+
+    def __init__(self, path: str = DEFAULT_CONTAINER_PATH,
+                 compression_level: int = DEFAULT_COMPRESSION_LEVEL):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.compression_level = compression_level
+        self._file = h5py.File(path, "a")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def write_trial(self, participant_id: str, session_id: str, block_id: str, trial_id: str,
+                    samples: Dict[str, np.ndarray], attrs: Optional[Dict] = None):
+        """Store one trial; ``samples`` maps column names to equal-length arrays."""
+        columns = list(samples)
+        if not columns:
+            raise ValueError("A trial needs at least one column")
+        table = np.column_stack([np.asarray(samples[c], dtype=np.float64) for c in columns])
+
+        group = self._file.require_group(_group_path(participant_id, session_id, block_id, trial_id))
+        if SAMPLES_DATASET in group:
+            del group[SAMPLES_DATASET]
+        dataset = group.create_dataset(
+            SAMPLES_DATASET, data=table,
+            chunks=trial_chunk_shape(*table.shape),
+            compression="gzip", compression_opts=self.compression_level,
+            shuffle=True,
+        )
+        dataset.attrs["columns"] = json.dumps(columns)
+        for key, value in (attrs or {}).items():
+            group.attrs[key] = value
+
+
+class GazeContainerReader:
+    """Navigate the container and read single trials (or slices of them)."""
+
+    def __init__(self, path: str = DEFAULT_CONTAINER_PATH):
+        self.path = path
+        self._file = h5py.File(path, "r")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def _children(self, *ids: str) -> List[str]:
+        group = self._file[_group_path(*ids)] if ids else self._file
+        return sorted(group.keys())
+
+    def participants(self) -> List[str]:
+        return self._children()
+
+    def sessions(self, participant_id: str) -> List[str]:
+        return self._children(participant_id)
+
+    def blocks(self, participant_id: str, session_id: str) -> List[str]:
+        return self._children(participant_id, session_id)
+
+    def trials(self, participant_id: str, session_id: str, block_id: str) -> List[str]:
+        return self._children(participant_id, session_id, block_id)
+
+    def iter_trials(self, participant_id: Optional[str] = None) -> Iterator[TrialKey]:
+        participants = [participant_id] if participant_id else self.participants()
+        for pid in participants:
+            for sid in self.sessions(pid):
+                for bid in self.blocks(pid, sid):
+                    for tid in self.trials(pid, sid, bid):
+                        yield pid, sid, bid, tid
+
+    def columns(self, *key: str) -> List[str]:
+        return json.loads(self.dataset(*key).attrs["columns"])
+
+    def trial_attrs(self, *key: str) -> Dict:
+        return dict(self._file[_group_path(*key)].attrs)
+
+    def dataset(self, *key: str) -> h5py.Dataset:
+        """The raw HDF5 dataset of a trial, e.g. for chunked processing."""
+        return self._file[_group_path(*key)][SAMPLES_DATASET]
+
+    def column_view(self, participant_id: str, session_id: str, block_id: str, trial_id: str,
+                    column: str) -> TrialColumn:
+        key = (participant_id, session_id, block_id, trial_id)
+        return TrialColumn(self.dataset(*key), self.columns(*key).index(column))
+
+    def read_trial(self, participant_id: str, session_id: str, block_id: str, trial_id: str,
+                   columns: Optional[Sequence[str]] = None,
+                   start: Optional[int] = None, stop: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Read one trial, optionally a subset of columns and a row range.
+
+        Only the chunks overlapping the requested rows are decompressed.
+        """
+        key = (participant_id, session_id, block_id, trial_id)
+        dataset = self.dataset(*key)
+        names = self.columns(*key)
+        wanted = list(columns) if columns is not None else names
+        missing = [c for c in wanted if c not in names]
+        if missing:
+            raise KeyError(f"Unknown columns {missing} in trial {'/'.join(key)}")
+
+        table = dataset[slice(start, stop)]
+        return {name: table[:, names.index(name)] for name in wanted}
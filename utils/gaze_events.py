@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Gaze event detection (I-VT and I-DT fixations) with an optional out-of-core
+chunked mode for I-VT.
+
+Samples are given as parallel arrays of timestamps in milliseconds and x/y
+positions, with invalid samples (track loss, blinks) set to NaN. Velocities
+use 3-point central differentiation, so thresholds are in position units per
+second (degrees/second once positions are in visual angle).
+
+The chunked mode reads fixed-size sample windows from any sliceable array
+(numpy memmaps, HDF5 datasets) with enough overlap for the velocity filter,
+and stitches fixations that cross chunk edges. Its output is identical to
+the in-memory mode.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, Iterator, Optional, Tuple
+
+EVENT_FIELDS = ["onset_index", "offset_index", "onset_ms", "offset_ms", "duration_ms", "x", "y"]
+
+# Samples needed on each side of a chunk for the 3-point velocity filter
+VELOCITY_OVERLAP = 1
+
+DEFAULT_MAX_MEMORY_MB = 256
+# float64 t/x/y plus velocity, mask and per-chunk temporaries
+BYTES_PER_SAMPLE = 64
+
+# -------------------- Sample-level helpers --------------------
+
+def compute_velocity(t: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Point-to-point speed by 3-point central differences (units/second).
+
+    The first and last samples, and any sample next to an invalid one, get NaN.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    velocity = np.full(t.shape, np.nan)
+    if t.size < 3:
+        return velocity
+    dt = t[2:] - t[:-2]
+    dist = np.hypot(x[2:] - x[:-2], y[2:] - y[:-2])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        velocity[1:-1] = dist / dt * 1000.0
+    return velocity
+
+
+def classify_ivt(velocity: np.ndarray, velocity_threshold: float) -> np.ndarray:
+    """Mark samples below the velocity threshold as fixation samples."""
+    with np.errstate(invalid="ignore"):
+        return np.asarray(velocity) < velocity_threshold
+
+
+def find_runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and end (inclusive) indices of consecutive True runs."""
+    padded = np.concatenate(([False], np.asarray(mask, dtype=bool), [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2], edges[1::2] - 1
+
+
+def empty_events() -> Dict[str, np.ndarray]:
+    return {
+        name: np.empty(0, dtype=np.int64 if name.endswith("_index") else np.float64)
+        for name in EVENT_FIELDS
+    }
+
+
+def concat_events(parts) -> Dict[str, np.ndarray]:
+    parts = list(parts)
+    if not parts:
+        return empty_events()
+    return {name: np.concatenate([p[name] for p in parts]) for name in EVENT_FIELDS}
+
+
+def build_event_table(t: np.ndarray, x: np.ndarray, y: np.ndarray,
+                      starts: np.ndarray, ends: np.ndarray, index_offset: int,
+                      min_duration_ms: float, max_duration_ms: Optional[float]) -> Dict[str, np.ndarray]:
+    """Event table for candidate runs, keeping those within the duration limits."""
+    onset_ms = t[starts]
+    offset_ms = t[ends]
+    duration_ms = offset_ms - onset_ms
+    keep = duration_ms >= min_duration_ms
+    if max_duration_ms is not None:
+        keep &= duration_ms <= max_duration_ms
+    starts, ends = starts[keep], ends[keep]
+    if starts.size == 0:
+        return empty_events()
+
+    counts = ends - starts + 1
+    # Interleaved (start, end + 1) bounds make reduceat sum each event's own
+    # samples only, so centroids do not depend on where the array was cut
+    bounds = np.column_stack((starts, ends + 1)).ravel()
+    cx = np.add.reduceat(np.append(x, 0.0), bounds)[::2]
+    cy = np.add.reduceat(np.append(y, 0.0), bounds)[::2]
+
+    return {
+        "onset_index": starts.astype(np.int64) + index_offset,
+        "offset_index": ends.astype(np.int64) + index_offset,
+        "onset_ms": onset_ms[keep],
+        "offset_ms": offset_ms[keep],
+        "duration_ms": duration_ms[keep],
+        "x": cx / counts,
+        "y": cy / counts,
+    }
+
+# -------------------- In-memory detection --------------------
+
+def detect_fixations_ivt(t, x, y, velocity_threshold: float = 35.0,
+                         min_duration_ms: float = 80.0,
+                         max_duration_ms: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """Detect fixations with the velocity-threshold (I-VT) algorithm."""
+    t = np.asarray(t, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    mask = classify_ivt(compute_velocity(t, x, y), velocity_threshold)
+    starts, ends = find_runs(mask)
+    return build_event_table(t, x, y, starts, ends, 0, min_duration_ms, max_duration_ms)
+
+
+def _window_dispersion(x: np.ndarray, y: np.ndarray, window: int) -> np.ndarray:
+    """(max - min) of x plus y for every window of ``window`` samples; NaN if any sample is invalid."""
+    if x.size < window:
+        return np.empty(0)
+    wx = sliding_window_view(x, window)
+    wy = sliding_window_view(y, window)
+    return (wx.max(axis=1) - wx.min(axis=1)) + (wy.max(axis=1) - wy.min(axis=1))
+
+
+def detect_fixations_idt(t, x, y, dispersion_threshold: float = 1.2,
+                         min_duration_ms: float = 80.0,
+                         max_duration_ms: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """Detect fixations with the dispersion-threshold (I-DT) algorithm.
+
+    Follows Salvucci & Goldberg (2000): a window spanning the minimum
+    duration becomes a fixation when its dispersion is within the threshold
+    and is then grown until the dispersion would exceed it. Initial-window
+    dispersions are computed for all positions at once, so the Python loop
+    runs once per fixation rather than once per sample.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = t.size
+    if n < 2:
+        return empty_events()
+    interval = float(np.median(np.diff(t)))
+    window = int(np.ceil(min_duration_ms / interval - 1e-9)) + 1 if interval > 0 else n + 1
+    dispersion = _window_dispersion(x, y, window)
+    candidates = np.flatnonzero(dispersion <= dispersion_threshold)
+
+    starts, ends = [], []
+    position = 0
+    while True:
+        next_index = np.searchsorted(candidates, position)
+        if next_index >= candidates.size:
+            break
+        start = int(candidates[next_index])
+        end = start + window - 1
+        # Grow in doubling steps using running extrema from the window start
+        step = window
+        while end + 1 < n:
+            stop = min(n, end + 1 + step)
+            sx, sy = x[start:stop], y[start:stop]
+            spread = (np.fmax.accumulate(sx) - np.fmin.accumulate(sx)
+                      + np.fmax.accumulate(sy) - np.fmin.accumulate(sy))
+            valid = np.isfinite(sx) & np.isfinite(sy)
+            ok = (spread <= dispersion_threshold) & np.logical_and.accumulate(valid)
+            beyond = np.flatnonzero(~ok[end - start + 1:])
+            if beyond.size:
+                end = end + int(beyond[0])
+                break
+            end = stop - 1
+            step *= 2
+        starts.append(start)
+        ends.append(end)
+        position = end + 1
+
+    return build_event_table(t, x, y, np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64),
+                             0, min_duration_ms, max_duration_ms)
+
+
+def events_to_mask(events: Dict[str, np.ndarray], n_samples: int) -> np.ndarray:
+    """Boolean per-sample mask of the samples covered by events."""
+    delta = np.zeros(n_samples + 1, dtype=np.int64)
+    np.add.at(delta, events["onset_index"], 1)
+    np.add.at(delta, events["offset_index"] + 1, -1)
+    return np.cumsum(delta[:-1]) > 0
+
+# -------------------- Chunked (out-of-core) detection --------------------
+
+def chunk_samples_for_memory(max_memory_mb: float = DEFAULT_MAX_MEMORY_MB) -> int:
+    """Number of samples per chunk that keeps working memory near the target."""
+    return max(int(max_memory_mb * 1024 * 1024 // BYTES_PER_SAMPLE), 16)
+
+
+def iter_chunks(n_samples: int, chunk_samples: int, overlap: int) -> Iterator[Tuple[int, int, int, int]]:
+    """Yield (start, stop, padded_start, padded_stop) for each chunk."""
+    for start in range(0, n_samples, chunk_samples):
+        stop = min(start + chunk_samples, n_samples)
+        yield start, stop, max(0, start - overlap), min(n_samples, stop + overlap)
+
+
+def detect_fixations_ivt_chunked(t, x, y, velocity_threshold: float = 35.0,
+                                 min_duration_ms: float = 80.0,
+                                 max_duration_ms: Optional[float] = None,
+                                 max_memory_mb: float = DEFAULT_MAX_MEMORY_MB,
+                                 chunk_samples: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """I-VT detection over fixed-size windows of a sliceable sample source.
+
+    Only one chunk (plus the samples of a fixation still open at its end) is
+    held in memory at a time. ``chunk_samples`` overrides the size derived
+    from ``max_memory_mb``.
+    """
+    n_samples = len(t)
+    if chunk_samples is None:
+        chunk_samples = chunk_samples_for_memory(max_memory_mb)
+    chunk_samples = max(int(chunk_samples), 1)
+
+    parts = []
+    # Samples of a fixation that reaches the end of the previous chunk
+    carry_t = carry_x = carry_y = np.empty(0)
+
+    for start, stop, pad_start, pad_stop in iter_chunks(n_samples, chunk_samples, VELOCITY_OVERLAP):
+        pt = np.asarray(t[pad_start:pad_stop], dtype=np.float64)
+        px = np.asarray(x[pad_start:pad_stop], dtype=np.float64)
+        py = np.asarray(y[pad_start:pad_stop], dtype=np.float64)
+        core = slice(start - pad_start, stop - pad_start)
+        mask = classify_ivt(compute_velocity(pt, px, py)[core], velocity_threshold)
+
+        # Prepend the open fixation so it is measured over all of its samples
+        ct = np.concatenate((carry_t, pt[core]))
+        cx = np.concatenate((carry_x, px[core]))
+        cy = np.concatenate((carry_y, py[core]))
+        mask = np.concatenate((np.ones(carry_t.size, dtype=bool), mask))
+        offset = start - carry_t.size
+
+        starts, ends = find_runs(mask)
+        if stop < n_samples and ends.size and ends[-1] == mask.size - 1:
+            open_start = starts[-1]
+            carry_t, carry_x, carry_y = ct[open_start:], cx[open_start:], cy[open_start:]
+            starts, ends = starts[:-1], ends[:-1]
+        else:
+            carry_t = carry_x = carry_y = np.empty(0)
+
+        parts.append(build_event_table(ct, cx, cy, starts, ends, offset, min_duration_ms, max_duration_ms))
+
+    return concat_events(parts)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Batched gaze signal filtering (Savitzky-Golay, median) and resampling.
+
+All trials of a participant are padded into one 2-D array (trials x samples,
+NaN-padded) and filtered with a single strided sliding-window operation, so
+there is no per-trial Python loop. Filtering is gap-aware: invalid (NaN)
+samples stay invalid and a valid sample whose window touches a gap keeps its
+raw value, so track loss never leaks into neighbouring samples.
+
+Resampling brings recordings made at different rates (EMIP at 250 Hz, other
+datasets at 60 Hz or 1000 Hz) onto a common rate for pooled analyses. It
+interpolates linearly, never across invalid samples or dropped-sample gaps.
+
+Trials are dicts of equal-length arrays with a ``t`` column in milliseconds,
+as returned by gaze_container.GazeContainerReader.read_trial().
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Trial = Dict[str, np.ndarray]
+
+TIME_COLUMN = "t"
+# A source interval longer than this many nominal intervals is a gap
+MAX_GAP_INTERVALS = 1.5
+
+# -------------------- Batching --------------------
+
+def pad_trials(arrays: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Stack 1-D arrays into a NaN-padded (n_trials, max_len) batch."""
+    lengths = np.array([len(a) for a in arrays], dtype=np.int64)
+    if lengths.size == 0:
+        return np.empty((0, 0)), lengths
+    batch = np.full((lengths.size, int(lengths.max())), np.nan)
+    mask = np.arange(batch.shape[1]) < lengths[:, None]
+    batch[mask] = np.concatenate([np.asarray(a, dtype=np.float64) for a in arrays])
+    return batch, lengths
+
+
+def unpad_trials(batch: np.ndarray, lengths: np.ndarray) -> List[np.ndarray]:
+    return [batch[i, :n].copy() for i, n in enumerate(lengths)]
+
+
+def window_samples(window_ms: float, sampling_rate_hz: float) -> int:
+    """Odd window length in samples closest to ``window_ms``."""
+    n = int(round(window_ms * sampling_rate_hz / 1000.0))
+    return max(n + (1 - n % 2), 1)
+
+# -------------------- Filters --------------------
+
+def savgol_coefficients(window: int, order: int, deriv: int = 0, delta: float = 1.0) -> np.ndarray:
+    """Savitzky-Golay convolution weights for the centre sample of a window."""
+    if window % 2 == 0 or window <= order:
+        raise ValueError("window must be odd and larger than the polynomial order")
+    half = window // 2
+    positions = np.arange(-half, half + 1, dtype=np.float64)
+    design = np.vander(positions, order + 1, increasing=True)
+    weights = np.linalg.pinv(design)[deriv]
+    return weights * np.prod(np.arange(1, deriv + 1)) / delta ** deriv
+
+
+def _apply_windowed(batch: np.ndarray, window: int, reducer) -> np.ndarray:
+    batch = np.asarray(batch, dtype=np.float64)
+    out = batch.copy()
+    if window <= 1 or batch.shape[-1] < window:
+        return out
+    half = window // 2
+    filtered = reducer(sliding_window_view(batch, window, axis=-1))
+    core = out[..., half:batch.shape[-1] - half]
+    # Windows containing a NaN come out NaN: keep the raw value there
+    out[..., half:batch.shape[-1] - half] = np.where(np.isfinite(filtered), filtered, core)
+    return out
+
+
+def savgol_filter_batch(batch: np.ndarray, window: int, order: int) -> np.ndarray:
+    """Savitzky-Golay smoothing along the last axis; edges are left unfiltered."""
+    weights = savgol_coefficients(window, order)
+    return _apply_windowed(batch, window, lambda windows: windows @ weights)
+
+
+def median_filter_batch(batch: np.ndarray, window: int) -> np.ndarray:
+    """Running median along the last axis; edges are left unfiltered."""
+    return _apply_windowed(batch, window, lambda windows: np.median(windows, axis=-1))
+
+
+def filter_trials(trials: List[Trial], columns: Sequence[str] = ("x", "y"),
+                  savgol: Optional[Tuple[int, int]] = None,
+                  median_window: Optional[int] = None) -> List[Trial]:
+    """Filter the given columns of all trials in one batched pass per column.
+
+    ``savgol`` is (window, order) in samples; the median filter runs first
+    when both are requested, to remove spikes before smoothing.
+    """
+    filtered = [dict(trial) for trial in trials]
+    if not trials:
+        return filtered
+    for column in columns:
+        batch, lengths = pad_trials([trial[column] for trial in trials])
+        if median_window:
+            batch = median_filter_batch(batch, median_window)
+        if savgol:
+            batch = savgol_filter_batch(batch, *savgol)
+        for trial, values in zip(filtered, unpad_trials(batch, lengths)):
+            trial[column] = values
+    return filtered
+
+# -------------------- Resampling --------------------
+
+def resample_trials(trials: List[Trial], target_rate_hz: float,
+                    source_rate_hz: Optional[float] = None) -> List[Trial]:
+    """Linearly resample every column of all trials onto a common rate.
+
+    All trials are interpolated with one np.interp call: each trial's time
+    axis is shifted past the previous one so the concatenation stays sorted.
+    Target samples bracketed by an invalid source sample, or by a source
+    interval longer than MAX_GAP_INTERVALS nominal intervals, become NaN.
+    """
+    if not trials:
+        return []
+    step = 1000.0 / target_rate_hz
+    times = [np.asarray(trial[TIME_COLUMN], dtype=np.float64) for trial in trials]
+    if not any(t.size for t in times):
+        # Nothing to interpolate from
+        return [dict(trial) for trial in trials]
+    if source_rate_hz is None:
+        diffs = np.concatenate([np.diff(t) for t in times])
+        source_interval = float(np.median(diffs)) if diffs.size else step
+    else:
+        source_interval = 1000.0 / source_rate_hz
+
+    targets = [t[0] + np.arange(int(np.floor((t[-1] - t[0]) / step + 1e-9)) + 1) * step
+               if t.size else np.empty(0) for t in times]
+
+    # Shift each trial onto its own stretch of a single monotonic axis
+    spans = np.array([(t[-1] - t[0]) if t.size else 0.0 for t in times])
+    shifts = np.concatenate(([0.0], np.cumsum(spans + 10 * source_interval + step)))[:-1]
+    starts = np.array([t[0] if t.size else 0.0 for t in times])
+    source_axis = np.concatenate([t - s0 + shift for t, s0, shift in zip(times, starts, shifts)])
+    target_axis = np.concatenate([t - s0 + shift for t, s0, shift in zip(targets, starts, shifts)])
+
+    # Flag targets whose bracketing source interval is a dropped-sample gap
+    right = np.clip(np.searchsorted(source_axis, target_axis, side="left"), 1, source_axis.size - 1)
+    left = right - 1
+    exact = source_axis[right] == target_axis
+    gap = (source_axis[right] - source_axis[left]) > MAX_GAP_INTERVALS * source_interval
+    gap &= ~exact
+
+    target_lengths = [t.size for t in targets]
+    offsets = np.cumsum([0] + target_lengths)
+    resampled = [{TIME_COLUMN: t} for t in targets]
+    for column in trials[0]:
+        if column == TIME_COLUMN:
+            continue
+        values = np.concatenate([np.asarray(trial[column], dtype=np.float64) for trial in trials])
+        # np.interp propagates NaN from either bracketing sample
+        interpolated = np.interp(target_axis, source_axis, values)
+        interpolated[gap] = np.nan
+        for i, trial in enumerate(resampled):
+            trial[column] = interpolated[offsets[i]:offsets[i + 1]]
+    return resampled
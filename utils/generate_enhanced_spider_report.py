@@ -1,49 +1,26 @@
 #!/usr/bin/env python3
 
 import os
-import subprocess
-import json
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend for headless environments
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
-from pathlib import Path
-import tempfile
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from repl_et_score import score_study
 
 def run_scoring_with_details(directory):
-    """Run scoring script in a directory and extract detailed scores."""
-    original_dir = os.getcwd()
-    script_path = os.path.join(original_dir, 'utils', 'repl_et_score.py')
-    try:
-        os.chdir(directory)
-        result = subprocess.run(['python3', script_path], 
-                              capture_output=True, text=True)
-        if result.returncode == 0:
-            # Find the temporary directory from output
-            lines = result.stdout.split('\n')
-            temp_dir = None
-            for line in lines:
-                if 'Output directory:' in line:
-                    temp_dir = line.split(': ')[1].strip()
-                    break
-            
-            if temp_dir and os.path.exists(os.path.join(temp_dir, 'report.json')):
-                with open(os.path.join(temp_dir, 'report.json'), 'r') as f:
-                    scores = json.load(f)
-                return scores
-            else:
-                print(f"Warning: Could not find report.json for {directory}")
-                return None
-        else:
-            print(f"Error running scoring for {directory}: {result.stderr}")
-            return None
-    finally:
-        os.chdir(original_dir)
+    """Score a study directory in-process and return its detailed scores."""
+    if not os.path.isdir(directory):
+        print(f"Warning: {directory} is not a directory")
+        return None
+    return score_study(directory)
 
 def create_beautiful_spider_chart():
     """Create beautiful spider charts showing individual criteria for each directory."""
+    # Plotting stack is loaded only when a chart is actually drawn
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend for headless environments
+    import matplotlib.pyplot as plt
+    import numpy as np
     
     # Get detailed scores for all directories
     directories = {
@@ -52,9 +29,12 @@ def create_beautiful_spider_chart():
         'Advanced Example': 'examples/advanced'
     }
     
+    # Scoring only reads files, so directories are scored concurrently
+    with ThreadPoolExecutor() as pool:
+        results = dict(zip(directories, pool.map(run_scoring_with_details, directories.values())))
+    
     all_scores = {}
-    for name, path in directories.items():
-        scores = run_scoring_with_details(path)
+    for name, scores in results.items():
         if scores:
             all_scores[name] = scores
             # Calculate overall score
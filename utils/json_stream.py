@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Incremental JSON reading and validation for very large documents.
+
+Token-level AOI sets and large cohorts put hundreds of MB into a single
+top-level array (aois_definition.json "aois", participants.json
+"participants"). JSONStreamReader walks the document structure itself and
+hands each value, or each array item, to json's C decoder (raw_decode) on a
+sliding buffer, so memory is bounded by the largest single item plus one
+read chunk, and every value is reported with its byte offset in the file.
+
+validate_stream() checks top-level arrays item by item against the item
+subschema and everything else against the root schema, reporting errors
+with JSON paths and byte offsets.
+"""
+
+import codecs
+import json
+from json.decoder import WHITESPACE
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+CHUNK_SIZE = 1024 * 1024
+# Characters that may continue a number (the empty string: end of buffer)
+NUMBER_CHARS = frozenset(("", *"0123456789.eE+-"))
+# Decode errors this close to the end of the buffer may be a token cut by it
+# (a literal such as -Infinity, a \uXXXX escape); earlier ones are malformed
+TRUNCATED_TOKEN_CHARS = 16
+
+
+class JSONStreamError(ValueError):
+    def __init__(self, message: str, offset: int):
+        super().__init__(f"{message} (byte {offset})")
+        self.offset = offset
+
+
+class JSONStreamReader:
+    """Pull parser over a binary UTF-8 file object."""
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        # Byte offset of _buffer[_mark]; positions only move forward, so
+        # offsets are computed incrementally from the last mark
+        self._mark = 0
+        self._mark_bytes = 0
+        self._eof = False
+
+    # -------------------- Buffer --------------------
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        if self._eof:
+            return False
+        data = self._file.read(size or self._chunk_size)
+        if not data:
+            self._eof = True
+            self._buffer += self._decoder.decode(b"", final=True)
+            return False
+        self._buffer += self._decoder.decode(data)
+        return True
+
+    def _compact(self):
+        """Drop consumed text once it outweighs a chunk (amortised O(1) per byte)."""
+        if self._pos >= self._chunk_size or self._pos == len(self._buffer):
+            self._byte_offset(self._pos)
+            self._buffer = self._buffer[self._pos:]
+            self._pos = self._mark = 0
+
+    def _byte_offset(self, pos: int) -> int:
+        self._mark_bytes += len(self._buffer[self._mark:pos].encode("utf-8"))
+        self._mark = pos
+        return self._mark_bytes
+
+    def offset(self) -> int:
+        """Byte offset of the current position."""
+        return self._byte_offset(self._pos)
+
+    def peek(self) -> Optional[str]:
+        """Next non-whitespace character, without consuming it; None at end of input."""
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            self._compact()
+            if not self._fill():
+                return None
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if char is None or char not in chars:
+            raise JSONStreamError(f"expected one of {chars!r}, found {char!r}", self.offset())
+        self._pos += 1
+        return char
+
+    # -------------------- Values --------------------
+
+    def read_value(self) -> Tuple[Any, int]:
+        """Next complete value and its byte offset."""
+        if self.peek() is None:
+            raise JSONStreamError("unexpected end of input", self.offset())
+        self._compact()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # Value cut by the end of the buffer: read more (at least
+                # doubling the buffer) and retry; anything else is malformed
+                truncated = (e.msg.startswith("Unterminated string")
+                             or len(self._buffer) - e.pos <= TRUNCATED_TOKEN_CHARS)
+                if truncated and self._fill(max(self._chunk_size, len(self._buffer))):
+                    continue
+                raise JSONStreamError(e.msg, self._byte_offset(max(e.pos, self._mark)))
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and not self._eof \
+                    and self._buffer[end:end + 1] in NUMBER_CHARS:
+                # A number cut by the end of the buffer continues in the next chunk
+                if self._fill():
+                    continue
+            offset = self._byte_offset(self._pos)
+            self._pos = end
+            return value, offset
+
+    def iter_array(self) -> Iterator[Tuple[Any, int]]:
+        """Items of the array at the current position, with their byte offsets."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.read_value()
+            if self.expect(",]") == "]":
+                return
+
+    def iter_object(self) -> Iterator[Tuple[str, int]]:
+        """Keys of the object at the current position; the caller consumes each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key, offset = self.read_value()
+            if not isinstance(key, str):
+                raise JSONStreamError("object keys must be strings", offset)
+            self.expect(":")
+            yield key, offset
+            if self.expect(",}") == "}":
+                return
+
+    def skip_value(self):
+        """Consume the next value; arrays are skipped item by item."""
+        if self.peek() == "[":
+            for _ in self.iter_array():
+                pass
+        else:
+            self.read_value()
+
+    def end(self):
+        if self.peek() is not None:
+            raise JSONStreamError("extra data after the document", self.offset())
+
+# -------------------- Validation --------------------
+
+def read_schema_ref(f) -> Optional[str]:
+    """`$schema` of a top-level object, reading only as far as needed."""
+    reader = JSONStreamReader(f)
+    if reader.peek() != "{":
+        return None
+    for key, _offset in reader.iter_object():
+        if key == "$schema":
+            value, _ = reader.read_value()
+            return value if isinstance(value, str) else None
+        reader.skip_value()
+    return None
+
+
+def _json_path(parts) -> str:
+    return "$" + "".join(f"[{p}]" if isinstance(p, int) else f".{p}" for p in parts)
+
+
+def validate_stream(f, validator, max_errors: int = 50) -> List[Dict]:
+    """Validate the document in ``f`` against ``validator``'s schema, streaming arrays.
+
+    Top-level arrays (or a root array) whose schema declares ``items`` are
+    validated item by item against that subschema; their length is checked
+    against minItems/maxItems (uniqueItems is not checked in streaming
+    mode). All other values are collected and validated against the root
+    schema. Errors are {"path", "message", "offset"}; malformed JSON raises
+    JSONStreamError.
+    """
+    schema = validator.schema if isinstance(validator.schema, dict) else {}
+    reader = JSONStreamReader(f)
+    errors: List[Dict] = []
+
+    def report(prefix, offset, found):
+        for error in sorted(found, key=lambda e: list(map(str, e.absolute_path))):
+            if len(errors) < max_errors:
+                errors.append({"path": _json_path(prefix + list(error.absolute_path)),
+                               "message": error.message, "offset": offset})
+
+    def stream_items(prefix, array_schema):
+        item_validator = validator.evolve(schema=array_schema["items"])
+        start = reader.offset()
+        count = 0
+        for index, (item, offset) in enumerate(reader.iter_array()):
+            report(prefix + [index], offset, item_validator.iter_errors(item))
+            count = index + 1
+        if count < array_schema.get("minItems", 0):
+            errors.append({"path": _json_path(prefix), "offset": start,
+                           "message": f"array has {count} items, fewer than minItems {array_schema['minItems']}"})
+        if "maxItems" in array_schema and count > array_schema["maxItems"]:
+            errors.append({"path": _json_path(prefix), "offset": start,
+                           "message": f"array has {count} items, more than maxItems {array_schema['maxItems']}"})
+
+    def streamable(subschema):
+        return isinstance(subschema, dict) and isinstance(subschema.get("items"), dict)
+
+    start = reader.peek()
+    if start == "[" and streamable(schema):
+        stream_items([], schema)
+    elif start == "{":
+        properties = schema.get("properties", {})
+        shell, offsets, streamed = {}, {}, set()
+        for key, _offset in reader.iter_object():
+            if reader.peek() == "[" and streamable(properties.get(key)):
+                offsets[key] = reader.offset()
+                stream_items([key], properties[key])
+                shell[key] = []
+                streamed.add(key)
+            else:
+                shell[key], offsets[key] = reader.read_value()
+        # Object-level keywords (required, additionalProperties, ...) on the
+        # document with streamed arrays emptied; their items were checked above
+        for error in validator.iter_errors(shell):
+            key = error.absolute_path[0] if error.absolute_path else None
+            if key not in streamed:
+                report([], offsets.get(key, 0), [error])
+    else:
+        value, offset = reader.read_value()
+        report([], offset, validator.iter_errors(value))
+    reader.end()
+    return errors
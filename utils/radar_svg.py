@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Dependency-free radar (spider) chart renderer producing SVG.
+
+Draws the same chart as the matplotlib renderer in repl_et_score (radial
+grid at 0.2 steps, filled score polygon, labelled axes, value labels above
+0.05) using only the standard library, so scoring never has to import a
+plotting stack to produce a chart.
+"""
+
+import math
+from typing import List, Sequence
+from xml.sax.saxutils import escape
+
+SIZE = 800
+CENTER = SIZE / 2
+RADIUS = 240
+GRID_LEVELS = [0.2, 0.4, 0.6, 0.8, 1.0]
+
+
+def _point(angle: float, value: float):
+    # Angle 0 points right and angles run counter-clockwise, as in matplotlib polar axes
+    return (CENTER + RADIUS * value * math.cos(angle), CENTER - RADIUS * value * math.sin(angle))
+
+
+def _polygon(points) -> str:
+    return " ".join(f"{x:.1f},{y:.1f}" for x, y in points)
+
+
+def _text(x: float, y: float, lines: List[str], **attrs) -> str:
+    attributes = " ".join(f'{k.replace("_", "-")}="{v}"' for k, v in attrs.items())
+    spans = "".join(
+        f'<tspan x="{x:.1f}" dy="{0 if i == 0 else 1.2}em">{escape(line)}</tspan>'
+        for i, line in enumerate(lines))
+    first_dy = -(len(lines) - 1) * 0.6
+    return f'<text x="{x:.1f}" y="{y:.1f}" dy="{first_dy:.1f}em" {attributes}>{spans}</text>'
+
+
+def radar_svg(labels: Sequence[str], values: Sequence[float], title: str, color: str) -> str:
+    """SVG document for a radar chart; labels may contain newlines."""
+    n = len(labels)
+    angles = [2 * math.pi * i / n for i in range(n)]
+    values = [min(max(float(v or 0.0), 0.0), 1.0) for v in values]
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{SIZE}" height="{SIZE}" '
+        f'viewBox="0 0 {SIZE} {SIZE}" font-family="sans-serif">',
+        f'<rect width="{SIZE}" height="{SIZE}" fill="white"/>',
+    ]
+    title_lines = title.split("\n")
+    parts.append(_text(CENTER, 44, title_lines, text_anchor="middle", font_size=18, font_weight="bold"))
+
+    for level in GRID_LEVELS:
+        ring = [_point(a, level) for a in angles]
+        parts.append(f'<polygon points="{_polygon(ring)}" fill="none" stroke="#cccccc"/>')
+        # Ring labels sit between the first two axes
+        x, y = _point(math.pi / n, level)
+        parts.append(f'<text x="{x:.1f}" y="{y:.1f}" font-size="10" fill="#666666">{level:.1f}</text>')
+    for angle, label in zip(angles, labels):
+        x, y = _point(angle, 1.0)
+        parts.append(f'<line x1="{CENTER}" y1="{CENTER}" x2="{x:.1f}" y2="{y:.1f}" stroke="#cccccc"/>')
+        lx, ly = _point(angle, 1.22)
+        anchor = "middle" if abs(math.cos(angle)) < 0.1 else ("start" if math.cos(angle) > 0 else "end")
+        parts.append(_text(lx, ly, label.split("\n"), text_anchor=anchor, font_size=12,
+                           dominant_baseline="middle"))
+
+    shape = [_point(a, v) for a, v in zip(angles, values)]
+    parts.append(f'<polygon points="{_polygon(shape)}" fill="{color}" fill-opacity="0.25" '
+                 f'stroke="{color}" stroke-width="3"/>')
+    for (x, y), value, angle in zip(shape, values, angles):
+        parts.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="4" fill="{color}"/>')
+        if value > 0.05:
+            tx, ty = _point(angle, value + 0.08)
+            parts.append(f'<text x="{tx:.1f}" y="{ty:.1f}" text-anchor="middle" dominant-baseline="middle" '
+                         f'font-size="11" font-weight="bold">{value:.2f}</text>')
+    parts.append("</svg>")
+    return "\n".join(parts) + "\n"
+
+
+def write_radar_svg(path: str, labels: Sequence[str], values: Sequence[float], title: str, color: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(radar_svg(labels, values, title, color))
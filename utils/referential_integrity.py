@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Cross-file referential integrity for a study.
+
+Id indexes are built once per run:
+
+- participants: participant_id in participants/participants.json
+- stimuli: stimulus_id in stimuli/stimuli_metadata.json
+- AOIs: aoi_id, and aoi_name per stimulus, in aois/aois_definition.json
+- trials: (participant_id, trial_id) keys of the gaze container, or of the
+  trial quality table (data_quality.py) when there is no container
+
+Every foreign key is then checked against them: the id columns of the CSV
+results tables (analysis/results_tables/, data/analysis/), the participant
+groups and stimulus_id attributes of the gaze container, and the
+stimulus_id of annotations and AOIs. JSON arrays are read item by item
+(json_stream) and CSVs in chunks of CHUNK_ROWS rows, reading only the key
+columns, so memory is bounded by the indexes rather than by the size of
+the results. Dangling references are reported with their row numbers.
+"""
+
+import os
+import json
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from json_stream import JSONStreamReader
+
+PARTICIPANTS_PATH = os.path.join("participants", "participants.json")
+STIMULI_METADATA_PATH = os.path.join("stimuli", "stimuli_metadata.json")
+STIMULI_ANNOTATIONS_PATH = os.path.join("stimuli", "stimuli_annotations.json")
+AOIS_PATH = os.path.join("aois", "aois_definition.json")
+RESULTS_DIRS = [os.path.join("analysis", "results_tables"), os.path.join("data", "analysis")]
+CONTAINER_PATH = os.path.join("data", "processed", "eye_tracking.h5")
+QUALITY_TRIALS_PATH = os.path.join("data", "analysis", "quality_trials.csv")
+REPORT_PATH = os.path.join("outputs", "referential_integrity.json")
+
+CHUNK_ROWS = 100_000
+# Dangling rows listed per reference; all of them are counted
+MAX_EXAMPLES = 20
+
+AOI_NAME_COLUMNS = ("aoi_label", "aoi_name")
+# Joins the columns of composite keys (stimulus_id + aoi name, participant_id + trial_id)
+KEY_SEP = "\x1f"
+
+
+@dataclass
+class Reference:
+    """Outcome of checking one foreign key (a column of one source) against an index."""
+    source: str
+    key: str
+    target: str
+    checked: int = 0
+    dangling: int = 0
+    examples: List[Dict] = field(default_factory=list)
+
+    def add(self, row, value):
+        self.dangling += 1
+        if len(self.examples) < MAX_EXAMPLES:
+            self.examples.append({"row": row, "value": value})
+
+    def to_dict(self) -> Dict:
+        return {"source": self.source, "key": self.key, "target": self.target,
+                "checked": self.checked, "dangling": self.dangling, "examples": self.examples}
+
+
+@dataclass
+class IdIndexes:
+    participants: Optional[Set[str]] = None
+    stimuli: Optional[Set[str]] = None
+    aoi_ids: Optional[Set[str]] = None
+    aoi_names: Optional[Set[Tuple[str, str]]] = None  # (stimulus_id, aoi_name)
+    trials: Optional[Set[Tuple[str, str]]] = None     # (participant_id, trial_id)
+    sources: Dict[str, str] = field(default_factory=dict)
+
+    def summary(self) -> Dict:
+        sizes = {"participants": self.participants, "stimuli": self.stimuli, "aois": self.aoi_ids,
+                 "trials": self.trials}
+        return {name: {"source": self.sources.get(name), "size": len(ids)}
+                for name, ids in sizes.items() if ids is not None}
+
+# -------------------- Indexes --------------------
+
+def iter_json_array(path: str, key: str) -> Iterator[Tuple[int, Dict]]:
+    """(index, item) of the array under a top-level ``key``, one item in memory at a time."""
+    with open(path, "rb") as f:
+        reader = JSONStreamReader(f)
+        if reader.peek() != "{":
+            return
+        for name, _offset in reader.iter_object():
+            if name == key and reader.peek() == "[":
+                for index, (item, _) in enumerate(reader.iter_array()):
+                    yield index, item
+            else:
+                reader.skip_value()
+
+
+def _ids(path: str, key: str, id_field: str) -> Set[str]:
+    return {str(item[id_field]) for _, item in iter_json_array(path, key)
+            if isinstance(item, dict) and item.get(id_field) is not None}
+
+
+def container_trial_keys(path: str) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """(participant_id, trial_id, stimulus_id) of every trial; trial_id as in data_quality."""
+    from gaze_container import GazeContainerReader
+    with GazeContainerReader(path) as reader:
+        for key in reader.iter_trials():
+            stimulus = reader.trial_attrs(*key).get("stimulus_id")
+            yield key[0], "/".join(key[1:]), None if stimulus is None else str(stimulus)
+
+
+def iter_csv_chunks(path: str, columns: List[str], chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Chunks of the given columns as strings, indexed by 1-based data row number."""
+    start = 1
+    for chunk in pd.read_csv(path, usecols=columns, dtype=str, keep_default_na=False, chunksize=chunk_rows):
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield chunk
+
+
+def build_indexes(root: str = ".", container_path: Optional[str] = None) -> IdIndexes:
+    indexes = IdIndexes()
+    path = os.path.join(root, PARTICIPANTS_PATH)
+    if os.path.exists(path):
+        indexes.participants = _ids(path, "participants", "participant_id")
+        indexes.sources["participants"] = PARTICIPANTS_PATH
+    path = os.path.join(root, STIMULI_METADATA_PATH)
+    if os.path.exists(path):
+        indexes.stimuli = _ids(path, "stimuli", "stimulus_id")
+        indexes.sources["stimuli"] = STIMULI_METADATA_PATH
+    path = os.path.join(root, AOIS_PATH)
+    if os.path.exists(path):
+        indexes.aoi_ids, indexes.aoi_names = set(), set()
+        for _, aoi in iter_json_array(path, "aois"):
+            if not isinstance(aoi, dict):
+                continue
+            if aoi.get("aoi_id") is not None:
+                indexes.aoi_ids.add(str(aoi["aoi_id"]))
+            if aoi.get("aoi_name") is not None:
+                indexes.aoi_names.add((str(aoi.get("stimulus_id")), str(aoi["aoi_name"])))
+        indexes.sources["aois"] = AOIS_PATH
+
+    container_path = container_path or os.path.join(root, CONTAINER_PATH)
+    quality_path = os.path.join(root, QUALITY_TRIALS_PATH)
+    if os.path.exists(container_path):
+        indexes.trials = {(pid, tid) for pid, tid, _ in container_trial_keys(container_path)}
+        indexes.sources["trials"] = os.path.relpath(container_path, root)
+    elif os.path.exists(quality_path):
+        indexes.trials = set()
+        for chunk in iter_csv_chunks(quality_path, ["participant_id", "trial_id"]):
+            indexes.trials.update(zip(chunk["participant_id"], chunk["trial_id"]))
+        indexes.sources["trials"] = QUALITY_TRIALS_PATH
+    return indexes
+
+# -------------------- Foreign keys --------------------
+
+def _check_values(reference: Reference, rows: Iterator[Tuple[object, str]], ids: Set):
+    for row, value in rows:
+        reference.checked += 1
+        if value not in ids:
+            reference.add(row, value)
+
+
+def results_tables(root: str = ".") -> List[str]:
+    tables = []
+    for directory in RESULTS_DIRS:
+        path = os.path.join(root, directory)
+        if os.path.isdir(path):
+            tables.extend(os.path.join(directory, name) for name in sorted(os.listdir(path))
+                          if name.endswith(".csv"))
+    return tables
+
+
+def _joined(frame: pd.DataFrame, columns: List[str]) -> pd.Series:
+    """Composite key column, joined as in _join_keys."""
+    joined = frame[columns[0]]
+    for column in columns[1:]:
+        joined = joined + KEY_SEP + frame[column]
+    return joined
+
+
+def _join_keys(keys) -> Set[str]:
+    return {KEY_SEP.join(key) for key in keys}
+
+
+def _table_references(table: str, header: List[str], indexes: IdIndexes) -> List[Tuple[Reference, List[str], Set[str], Optional[Set[str]]]]:
+    """(Reference, key columns, valid keys, valid leading keys) for every foreign key a table's header declares.
+
+    Valid leading keys, when given, check rows whose trailing key parts are
+    empty on their first column alone (participant-level rows with an empty
+    trial_id, as exclusion_engine writes them).
+    """
+    checks = []
+
+    def add(columns, target, ids, leading=None):
+        if set(columns) <= set(header) and ids is not None:
+            checks.append((Reference(table, "+".join(columns), target), columns, ids, leading))
+
+    add(["participant_id"], "participants", indexes.participants)
+    add(["stimulus_id"], "stimuli", indexes.stimuli)
+    add(["aoi_id"], "aois", indexes.aoi_ids)
+    if indexes.aoi_names is not None:
+        for column in AOI_NAME_COLUMNS:
+            # AOI names are only unique within a stimulus
+            if "stimulus_id" in header:
+                add(["stimulus_id", column], "aois", _join_keys(indexes.aoi_names))
+            else:
+                add([column], "aois", {name for _, name in indexes.aoi_names})
+    if indexes.trials is not None and indexes.sources.get("trials") != table:
+        add(["participant_id", "trial_id"], "trials", _join_keys(indexes.trials),
+            {pid for pid, _ in indexes.trials})
+    return checks
+
+
+def _report_dangling(reference: Reference, bad: pd.Series):
+    reference.dangling += len(bad)
+    for row, value in bad.head(MAX_EXAMPLES - len(reference.examples)).items():
+        reference.examples.append({"row": int(row), "value": value.replace(KEY_SEP, "+")})
+
+
+def check_table(root: str, table: str, indexes: IdIndexes, chunk_rows: int = CHUNK_ROWS) -> List[Reference]:
+    """Check one CSV results table chunk by chunk; only its key columns are read.
+
+    Empty or NA key values are not references and are skipped.
+    """
+    path = os.path.join(root, table)
+    header = list(pd.read_csv(path, nrows=0).columns)
+    checks = _table_references(table, header, indexes)
+    if not checks:
+        return []
+    columns = sorted({column for _, used, _, _ in checks for column in used})
+    for chunk in iter_csv_chunks(path, columns, chunk_rows):
+        present = chunk.fillna("").apply(lambda column: column.str.strip() != "")
+        for reference, used, ids, leading in checks:
+            complete = present[used].all(axis=1)
+            keys = _joined(chunk[complete], used)
+            reference.checked += len(keys)
+            _report_dangling(reference, keys[~keys.isin(ids)])
+            if leading is not None:
+                partial = present[used[0]] & ~complete
+                heads = chunk.loc[partial, used[0]]
+                reference.checked += len(heads)
+                _report_dangling(reference, heads[~heads.isin(leading)])
+    return [reference for reference, _, _, _ in checks]
+
+
+def check_json_references(root: str, indexes: IdIndexes) -> List[Reference]:
+    """stimulus_id of annotations and AOIs against the stimulus index (row = array index)."""
+    references = []
+    if indexes.stimuli is None:
+        return references
+    for relpath, key in [(STIMULI_ANNOTATIONS_PATH, "annotations"), (AOIS_PATH, "aois")]:
+        path = os.path.join(root, relpath)
+        if not os.path.exists(path):
+            continue
+        reference = Reference(relpath, f"{key}[].stimulus_id", "stimuli")
+        _check_values(reference, ((index, str(item.get("stimulus_id")))
+                                  for index, item in iter_json_array(path, key) if isinstance(item, dict)),
+                      indexes.stimuli)
+        references.append(reference)
+    return references
+
+
+def check_container(container_path: str, indexes: IdIndexes, source: str) -> List[Reference]:
+    """Participant groups and trial stimulus_id attributes of the gaze container (row = trial path)."""
+    participants = Reference(source, "participant", "participants")
+    stimuli = Reference(source, "stimulus_id", "stimuli")
+    seen_participants = set()
+    for pid, tid, stimulus in container_trial_keys(container_path):
+        if indexes.participants is not None and pid not in seen_participants:
+            seen_participants.add(pid)
+            _check_values(participants, [(pid, pid)], indexes.participants)
+        if indexes.stimuli is not None and stimulus is not None:
+            _check_values(stimuli, [(f"{pid}/{tid}", stimulus)], indexes.stimuli)
+    return [r for r, ids in [(participants, indexes.participants), (stimuli, indexes.stimuli)] if ids is not None]
+
+
+def check_integrity(root: str = ".", container_path: Optional[str] = None,
+                    chunk_rows: int = CHUNK_ROWS) -> Dict:
+    """Build the indexes and check every foreign key of the study at ``root``."""
+    indexes = build_indexes(root, container_path)
+    references = check_json_references(root, indexes)
+    for table in results_tables(root):
+        references.extend(check_table(root, table, indexes, chunk_rows))
+    container_path = container_path or os.path.join(root, CONTAINER_PATH)
+    if os.path.exists(container_path):
+        references.extend(check_container(container_path, indexes, os.path.relpath(container_path, root)))
+    return {
+        "indexes": indexes.summary(),
+        "checked": sum(r.checked for r in references),
+        "dangling": sum(r.dangling for r in references),
+        "references": [r.to_dict() for r in references],
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check cross-file id references of a study")
+    parser.add_argument("root", nargs="?", default=".", help="Study directory")
+    parser.add_argument("--container", default=None, help=f"Gaze container (default: {CONTAINER_PATH})")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="CSV rows read per chunk")
+    parser.add_argument("--output", default=REPORT_PATH)
+    args = parser.parse_args()
+
+    report = check_integrity(args.root, args.container, args.chunk_rows)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    for name, index in report["indexes"].items():
+        print(f"🗂️ {name}: {index['size']} id(s) from {index['source']}")
+    for reference in report["references"]:
+        if reference["dangling"]:
+            rows = ", ".join(str(e["row"]) for e in reference["examples"][:10])
+            print(f"❌ {reference['source']} {reference['key']} → {reference['target']}: "
+                  f"{reference['dangling']} dangling (rows {rows}{' ...' if reference['dangling'] > 10 else ''})")
+    print(f"🔗 {report['checked']} reference(s) checked, {report['dangling']} dangling: {args.output}")
+    return 1 if report["dangling"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,141 +1,370 @@
 import os
 import json
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend for headless environments
-import matplotlib.pyplot as plt
-import numpy as np
 
-def check_metadata():
-    try:
-        with open("metadata.json") as f:
-            data = json.load(f)
-        required = ["study_title", "paradigm", "task_description"]
-        if all(k in data and data[k] for k in required):
+from study_snapshot import is_archive, open_study, study_scope
+from aoi_validation import aoi_content_factor
+
+# Checks take a study root (directory, .zip or .tar archive) or an open
+# StudySnapshot, which score_study shares across all of them.
+
+# Plotting libraries are imported only when a PNG chart is requested, so
+# scoring and the default SVG chart start without them
+
+def _nonempty_dir(study, relpath):
+    return study.isdir(relpath) and len(study.listdir(relpath)) > 0
+
+def check_metadata(root="."):
+    with study_scope(root) as study:
+        try:
+            data = study.load_json("metadata.json")
+            required = ["study_title", "paradigm", "task_description"]
+            if all(k in data and data[k] for k in required):
+                return 1.0
+            study.note("metadata.json: missing or empty " + ", ".join(k for k in required if not data.get(k)))
+            if any(k in data for k in required):
+                return 0.5
+            else:
+                return 0.25
+        except Exception as e:
+            study.note(f"metadata.json: {type(e).__name__}: {e}")
+            return 0
+
+def check_participants(root="."):
+    with study_scope(root) as study:
+        path = "participants/participants.json"
+        if not study.exists(path):
+            return 0
+        try:
+            data = study.load_json(path)
+            if "participants" in data and len(data["participants"]) > 0:
+                fields = ["age", "gender", "handedness", "vision"]
+                has_fields = all(all(field in p for field in fields) for p in data["participants"])
+                if has_fields:
+                    return 1.0
+                else:
+                    study.note(f"{path}: participants lack some of " + ", ".join(fields))
+                    return 0.75
+            else:
+                study.note(f"{path}: no participants listed")
+                return 0.25
+        except Exception as e:
+            study.note(f"{path}: {type(e).__name__}: {e}")
+            return 0
+
+def check_equipment(root="."):
+    with study_scope(root) as study:
+        files = ["equipment/tracker_specs.json", "equipment/screen_setup.json", "equipment/software_env.json"]
+        found = sum(study.exists(f) for f in files)
+        if found == 3:
             return 1.0
-        elif any(k in data for k in required):
+        elif found == 2:
+            return 0.75
+        elif found == 1:
             return 0.5
         else:
-            return 0.25
-    except Exception:
-        return 0
+            return 0
 
-def check_participants():
-    path = "participants/participants.json"
-    if not os.path.exists(path):
-        return 0
-    try:
-        with open(path) as f:
-            data = json.load(f)
-        if "participants" in data and len(data["participants"]) > 0:
-            fields = ["age", "gender", "handedness", "vision"]
-            has_fields = all(all(field in p for field in fields) for p in data["participants"])
-            if has_fields:
+def check_stimuli(root="."):
+    with study_scope(root) as study:
+        score = 0
+        if study.exists("stimuli/stimuli_metadata.json"):
+            score += 0.4
+        if study.exists("stimuli/stimuli_annotations.json"):
+            score += 0.3
+        if _nonempty_dir(study, "stimuli/stimuli_raw"):
+            score += 0.3
+        return min(score, 1.0)
+
+def check_aois(root="."):
+    with study_scope(root) as study:
+        if study.exists("aois/aois_definition.json"):
+            # Scaled by the share of AOIs that resolve to a stimulus and fit its image
+            content = aoi_content_factor(study)
+            if _nonempty_dir(study, "aois/aois_visualizations"):
+                return round(content, 4)
+            else:
+                return round(0.75 * content, 4)
+        else:
+            return 0
+
+def check_data_quality(root="."):
+    with study_scope(root) as study:
+        if study.exists("collection/protocol.json"):
+            if _nonempty_dir(study, "collection/logs"):
                 return 1.0
             else:
                 return 0.75
         else:
-            return 0.25
-    except Exception:
-        return 0
-
-def check_equipment():
-    files = ["equipment/tracker_specs.json", "equipment/screen_setup.json", "equipment/software_env.json"]
-    found = sum(os.path.exists(f) for f in files)
-    if found == 3:
-        return 1.0
-    elif found == 2:
-        return 0.75
-    elif found == 1:
-        return 0.5
-    else:
-        return 0
-
-def check_stimuli():
-    meta = "stimuli/stimuli_metadata.json"
-    ann = "stimuli/stimuli_annotations.json"
-    raw = "stimuli/stimuli_raw"
-    score = 0
-    if os.path.exists(meta):
-        score += 0.4
-    if os.path.exists(ann):
-        score += 0.3
-    if os.path.isdir(raw) and len(os.listdir(raw)) > 0:
-        score += 0.3
-    return min(score, 1.0)
-
-def check_aois():
-    aois = "aois/aois_definition.json"
-    vis = "aois/aois_visualizations"
-    if os.path.exists(aois):
-        if os.path.isdir(vis) and len(os.listdir(vis)) > 0:
-            return 1.0
+            return 0
+
+def check_preprocessing(root="."):
+    with study_scope(root) as study:
+        if study.exists("preprocessing/preprocessing.json"):
+            if _nonempty_dir(study, "preprocessing/scripts"):
+                return 1.0
+            else:
+                return 0.75
         else:
-            return 0.75
-    else:
-        return 0
+            return 0
 
-def check_data_quality():
-    proto = "collection/protocol.json"
-    logs = "collection/logs"
-    if os.path.exists(proto):
-        if os.path.isdir(logs) and len(os.listdir(logs)) > 0:
-            return 1.0
+def check_analysis(root="."):
+    with study_scope(root) as study:
+        tables = "analysis/results_tables"
+        vis = "analysis/visualizations"
+        score = 0
+        if study.exists("analysis/analysis.json"):
+            score += 0.5
+        if study.exists(tables) and len(study.listdir(tables)) > 0:
+            score += 0.25
+        if study.exists(vis) and len(study.listdir(vis)) > 0:
+            score += 0.25
+        return min(score, 1.0)
+
+def check_threats(root="."):
+    with study_scope(root) as study:
+        val = "validity/validity.json"
+        if study.exists(val):
+            data = study.load_json(val)
+            if "threats" in data and len(data["threats"]) > 0:
+                return 1.0
+            else:
+                study.note(f"{val}: no threats listed")
+                return 0.5
         else:
-            return 0.75
-    else:
-        return 0
+            return 0
 
-def check_preprocessing():
-    pre = "preprocessing/preprocessing.json"
-    scripts = "preprocessing/scripts"
-    if os.path.exists(pre):
-        if os.path.isdir(scripts) and len(os.listdir(scripts)) > 0:
+def check_reproducibility(root="."):
+    with study_scope(root) as study:
+        files = ["README.md", "LICENSE", "reproducibility/reproducibility.json", "CITATION.cff"]
+        found = sum(study.exists(f) for f in files)
+        if found == len(files):
             return 1.0
-        else:
+        elif found >= 3:
             return 0.75
-    else:
-        return 0
-
-def check_analysis():
-    ana = "analysis/analysis.json"
-    tables = "analysis/results_tables"
-    vis = "analysis/visualizations"
-    score = 0
-    if os.path.exists(ana):
-        score += 0.5
-    if os.path.exists(tables) and len(os.listdir(tables)) > 0:
-        score += 0.25
-    if os.path.exists(vis) and len(os.listdir(vis)) > 0:
-        score += 0.25
-    return min(score, 1.0)
-
-def check_threats():
-    val = "validity/validity.json"
-    if os.path.exists(val):
-        with open(val) as f:
-            data = json.load(f)
-        if "threats" in data and len(data["threats"]) > 0:
-            return 1.0
-        else:
+        elif found >= 2:
             return 0.5
+        elif found >= 1:
+            return 0.25
+        else:
+            return 0
+
+# Scored components in report order
+CHECKS = {
+    "metadata": check_metadata,
+    "participants": check_participants,
+    "equipment": check_equipment,
+    "stimuli": check_stimuli,
+    "aois": check_aois,
+    "data_quality": check_data_quality,
+    "preprocessing": check_preprocessing,
+    "analysis": check_analysis,
+    "threats": check_threats,
+    "reproducibility": check_reproducibility,
+}
+
+# Paths each check consults, for the fingerprint cache (see score_cache.py)
+COMPONENT_INPUTS = {
+    "metadata": [("metadata.json", "file")],
+    "participants": [("participants/participants.json", "file")],
+    "equipment": [("equipment/tracker_specs.json", "exists"), ("equipment/screen_setup.json", "exists"),
+                  ("equipment/software_env.json", "exists")],
+    "stimuli": [("stimuli/stimuli_metadata.json", "exists"), ("stimuli/stimuli_annotations.json", "exists"),
+                ("stimuli/stimuli_raw", "dir")],
+    "aois": [("aois/aois_definition.json", "file"), ("aois/aois_visualizations", "dir"),
+             ("stimuli/stimuli_metadata.json", "file"), ("stimuli/stimuli_raw", "files")],
+    "data_quality": [("collection/protocol.json", "exists"), ("collection/logs", "dir")],
+    "preprocessing": [("preprocessing/preprocessing.json", "exists"), ("preprocessing/scripts", "dir")],
+    "analysis": [("analysis/analysis.json", "exists"), ("analysis/results_tables", "dir"),
+                 ("analysis/visualizations", "dir")],
+    "threats": [("validity/validity.json", "file")],
+    "reproducibility": [("README.md", "exists"), ("LICENSE", "exists"),
+                        ("reproducibility/reproducibility.json", "exists"), ("CITATION.cff", "exists")],
+}
+
+def score_study(root="."):
+    """Score the study rooted at ``root`` without changing the working directory.
+
+    ``root`` may be a directory or a zip/tar archive of a study; archives are
+    scored from their member index without being extracted. Only reads
+    files, so several studies can be scored from threads at once.
+    """
+    with study_scope(root) as study:
+        return {name: check(study) for name, check in CHECKS.items()}
+
+def _input_deductions(study, name):
+    """Missing or empty declared inputs of a component, as readable reasons"""
+    reasons = []
+    for relpath, kind in COMPONENT_INPUTS.get(name, []):
+        if not study.exists(relpath):
+            reasons.append(f"missing {relpath}")
+        elif kind in ("dir", "files") and study.isdir(relpath) and not study.listdir(relpath):
+            reasons.append(f"empty {relpath}")
+    return reasons
+
+def diagnose_study(root=".", profile_path=None):
+    """Score a study and record per-check diagnostics.
+
+    Returns (scores, diagnostics) where diagnostics maps each component to
+    its score, the files consulted, bytes read, elapsed seconds, the reasons
+    for any deduction and the error, if the check raised (scored 0). With
+    ``profile_path`` the whole run is profiled and the cProfile stats are
+    dumped there (inspect with ``python -m pstats``).
+    """
+    import time
+    profiler = None
+    if profile_path:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    study = open_study(root)
+    study.take_trace()
+    scores, diagnostics = {}, {}
+    try:
+        for name, check in CHECKS.items():
+            start = time.perf_counter()
+            error = None
+            try:
+                scores[name] = check(study)
+            except Exception as e:
+                scores[name] = 0
+                error = f"{type(e).__name__}: {e}"
+            elapsed = time.perf_counter() - start
+            trace = study.take_trace()
+            deductions = trace["notes"]
+            if scores[name] < 1.0:
+                deductions += _input_deductions(study, name)
+                study.take_trace()
+            diagnostics[name] = {
+                "score": scores[name],
+                "files": trace["files"],
+                "bytes_read": trace["bytes_read"],
+                "elapsed_s": round(elapsed, 6),
+                "deductions": deductions,
+                "error": error,
+            }
+    finally:
+        if study is not root:
+            study.close()
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(os.path.dirname(os.path.abspath(profile_path)), exist_ok=True)
+            profiler.dump_stats(profile_path)
+    return scores, diagnostics
+
+def write_diagnostics(diagnostics, output_dir="outputs"):
+    """Write diagnostics.json with per-check timing, inputs and deductions"""
+    os.makedirs(output_dir, exist_ok=True)
+    total = sum(d["elapsed_s"] for d in diagnostics.values())
+    with open(os.path.join(output_dir, "diagnostics.json"), "w") as f:
+        json.dump({"total_elapsed_s": round(total, 6), "checks": diagnostics}, f, indent=2)
+
+def write_reports(scores, output_dir="outputs", chart_name="score.svg", diagnostics=None):
+    """Write report.json and report.md for the given scores"""
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "report.json"), "w") as f:
+        json.dump(scores, f, indent=2)
+    with open(os.path.join(output_dir, "report.md"), "w") as f:
+        f.write("# Repl.ET Replicability Report\n\n")
+        for k, v in scores.items():
+            f.write(f"- **{k}**: {v}\n")
+        f.write(f"\nVeja {chart_name} para o gráfico radar.\n")
+        if diagnostics:
+            f.write("\n## Diagnostics\n\n")
+            f.write("| Check | Score | Files | Bytes read | Time (ms) | Deductions / error |\n")
+            f.write("|-------|-------|-------|------------|-----------|--------------------|\n")
+            # Slowest checks first
+            for k, d in sorted(diagnostics.items(), key=lambda item: -item[1]["elapsed_s"]):
+                reasons = ([d["error"]] if d["error"] else []) + d["deductions"]
+                f.write(f"| {k} | {d['score']} | {len(d['files'])} | {d['bytes_read']} | "
+                        f"{d['elapsed_s']*1000:.2f} | {'; '.join(reasons) or '-'} |\n")
+    if diagnostics:
+        write_diagnostics(diagnostics, output_dir)
+
+# Enhanced spider graph labels, in chart order
+CRITERIA_LABELS = {
+    'metadata': 'Study\nMetadata',
+    'participants': 'Participant\nInfo',
+    'equipment': 'Equipment\nSpecs',
+    'stimuli': 'Stimuli\n& Materials',
+    'aois': 'Areas of\nInterest',
+    'data_quality': 'Data Quality\n& Collection',
+    'preprocessing': 'Data\nPreprocessing',
+    'analysis': 'Statistical\nAnalysis',
+    'threats': 'Validity\nThreats',
+    'reproducibility': 'Reproducibility\nMaterials'
+}
+
+def score_color(overall_score):
+    """Chart colour for an overall score"""
+    if overall_score >= 0.8:
+        return '#2ecc71'  # Green for excellent
+    elif overall_score >= 0.6:
+        return '#f39c12'  # Orange for good
+    elif overall_score >= 0.4:
+        return '#e74c3c'  # Red for needs improvement
     else:
-        return 0
-
-def check_reproducibility():
-    files = ["README.md", "LICENSE", "reproducibility/reproducibility.json", "CITATION.cff"]
-    found = sum(os.path.exists(f) for f in files)
-    if found == len(files):
-        return 1.0
-    elif found >= 3:
-        return 0.75
-    elif found >= 2:
-        return 0.5
-    elif found >= 1:
-        return 0.25
-    else:
-        return 0
+        return '#95a5a6'  # Gray for baseline/template
 
-def update_readme_with_assessment(scores, overall_score, png_path):
+def render_score_svg(scores, svg_path):
+    """Draw the radar chart of component scores to ``svg_path`` without plotting libraries."""
+    from radar_svg import write_radar_svg
+    overall_score = sum(scores.values()) / len(scores)
+    write_radar_svg(svg_path, list(CRITERIA_LABELS.values()),
+                    [scores.get(c, 0.0) for c in CRITERIA_LABELS],
+                    f'ReplET Reproducibility Analysis\n{overall_score*100:.1f}% Overall Score',
+                    score_color(overall_score))
+
+def render_score_chart(scores, png_path):
+    """Draw the radar chart of component scores to ``png_path`` with matplotlib."""
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend for headless environments
+    import matplotlib.pyplot as plt
+    import numpy as np
+    
+    # Get criteria in consistent order
+    criteria = list(CRITERIA_LABELS.keys())
+    labels = [CRITERIA_LABELS[c] for c in criteria]
+    values = [scores.get(c, 0.0) for c in criteria]
+    
+    # Close the radar chart
+    angles = np.linspace(0, 2*np.pi, len(criteria), endpoint=False).tolist()
+    values += values[:1]
+    angles += angles[:1]
+    
+    # Calculate overall score for coloring
+    overall_score = sum(scores.values()) / len(scores)
+    color = score_color(overall_score)
+    
+    # Create the spider plot
+    fig, ax = plt.subplots(figsize=(10, 10), subplot_kw=dict(polar=True))
+    ax.plot(angles, values, 'o-', linewidth=3, color=color, markersize=8)
+    ax.fill(angles, values, alpha=0.25, color=color)
+    
+    # Customize the chart
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(labels, fontsize=11)
+    ax.set_ylim(0, 1.0)
+    ax.set_yticks([0.2, 0.4, 0.6, 0.8, 1.0])
+    ax.set_yticklabels(['0.2', '0.4', '0.6', '0.8', '1.0'], fontsize=10)
+    ax.grid(True, alpha=0.3)
+    
+    # Add title with score
+    plt.title(f'ReplET Reproducibility Analysis\n{overall_score*100:.1f}% Overall Score', 
+              fontsize=16, fontweight='bold', pad=30)
+    
+    # Add value labels for non-zero scores
+    for angle, value, label in zip(angles[:-1], values[:-1], labels):
+        if value > 0.05:  # Only show labels for significant values
+            ax.text(angle, value + 0.08, f'{value:.2f}', 
+                   ha='center', va='center', fontsize=10, fontweight='bold',
+                   bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.9, edgecolor=color))
+    
+    plt.tight_layout()
+    
+    plt.savefig(png_path)
+    plt.close()
+
+def update_readme_with_assessment(scores, overall_score, png_path, readme_path="README.md"):
     """Update README.md with current assessment results"""
     try:
         # Map scores to readable names
@@ -205,7 +434,6 @@ def update_readme_with_assessment(scores, overall_score, png_path):
 """
         
         # Read current README
-        readme_path = 'README.md'
         if os.path.exists(readme_path):
             with open(readme_path, 'r', encoding='utf-8') as f:
                 content = f.read()
@@ -252,115 +480,86 @@ def update_readme_with_assessment(scores, overall_score, png_path):
     except Exception as e:
         print(f"⚠️ Warning: Could not update README: {e}")
 
-def main():
-    scores = {
-        "metadata": check_metadata(),
-        "participants": check_participants(),
-        "equipment": check_equipment(),
-        "stimuli": check_stimuli(),
-        "aois": check_aois(),
-        "data_quality": check_data_quality(),
-        "preprocessing": check_preprocessing(),
-        "analysis": check_analysis(),
-        "threats": check_threats(),
-        "reproducibility": check_reproducibility()
-    }
+def main(root=".", force=False, png=False, diagnostics=False, profile_path=None):
+    """Score ``root`` and write its reports.
+
+    A study directory gets its reports in ``<root>/outputs`` and its
+    README.md updated. An archive is scored without extracting it, every
+    run, and its reports are written to ``outputs`` in the working directory.
+    """
+    from score_cache import SCORE_CACHE_PATH, mark_rendered, rendered_scores, score_with_cache
+    
+    archive = is_archive(root)
+    output_dir = "outputs" if archive else os.path.join(root, "outputs")
+    cache_path = None if archive else os.path.join(root, SCORE_CACHE_PATH)
+    check_diagnostics = None
+    if diagnostics or profile_path:
+        # Diagnostics time every check, so the cache is bypassed
+        scores, check_diagnostics = diagnose_study(root, profile_path)
+        recomputed = list(scores)
+        force = True
+    elif archive:
+        # The fingerprint cache tracks files in a directory, not archive members
+        scores = score_study(root)
+        recomputed = list(scores)
+        force = True
+    else:
+        # Only components whose input files changed are recomputed
+        scores, recomputed = score_with_cache(root, CHECKS, COMPONENT_INPUTS, cache_path)
     
     # Create output directory
-    import os
-    output_dir = "outputs"
     os.makedirs(output_dir, exist_ok=True)
-    
-    # Salva JSON
     json_path = os.path.join(output_dir, "report.json")
-    with open(json_path, "w") as f:
-        json.dump(scores, f, indent=2)
-    
-    # Enhanced spider graph with better labels and styling
-    criteria_labels = {
-        'metadata': 'Study\nMetadata',
-        'participants': 'Participant\nInfo',
-        'equipment': 'Equipment\nSpecs',
-        'stimuli': 'Stimuli\n& Materials',
-        'aois': 'Areas of\nInterest',
-        'data_quality': 'Data Quality\n& Collection',
-        'preprocessing': 'Data\nPreprocessing',
-        'analysis': 'Statistical\nAnalysis',
-        'threats': 'Validity\nThreats',
-        'reproducibility': 'Reproducibility\nMaterials'
-    }
+    chart_path = os.path.join(output_dir, "score.png" if png else "score.svg")
+    md_path = os.path.join(output_dir, "report.md")
     
-    # Get criteria in consistent order
-    criteria = list(criteria_labels.keys())
-    labels = [criteria_labels[c] for c in criteria]
-    values = [scores.get(c, 0.0) for c in criteria]
+    outputs_present = all(os.path.exists(p) for p in (json_path, chart_path, md_path))
+    if not force and scores == rendered_scores(cache_path) and outputs_present:
+        overall_score = sum(scores.values()) / len(scores)
+        print(f"♻️ Scores unchanged since last run; kept reports in {output_dir}")
+        print(f"🏆 Overall Reproducibility Score: {overall_score:.3f}/1.0 ({overall_score*100:.1f}%)")
+        return
+    if recomputed:
+        print(f"🔄 Recomputed: {', '.join(recomputed)}")
     
-    # Close the radar chart
-    angles = np.linspace(0, 2*np.pi, len(criteria), endpoint=False).tolist()
-    values += values[:1]
-    angles += angles[:1]
+    # Salva JSON e gera report.md
+    write_reports(scores, output_dir, os.path.basename(chart_path), check_diagnostics)
     
-    # Calculate overall score for coloring
-    overall_score = sum(scores.values()) / len(scores)
-    if overall_score >= 0.8:
-        color = '#2ecc71'  # Green for excellent
-    elif overall_score >= 0.6:
-        color = '#f39c12'  # Orange for good
-    elif overall_score >= 0.4:
-        color = '#e74c3c'  # Red for needs improvement
+    if png:
+        render_score_chart(scores, chart_path)
     else:
-        color = '#95a5a6'  # Gray for baseline/template
-    
-    # Create the spider plot
-    fig, ax = plt.subplots(figsize=(10, 10), subplot_kw=dict(polar=True))
-    ax.plot(angles, values, 'o-', linewidth=3, color=color, markersize=8)
-    ax.fill(angles, values, alpha=0.25, color=color)
-    
-    # Customize the chart
-    ax.set_xticks(angles[:-1])
-    ax.set_xticklabels(labels, fontsize=11)
-    ax.set_ylim(0, 1.0)
-    ax.set_yticks([0.2, 0.4, 0.6, 0.8, 1.0])
-    ax.set_yticklabels(['0.2', '0.4', '0.6', '0.8', '1.0'], fontsize=10)
-    ax.grid(True, alpha=0.3)
-    
-    # Add title with score
-    plt.title(f'ReplET Reproducibility Analysis\n{overall_score*100:.1f}% Overall Score', 
-              fontsize=16, fontweight='bold', pad=30)
-    
-    # Add value labels for non-zero scores
-    for angle, value, label in zip(angles[:-1], values[:-1], labels):
-        if value > 0.05:  # Only show labels for significant values
-            ax.text(angle, value + 0.08, f'{value:.2f}', 
-                   ha='center', va='center', fontsize=10, fontweight='bold',
-                   bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.9, edgecolor=color))
-    
-    plt.tight_layout()
-    
-    png_path = os.path.join(output_dir, "score.png")
-    plt.savefig(png_path)
-    
-    # Gera report.md
-    md_path = os.path.join(output_dir, "report.md")
-    with open(md_path, "w") as f:
-        f.write("# Repl.ET Replicability Report\n\n")
-        for k, v in scores.items():
-            f.write(f"- **{k}**: {v}\n")
-        f.write(f"\nVeja score.png para o gráfico radar.\n")
+        render_score_svg(scores, chart_path)
     
     # Print location of generated files
     print(f"📊 Reproducibility Report Generated!")
     print(f"📁 Output directory: {output_dir}")
     print(f"📄 JSON report: {json_path}")
-    print(f"📈 Radar chart: {png_path}")
+    print(f"📈 Radar chart: {chart_path}")
     print(f"📝 Markdown report: {md_path}")
+    if check_diagnostics:
+        print(f"🩺 Diagnostics: {os.path.join(output_dir, 'diagnostics.json')}")
+    if profile_path:
+        print(f"⏱️ Profile: {profile_path} (python -m pstats {profile_path})")
     
     # Calculate overall score
     overall_score = sum(scores.values()) / len(scores)
     print(f"\n🏆 Overall Reproducibility Score: {overall_score:.3f}/1.0 ({overall_score*100:.1f}%)")
     
+    if archive:
+        return
     # Update README with assessment
-    update_readme_with_assessment(scores, overall_score, png_path)
+    update_readme_with_assessment(scores, overall_score, os.path.relpath(chart_path, root),
+                                  os.path.join(root, "README.md"))
+    mark_rendered(scores, cache_path)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Score a REPL.et study directory or .zip/.tar archive")
+    parser.add_argument("root", nargs="?", default=".", help="Study directory or archive (default: current directory)")
+    parser.add_argument("--force", action="store_true", help="Recompute and regenerate all outputs")
+    parser.add_argument("--png", action="store_true", help="Render the radar chart as PNG with matplotlib")
+    parser.add_argument("--diagnostics", action="store_true",
+                        help="Record per-check timing, files, bytes read and deductions in outputs/diagnostics.json")
+    parser.add_argument("--profile", metavar="PATH", default=None, help="Dump cProfile stats of the scoring run to PATH")
+    args = parser.parse_args()
+    main(args.root, force=args.force, png=args.png, diagnostics=args.diagnostics, profile_path=args.profile) 
\ No newline at end of file
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Offline registry of the JSON schemas a validation run needs.
+
+Local schemas (schemas/*.schema.json) are indexed by file URI, by their $id
+when they declare one, and by relative path ("schemas/x.schema.json" and
+"x.schema.json"), so a `$schema` or `$ref` that points at a moved or
+copied study's schemas/ directory still resolves to the repository copy.
+Every `$ref` is resolved from memory through a referencing.Registry.
+
+JSON Schema meta-schemas ship with jsonschema and are never fetched. Any
+other remote schema goes through a persistent on-disk cache; with
+offline=True (or REPLET_SCHEMA_OFFLINE=1) a cache miss is an error instead
+of a request, so runs behave identically in air-gapped environments.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Set
+from urllib.parse import urldefrag, urljoin, urlparse
+from urllib.request import url2pathname
+
+REPO_SCHEMA_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "schemas"))
+DEFAULT_CACHE_DIR = os.environ.get(
+    "REPLET_SCHEMA_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "repl-et", "schemas"))
+SCHEMA_SUFFIX = ".schema.json"
+FETCH_TIMEOUT_S = 10
+
+
+def file_uri(path: str) -> str:
+    return Path(os.path.abspath(path)).as_uri()
+
+
+def _uri_path(uri: str) -> str:
+    return url2pathname(urlparse(uri).path)
+
+
+class SchemaRegistry:
+    def __init__(self, schema_dirs: Optional[Iterable[str]] = None, cache_dir: str = DEFAULT_CACHE_DIR,
+                 offline: Optional[bool] = None):
+        self.cache_dir = cache_dir
+        self.offline = os.environ.get("REPLET_SCHEMA_OFFLINE") == "1" if offline is None else offline
+        self._schemas: Dict[str, dict] = {}   # canonical URI ($id or file URI) -> schema
+        self._relpaths: Dict[str, str] = {}   # relative path -> file URI
+        self.fetched = 0
+        self._registry = None
+        self._hashes: Dict[str, str] = {}
+        for directory in (schema_dirs if schema_dirs is not None else [REPO_SCHEMA_DIR]):
+            self.add_directory(directory)
+
+    def add_directory(self, directory: str):
+        """Index the *.schema.json files of a directory; earlier directories win on name clashes."""
+        if not os.path.isdir(directory):
+            return
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(SCHEMA_SUFFIX):
+                continue
+            path = os.path.join(directory, name)
+            with open(path, encoding="utf-8") as f:
+                schema = json.load(f)
+            uri = file_uri(path)
+            self._schemas[uri] = schema
+            if isinstance(schema, dict) and isinstance(schema.get("$id"), str):
+                self._schemas.setdefault(urldefrag(schema["$id"])[0], schema)
+            self._relpaths.setdefault(f"{os.path.basename(os.path.normpath(directory))}/{name}", uri)
+            self._relpaths.setdefault(name, uri)
+        self._registry = None
+        self._hashes = {}
+
+    # -------------------- Resolution --------------------
+
+    def locate(self, schema_ref: str, base_path: Optional[str] = None) -> str:
+        """Canonical URI of a `$schema` value found in the file at ``base_path``."""
+        schema_ref = urldefrag(schema_ref)[0]
+        if urlparse(schema_ref).scheme in ("http", "https", "file"):
+            return schema_ref
+        base_dir = os.path.dirname(base_path) if base_path else "."
+        path = os.path.normpath(os.path.join(base_dir, schema_ref))
+        uri = file_uri(path)
+        if uri in self._schemas or os.path.isfile(path):
+            return uri
+        # Fall back on the indexed schema with the same relative path or name
+        parts = os.path.normpath(schema_ref).replace(os.sep, "/").split("/")
+        for key in ("/".join(parts[-2:]), parts[-1]):
+            if key in self._relpaths:
+                return self._relpaths[key]
+        return uri
+
+    def get(self, uri: str) -> dict:
+        """Schema document for a canonical URI, loaded at most once."""
+        uri = urldefrag(uri)[0]
+        if uri in self._schemas:
+            return self._schemas[uri]
+        scheme = urlparse(uri).scheme
+        if scheme == "file" or not scheme:
+            path = _uri_path(uri) if scheme else uri
+            with open(path, encoding="utf-8") as f:
+                schema = json.load(f)
+        else:
+            schema = self._metaschema(uri)
+            if schema is None:
+                schema = self._fetch(uri)
+        self._schemas[uri] = schema
+        return schema
+
+    @staticmethod
+    def _metaschema(uri: str) -> Optional[dict]:
+        from jsonschema_specifications import REGISTRY
+        try:
+            return REGISTRY.contents(uri)
+        except LookupError:
+            return None
+
+    def cache_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _fetch(self, url: str) -> dict:
+        path = self.cache_path(url)
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+        if self.offline:
+            raise LookupError(f"{url} is not in the schema cache ({self.cache_dir}) and fetching is disabled")
+        import requests
+        response = requests.get(url, timeout=FETCH_TIMEOUT_S)
+        response.raise_for_status()
+        schema = response.json()
+        self.fetched += 1
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".schema-", suffix=".tmp", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(schema, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return schema
+
+    # -------------------- Dependencies --------------------
+
+    def dependencies(self, uri: str) -> Set[str]:
+        """URIs of the schema at ``uri`` and of every schema it references, transitively."""
+        seen: Set[str] = set()
+        pending = [urldefrag(uri)[0]]
+        while pending:
+            current = pending.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            schema = self.get(current)
+            base = schema.get("$id", current) if isinstance(schema, dict) else current
+            for ref in _refs(schema):
+                target = urldefrag(urljoin(base, ref))[0]
+                if target and target not in seen:
+                    pending.append(target)
+        return seen
+
+    def schema_hash(self, uri: str) -> str:
+        """sha256 over the schema at ``uri`` and everything it references.
+
+        Editing any schema reachable through `$ref` changes the hash of every
+        schema that depends on it.
+        """
+        uri = urldefrag(uri)[0]
+        if uri not in self._hashes:
+            digest = hashlib.sha256()
+            for dependency in sorted(self.dependencies(uri)):
+                digest.update(dependency.encode("utf-8"))
+                digest.update(json.dumps(self.get(dependency), sort_keys=True).encode("utf-8"))
+            self._hashes[uri] = digest.hexdigest()
+        return self._hashes[uri]
+
+    # -------------------- Validators --------------------
+
+    def referencing_registry(self):
+        """referencing.Registry that retrieves every $ref through this registry."""
+        if self._registry is None:
+            from referencing import Registry, Resource
+            from referencing.jsonschema import DRAFT7
+
+            def retrieve(uri):
+                return Resource.from_contents(self.get(uri), default_specification=DRAFT7)
+
+            self._registry = Registry(retrieve=retrieve)
+        return self._registry
+
+    def validator(self, uri: str):
+        """Compiled validator for the schema at ``uri``; relative $refs resolve against it."""
+        from jsonschema.validators import validator_for
+        schema = self.get(uri)
+        cls = validator_for(schema)
+        cls.check_schema(schema)
+        if isinstance(schema, dict) and "$id" not in schema:
+            schema = dict(schema, **{"$id": uri})
+        return cls(schema, registry=self.referencing_registry())
+
+
+def _refs(schema) -> Iterator[str]:
+    """Every `$ref` value in a schema document."""
+    if isinstance(schema, dict):
+        for key, value in schema.items():
+            if key == "$ref" and isinstance(value, str):
+                yield value
+            else:
+                yield from _refs(value)
+    elif isinstance(schema, list):
+        for item in schema:
+            yield from _refs(item)
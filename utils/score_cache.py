@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of component scores keyed by input fingerprints.
+
+Each scored component declares the paths its check consults. The cache
+(outputs/score_cache.json) stores, per component, a fingerprint of every
+input next to the score it produced. On a rerun a component is recomputed
+only when one of its fingerprints changed:
+
+- files: (mtime, size) is compared first; the content hash is recomputed
+  only when those differ, so a touched but unchanged file is still a hit
+- directories: the sorted entry listing
+- "files" directories (whose files' contents a check reads, such as the
+  stimulus images behind the AOI bounds check): each entry's name, size
+  and mtime, so replacing a file under the same name is noticed
+- existence-only inputs: whether the path exists
+
+The cache header holds a hash of the scorer's source (the modules defining
+the checks and the local modules they import); when it changes, every
+component is recomputed.
+
+The cache also records the scores the last full set of outputs (chart,
+reports, README) was rendered from, so callers can skip regenerating them
+when nothing changed.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import tempfile
+from typing import Callable, Dict, List, Optional, Tuple
+
+SCORE_CACHE_PATH = os.path.join("outputs", "score_cache.json")
+CACHE_VERSION = 1
+RENDERED_KEY = "rendered_scores"
+
+# (relative path, kind) with kind one of "file", "dir", "files", "exists"
+ComponentInput = Tuple[str, str]
+
+
+def directory_entries_digest(path: str) -> Optional[str]:
+    """sha256 over the (name, size, mtime_ns) of every entry of a directory; None if missing."""
+    try:
+        entries = sorted(os.scandir(path), key=lambda entry: entry.name)
+    except OSError:
+        return None
+    digest = hashlib.sha256()
+    for entry in entries:
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        digest.update(f"{entry.name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def scorer_source_hash(checks: Dict[str, Callable[[str], float]]) -> str:
+    """sha256 over the source of the modules defining ``checks`` and of the modules,
+    functions and classes they import from the same directory."""
+    pending = [sys.modules.get(getattr(check, "__module__", None) or "") for check in checks.values()]
+    local_dirs = {os.path.dirname(os.path.abspath(m.__file__)) for m in pending if getattr(m, "__file__", None)}
+    sources = {}
+    while pending:
+        module = pending.pop()
+        path = os.path.abspath(getattr(module, "__file__", None) or "")
+        if path in sources or os.path.dirname(path) not in local_dirs or not path.endswith(".py"):
+            continue
+        with open(path, "rb") as f:
+            sources[path] = f.read()
+        for value in vars(module).values():
+            name = value.__name__ if isinstance(value, type(sys)) else getattr(value, "__module__", None)
+            if isinstance(name, str) and name in sys.modules:
+                pending.append(sys.modules[name])
+    digest = hashlib.sha256()
+    for path in sorted(sources):
+        digest.update(f"{os.path.basename(path)}\0{len(sources[path])}\n".encode("utf-8"))
+        digest.update(sources[path])
+    return digest.hexdigest()
+
+
+def fingerprint_input(root: str, relpath: str, kind: str, previous: Optional[Dict] = None) -> Optional[Dict]:
+    """Fingerprint of one input, reusing ``previous``'s hash if mtime and size match."""
+    path = os.path.join(root, relpath)
+    if kind == "exists":
+        return {"exists": os.path.exists(path)}
+    if kind == "dir":
+        if not os.path.isdir(path):
+            return None
+        names = "\n".join(sorted(os.listdir(path)))
+        return {"entries": hashlib.sha256(names.encode("utf-8")).hexdigest()}
+    if kind == "files":
+        digest = directory_entries_digest(path) if os.path.isdir(path) else None
+        return None if digest is None else {"files": digest}
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    fingerprint = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    if previous and all(previous.get(k) == v for k, v in fingerprint.items()):
+        fingerprint["sha256"] = previous["sha256"]
+    else:
+        # Imported here: unchanged runs never hash, and the scorer should start fast
+        from preprocessing_checkpoints import hash_file
+        fingerprint["sha256"] = hash_file(path)
+    return fingerprint
+
+
+def _same_content(old: Optional[Dict], new: Optional[Dict]) -> bool:
+    if old is None or new is None:
+        return old is new
+    # mtime and size only decide whether to rehash; the hash decides equality
+    if "sha256" in new:
+        return old.get("sha256") == new["sha256"]
+    return old == new
+
+
+def load_cache(path: str = SCORE_CACHE_PATH) -> Dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get("version") == CACHE_VERSION else {}
+
+
+def save_cache(cache: Dict, path: str = SCORE_CACHE_PATH):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".score_cache-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def score_with_cache(root: str, checks: Dict[str, Callable[[str], float]],
+                     inputs: Dict[str, List[ComponentInput]],
+                     cache_path: str = SCORE_CACHE_PATH) -> Tuple[Dict[str, float], List[str]]:
+    """Scores for ``root``, recomputing only components whose inputs changed.
+
+    Returns (scores, recomputed component names). Components without
+    declared inputs are always recomputed, and all are when the scorer's
+    source changed since the cache was written.
+    """
+    cache = load_cache(cache_path)
+    source = scorer_source_hash(checks)
+    cached_components = cache.get("components", {}) if cache.get("source") == source else {}
+    components = {}
+    scores = {}
+    recomputed = []
+    for name, check in checks.items():
+        entry = cached_components.get(name, {})
+        old_inputs = entry.get("inputs", {})
+        new_inputs = {relpath: fingerprint_input(root, relpath, kind, old_inputs.get(relpath))
+                      for relpath, kind in inputs.get(name, [])}
+        unchanged = (name in inputs and "score" in entry and set(old_inputs) == set(new_inputs)
+                     and all(_same_content(old_inputs[p], new_inputs[p]) for p in new_inputs))
+        if unchanged:
+            scores[name] = entry["score"]
+        else:
+            scores[name] = check(root)
+            recomputed.append(name)
+        components[name] = {"inputs": new_inputs, "score": scores[name]}
+
+    updated = {"version": CACHE_VERSION, "source": source, "components": components}
+    if RENDERED_KEY in cache:
+        updated[RENDERED_KEY] = cache[RENDERED_KEY]
+    save_cache(updated, cache_path)
+    return scores, recomputed
+
+
+def rendered_scores(cache_path: str = SCORE_CACHE_PATH) -> Optional[Dict[str, float]]:
+    """Scores the current outputs were rendered from, if recorded."""
+    return load_cache(cache_path).get(RENDERED_KEY)
+
+
+def mark_rendered(scores: Dict[str, float], cache_path: str = SCORE_CACHE_PATH):
+    cache = load_cache(cache_path) or {"version": CACHE_VERSION, "components": {}}
+    cache[RENDERED_KEY] = scores
+    save_cache(cache, cache_path)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Pixel to visual-angle geometry for a study's screen setup.
+
+equipment/screen_setup.json stores the screen diagonal (inches), the
+resolution (pixels) and the viewing distance (cm). ScreenGeometry derives the
+per-setup constants once (pixel pitch, screen centre, distance in pixels) and
+exposes closed-form vectorized transforms, so fixation and saccade detection
+can convert whole sample arrays without per-sample trigonometry in Python.
+Geometries are cached per setup file and shared by every participant.
+"""
+
+import os
+import json
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+SCREEN_SETUP_PATH = os.path.join("equipment", "screen_setup.json")
+CM_PER_INCH = 2.54
+
+_GEOMETRY_CACHE: Dict[Tuple[str, float], "ScreenGeometry"] = {}
+
+
+@dataclass(frozen=True)
+class ScreenGeometry:
+    screen_size_inch: float
+    resolution_px: Tuple[int, int]
+    distance_cm: float
+    # Derived once per setup
+    cm_per_px: float = field(init=False)
+    distance_px: float = field(init=False)
+    center_px: Tuple[float, float] = field(init=False)
+
+    def __post_init__(self):
+        width, height = self.resolution_px
+        if self.screen_size_inch <= 0 or width <= 0 or height <= 0 or self.distance_cm <= 0:
+            raise ValueError("Screen size, resolution and distance must be positive")
+        cm_per_px = self.screen_size_inch * CM_PER_INCH / np.hypot(width, height)
+        object.__setattr__(self, "cm_per_px", float(cm_per_px))
+        object.__setattr__(self, "distance_px", float(self.distance_cm / cm_per_px))
+        object.__setattr__(self, "center_px", ((width - 1) / 2.0, (height - 1) / 2.0))
+
+    @property
+    def deg_per_px(self) -> float:
+        """Visual angle of one pixel at the screen centre."""
+        return float(np.degrees(2.0 * np.arctan(0.5 / self.distance_px)))
+
+    def px_to_deg(self, x, y) -> Tuple[np.ndarray, np.ndarray]:
+        """Gaze position in degrees of visual angle from the screen centre."""
+        cx, cy = self.center_px
+        x_deg = np.degrees(np.arctan((np.asarray(x, dtype=np.float64) - cx) / self.distance_px))
+        y_deg = np.degrees(np.arctan((np.asarray(y, dtype=np.float64) - cy) / self.distance_px))
+        return x_deg, y_deg
+
+    def deg_to_px(self, x_deg, y_deg) -> Tuple[np.ndarray, np.ndarray]:
+        cx, cy = self.center_px
+        x = np.tan(np.radians(np.asarray(x_deg, dtype=np.float64))) * self.distance_px + cx
+        y = np.tan(np.radians(np.asarray(y_deg, dtype=np.float64))) * self.distance_px + cy
+        return x, y
+
+    def size_deg_to_px(self, size_deg: float) -> float:
+        """On-screen extent (pixels, at the centre) of an angle such as a dispersion threshold."""
+        return float(2.0 * self.distance_px * np.tan(np.radians(size_deg) / 2.0))
+
+    def velocity_deg(self, t, x, y) -> np.ndarray:
+        """Angular gaze velocity (degrees/second) from pixel samples."""
+        from gaze_events import compute_velocity
+        x_deg, y_deg = self.px_to_deg(x, y)
+        return compute_velocity(t, x_deg, y_deg)
+
+
+def geometry_from_setup(setup: Dict) -> ScreenGeometry:
+    missing = [k for k in ("screen_size_inch", "resolution_px", "distance_cm") if k not in setup]
+    if missing:
+        raise ValueError(f"screen_setup.json is missing {', '.join(missing)}")
+    width, height = setup["resolution_px"]
+    return ScreenGeometry(float(setup["screen_size_inch"]), (int(width), int(height)),
+                          float(setup["distance_cm"]))
+
+
+def load_screen_geometry(path: str = SCREEN_SETUP_PATH) -> ScreenGeometry:
+    """Geometry for a screen_setup.json, cached until the file changes."""
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    geometry = _GEOMETRY_CACHE.get(key)
+    if geometry is None:
+        with open(path, encoding="utf-8") as f:
+            geometry = geometry_from_setup(json.load(f))
+        for stale in [k for k in _GEOMETRY_CACHE if k[0] == key[0]]:
+            del _GEOMETRY_CACHE[stale]
+        _GEOMETRY_CACHE[key] = geometry
+    return geometry
+
+
+def geometry_for_study(study_root: str = ".") -> ScreenGeometry:
+    return load_screen_geometry(os.path.join(study_root, SCREEN_SETUP_PATH))
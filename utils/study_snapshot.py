@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Read-only snapshot of a REPL.et study directory.
+
+Assessment code asks the same questions many times: does a component file
+exist, what is in a directory, what does a JSON file contain. A snapshot
+lists each directory at most once and parses each JSON file lazily and at
+most once, so every check and compliance predicate can share one view of
+the study instead of re-opening its files. Parse failures are cached too
+and re-raised on every access, so callers keep their existing error
+handling.
+
+Whole-study questions ("are there at least ten JSON files?") are answered
+from a bounded index built once per snapshot. It covers the top-level files
+and the REPL.et component directories (plus schemas/) down to
+MAX_INDEX_DEPTH, and never enters version control, bundled examples,
+outputs or data trees, which can hold gigabytes of derived files.
+
+Snapshots assume the study does not change while they are in use; create a
+new one for each assessment run.
+
+Published studies can be assessed straight from a .zip or .tar(.gz/.bz2/.xz)
+package with ArchiveSnapshot: tree queries are answered from the archive's
+member index and only the members a check reads are decompressed, in
+memory. open_study() picks the right snapshot for a path.
+"""
+
+import io
+import os
+import json
+import tarfile
+import zipfile
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+# Tar members are captured during the single streaming pass only up to this size
+MAX_CAPTURE_BYTES = 16 * 1024 * 1024
+# Leading bytes of image members kept from that pass, enough for a PNG
+# IHDR or a JPEG frame header behind its EXIF segment
+HEAD_CAPTURE_BYTES = 64 * 1024
+HEAD_CAPTURE_SUFFIXES = (".png", ".jpg", ".jpeg")
+
+# Top-level component directories of a REPL.et study
+COMPONENT_DIRS = {
+    "participants", "equipment", "stimuli", "aois", "collection",
+    "preprocessing", "analysis", "validity", "reproducibility",
+}
+# Directories the index descends into, besides the components
+INDEXED_DIRS = COMPONENT_DIRS | {"schemas"}
+# Never indexed, at any depth
+EXCLUDED_DIRS = {"examples", "data", "outputs", "node_modules", "__pycache__"}
+# Levels below the study root (component dir = 1)
+MAX_INDEX_DEPTH = 3
+
+
+class StudySnapshot:
+    def __init__(self, root: str = "."):
+        self.root = str(root)
+        self._listings: Dict[str, Optional[Dict[str, bool]]] = {}
+        self._json: Dict[str, Any] = {}
+        self._json_errors: Dict[str, Exception] = {}
+        self._index: Optional[List[str]] = None
+        self.reads = 0
+        # Diagnostics since the last take_trace(): paths asked about, bytes
+        # opened and reasons recorded by checks
+        self.consulted: Set[str] = set()
+        self.bytes_read = 0
+        self.notes: List[str] = []
+
+    def _path(self, relpath: str) -> str:
+        return os.path.join(self.root, relpath)
+
+    @staticmethod
+    def _normalize(relpath: str) -> str:
+        relpath = os.path.normpath(relpath).replace(os.sep, "/")
+        return "" if relpath == "." else relpath
+
+    def _listing(self, reldir: str) -> Optional[Dict[str, bool]]:
+        """Entry name -> is_dir for a directory, or None if it does not exist."""
+        reldir = self._normalize(reldir)
+        if reldir not in self._listings:
+            try:
+                with os.scandir(self._path(reldir)) as entries:
+                    self._listings[reldir] = {e.name: e.is_dir() for e in entries}
+            except OSError:
+                self._listings[reldir] = None
+        return self._listings[reldir]
+
+    # -------------------- Tree queries --------------------
+
+    def exists(self, relpath: str) -> bool:
+        relpath = self._normalize(relpath)
+        self.consulted.add(relpath)
+        if not relpath:
+            return self._listing("") is not None
+        parent, name = os.path.split(relpath)
+        listing = self._listing(parent)
+        return listing is not None and name in listing
+
+    def isdir(self, relpath: str) -> bool:
+        relpath = self._normalize(relpath)
+        self.consulted.add(relpath)
+        if not relpath:
+            return self._listing("") is not None
+        parent, name = os.path.split(relpath)
+        listing = self._listing(parent)
+        return bool(listing and listing.get(name))
+
+    def isfile(self, relpath: str) -> bool:
+        return self.exists(relpath) and not self.isdir(relpath)
+
+    def listdir(self, relpath: str) -> List[str]:
+        """Sorted entry names; raises FileNotFoundError like os.listdir."""
+        self.consulted.add(self._normalize(relpath))
+        listing = self._listing(relpath)
+        if listing is None:
+            raise FileNotFoundError(self._path(relpath))
+        return sorted(listing)
+
+    def index(self) -> List[str]:
+        """Relative paths of all indexed files, built on first use."""
+        if self._index is None:
+            files = []
+            pending = [("", 0)]
+            while pending:
+                reldir, depth = pending.pop()
+                listing = self._listing(reldir) or {}
+                for name in sorted(listing):
+                    relpath = f"{reldir}/{name}" if reldir else name
+                    if not listing[name]:
+                        files.append(relpath)
+                        continue
+                    if name.startswith(".") or name in EXCLUDED_DIRS or depth + 1 > MAX_INDEX_DEPTH:
+                        continue
+                    if depth > 0 or name in INDEXED_DIRS:
+                        pending.append((relpath, depth + 1))
+            self._index = sorted(files)
+        return self._index
+
+    def files(self, suffix: str = "", under: str = "", recursive: bool = True) -> Iterator[str]:
+        """Indexed files ending in ``suffix``, optionally only below ``under``."""
+        prefix = self._normalize(under)
+        prefix = prefix + "/" if prefix else ""
+        for relpath in self.index():
+            if not relpath.startswith(prefix) or not relpath.endswith(suffix):
+                continue
+            if recursive or "/" not in relpath[len(prefix):]:
+                yield relpath
+
+    def count_files(self, suffix: str = "", under: str = "", recursive: bool = True,
+                    limit: Optional[int] = None) -> int:
+        """Number of matching indexed files, counting no further than ``limit``."""
+        count = 0
+        for _ in self.files(suffix, under, recursive):
+            count += 1
+            if limit is not None and count >= limit:
+                break
+        return count
+
+    def size(self, relpath: str) -> int:
+        return os.path.getsize(self._path(relpath))
+
+    # -------------------- File contents --------------------
+
+    def open(self, relpath: str, mode: str = "r"):
+        self.consulted.add(self._normalize(relpath))
+        self.reads += 1
+        f = open(self._path(relpath), mode) if "b" in mode else open(self._path(relpath), mode, encoding="utf-8")
+        self.bytes_read += os.fstat(f.fileno()).st_size
+        return f
+
+    def read_head(self, relpath: str, size: int = HEAD_CAPTURE_BYTES) -> bytes:
+        """Up to ``size`` leading bytes of a file, e.g. to parse an image header."""
+        with self.open(relpath, "rb") as f:
+            return f.read(size)
+
+    def load_json(self, relpath: str) -> Any:
+        """Parsed JSON content, read and parsed on first access only.
+
+        Callers must not mutate the returned object; it is shared.
+        """
+        relpath = self._normalize(relpath)
+        self.consulted.add(relpath)
+        if relpath in self._json:
+            return self._json[relpath]
+        if relpath in self._json_errors:
+            raise self._json_errors[relpath]
+        try:
+            with self.open(relpath) as f:
+                data = json.load(f)
+        except Exception as e:
+            self._json_errors[relpath] = e
+            raise
+        self._json[relpath] = data
+        return data
+
+    # -------------------- Diagnostics --------------------
+
+    def note(self, reason: str):
+        """Record why a check deducted points or failed."""
+        self.notes.append(reason)
+
+    def take_trace(self) -> Dict[str, Any]:
+        """Paths consulted, bytes read and notes since the previous call, then reset."""
+        trace = {"files": sorted(self.consulted), "bytes_read": self.bytes_read, "notes": self.notes}
+        self.consulted = set()
+        self.bytes_read = 0
+        self.notes = []
+        return trace
+
+    def close(self):
+        """Release open archive handles; directory snapshots hold none."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArchiveSnapshot(StudySnapshot):
+    """Snapshot of a study packaged as a zip or tar archive.
+
+    Zip members are read on demand through the central directory. Compressed
+    tars cannot be seeked cheaply, so the archive is streamed once: the
+    member index is built, small JSON members outside excluded trees are
+    kept in memory along with the leading HEAD_CAPTURE_BYTES of image
+    members (for read_head), and everything else (gaze data, image bodies)
+    is skipped over. Opening any other tar member streams the archive
+    again. A single top-level directory wrapping the whole study is
+    stripped.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._sizes: Dict[str, int] = {}
+        self._captured: Dict[str, bytes] = {}
+        self._heads: Dict[str, bytes] = {}
+        self._prefix = ""
+        self._zip: Optional[zipfile.ZipFile] = None
+        dirs: Set[str] = set()
+        if zipfile.is_zipfile(path):
+            self._zip = zipfile.ZipFile(path)
+            for info in self._zip.infolist():
+                name = self._normalize(info.filename)
+                if info.is_dir():
+                    dirs.add(name)
+                else:
+                    self._sizes[name] = info.file_size
+        else:
+            with tarfile.open(path, "r|*") as tar:
+                for member in tar:
+                    name = self._normalize(member.name)
+                    if member.isdir():
+                        dirs.add(name)
+                    elif member.isfile():
+                        self._sizes[name] = member.size
+                        if self._should_capture(name, member.size):
+                            self._captured[name] = tar.extractfile(member).read()
+                        elif self._should_capture_head(name):
+                            self._heads[name] = tar.extractfile(member).read(HEAD_CAPTURE_BYTES)
+        self._build_listings(dirs)
+
+    @staticmethod
+    def _excluded(name: str) -> bool:
+        return any(p.startswith(".") or p in EXCLUDED_DIRS for p in name.split("/")[:-1])
+
+    @classmethod
+    def _should_capture(cls, name: str, size: int) -> bool:
+        return name.endswith(".json") and size <= MAX_CAPTURE_BYTES and not cls._excluded(name)
+
+    @classmethod
+    def _should_capture_head(cls, name: str) -> bool:
+        return name.lower().endswith(HEAD_CAPTURE_SUFFIXES) and not cls._excluded(name)
+
+    def _build_listings(self, dirs: Set[str]):
+        tops = {name.split("/")[0] for name in list(self._sizes) + list(dirs)}
+        if len(tops) == 1 and all("/" in name for name in self._sizes):
+            self._prefix = tops.pop() + "/"
+        strip = len(self._prefix)
+        self._sizes = {name[strip:]: size for name, size in self._sizes.items()}
+        self._captured = {name[strip:]: data for name, data in self._captured.items()}
+        self._heads = {name[strip:]: data for name, data in self._heads.items()}
+        dirs = {d[strip:] for d in dirs if d.startswith(self._prefix)}
+
+        self._listings = {"": {}}
+        for relpath, is_dir in [(f, False) for f in self._sizes] + [(d, True) for d in dirs]:
+            # Register the entry and every implicit parent directory
+            while relpath:
+                parent, name = os.path.split(relpath)
+                self._listings.setdefault(parent, {})
+                if is_dir:
+                    self._listings.setdefault(relpath, {})
+                self._listings[parent][name] = is_dir
+                relpath, is_dir = parent, True
+
+    def _listing(self, reldir: str) -> Optional[Dict[str, bool]]:
+        return self._listings.get(self._normalize(reldir))
+
+    def size(self, relpath: str) -> int:
+        return self._sizes[self._normalize(relpath)]
+
+    def read_head(self, relpath: str, size: int = HEAD_CAPTURE_BYTES) -> bytes:
+        relpath = self._normalize(relpath)
+        head = self._heads.get(relpath)
+        if head is None or (len(head) < size and len(head) < self._sizes[relpath]):
+            return super().read_head(relpath, size)
+        self.consulted.add(relpath)
+        self.reads += 1
+        self.bytes_read += min(size, len(head))
+        return head[:size]
+
+    def open(self, relpath: str, mode: str = "r"):
+        relpath = self._normalize(relpath)
+        self.consulted.add(relpath)
+        if relpath not in self._sizes:
+            raise FileNotFoundError(f"{self.root}:{relpath}")
+        self.reads += 1
+        self.bytes_read += self._sizes[relpath]
+        if relpath in self._captured:
+            stream = io.BytesIO(self._captured[relpath])
+        elif self._zip is not None:
+            stream = self._zip.open(self._prefix + relpath)
+        else:
+            # Not captured while streaming: fall back to a random-access read
+            with tarfile.open(self.root) as tar:
+                stream = io.BytesIO(tar.extractfile(self._prefix + relpath).read())
+        return stream if "b" in mode else io.TextIOWrapper(stream, encoding="utf-8")
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+
+def is_archive(path) -> bool:
+    return isinstance(path, str) and path.lower().endswith(ARCHIVE_SUFFIXES) and os.path.isfile(path)
+
+
+def open_study(root=".") -> StudySnapshot:
+    """Snapshot for a study directory or archive; snapshots are passed through."""
+    if isinstance(root, StudySnapshot):
+        return root
+    if is_archive(str(root)):
+        return ArchiveSnapshot(str(root))
+    return StudySnapshot(root)
+
+
+@contextmanager
+def study_scope(root="."):
+    """open_study() as a context; closes the snapshot only if it was opened here."""
+    study = open_study(root)
+    try:
+        yield study
+    finally:
+        if study is not root:
+            study.close()
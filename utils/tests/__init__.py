@@ -4,6 +4,27 @@
 # - test_schemas.py: JSON Schema validation tests
 # - test_data_integrity.py: Data consistency and integrity tests  
 # - test_repl_et_score.py: Reproducibility scoring system tests
+# - test_preprocessing_checkpoints.py: Checkpoint/resume of preprocessing stages
+# - test_gaze_events.py: Fixation detection, in-memory and chunked
+# - test_gaze_container.py: Hierarchical HDF5 gaze container
+# - test_data_quality.py: Precision, data loss and validity windows
+# - test_exclusion_engine.py: Protocol exclusion criteria
+# - test_screen_geometry.py: Pixel/visual-angle conversion
+# - test_gaze_filtering.py: Batched filtering and resampling
+# - test_fixation_sweep.py: I-VT threshold sweeps
+# - test_fixation_agreement.py: I-VT vs I-DT agreement
+# - test_batch_score.py: Batch scoring of study trees
+# - test_study_snapshot.py: Shared study snapshot for assessments
+# - test_score_cache.py: Fingerprint score cache
+# - test_watch_score.py: Incremental watch-mode scoring
+# - test_radar_svg.py: Dependency-free SVG radar chart
+# - test_study_archive.py: Scoring studies from zip/tar archives
+# - test_aoi_validation.py: AOI bounds, overlap and coverage against stimulus images
+# - test_aoi_geometry.py: Sweep-line AOI overlap and union coverage
+# - test_validate_jsons.py: Compiled-schema, parallel JSON validation
+# - test_schema_registry.py: Offline schema registry and remote schema cache
+# - test_json_stream.py: Incremental JSON reader and item-by-item validation
+# - test_referential_integrity.py: Cross-file id indexes and dangling references
 # - conftest.py: Shared pytest fixtures and configuration
 #
 # Run tests with: pytest tests/
@@ -0,0 +1,70 @@
+import os
+import sys
+import random
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from aoi_geometry import analyze_rects, overlapping_pairs, pairwise_overlaps, sweep_areas, union_area
+
+
+def brute_force(rects):
+    """All-pairs overlaps and a unit-cell union, for small integer rectangles."""
+    pairs, area = 0, 0
+    for i in range(len(rects)):
+        for j in range(i + 1, len(rects)):
+            a, b = rects[i], rects[j]
+            w = min(a[2], b[2]) - max(a[0], b[0])
+            h = min(a[3], b[3]) - max(a[1], b[1])
+            if w > 0 and h > 0:
+                pairs += 1
+                area += w * h
+    cells = {(x, y) for x0, y0, x1, y1 in rects for x in range(x0, x1) for y in range(y0, y1)}
+    return pairs, area, len(cells)
+
+
+class TestSweepLine:
+    """Test suite for sweep-line overlap and coverage."""
+
+    def test_simple_layout(self):
+        """Test overlap counts and union area of a small layout."""
+        rects = [(0, 0, 10, 10), (5, 5, 15, 15), (20, 20, 30, 30)]
+        assert pairwise_overlaps(rects) == (1, 25.0)
+        assert union_area(rects) == 100 + 100 - 25 + 100
+        # Touching edges and zero-area boxes are not overlaps
+        assert pairwise_overlaps([(0, 0, 10, 10), (10, 0, 20, 10), (0, 10, 10, 20)]) == (0, 0.0)
+        assert pairwise_overlaps([(0, 0, 10, 10), (5, 5, 5, 8)]) == (0, 0.0)
+        assert sweep_areas([]) == (0.0, 0.0)
+
+    def test_matches_brute_force(self):
+        """Test random layouts against all-pairs comparison."""
+        rng = random.Random(7)
+        for _ in range(200):
+            rects = []
+            for _ in range(rng.randint(1, 12)):
+                x, y = rng.randint(0, 20), rng.randint(0, 20)
+                rects.append((x, y, x + rng.randint(0, 8), y + rng.randint(0, 8)))
+            pairs, area, union = brute_force(rects)
+            assert overlapping_pairs(rects) == pairs
+            assert sweep_areas(rects) == (union, area)
+
+    def test_coverage_clipped_to_image(self):
+        """Test that coverage only counts the part of the AOIs inside the image."""
+        summary = analyze_rects([(-10, 0, 10, 10), (90, 40, 110, 60)], width=100, height=50)
+        assert summary["coverage"] == (100 + 100) / 5000
+        assert summary["union_area"] == 200 + 400
+        assert analyze_rects([(0, 0, 1, 1)])["coverage"] is None
+
+    def test_token_level_scale(self):
+        """Test that 20,000 token boxes on one stimulus are analyzed within seconds."""
+        rng = random.Random(3)
+        rects = []
+        for line in range(400):
+            x = 0
+            for _ in range(50):
+                width = rng.randint(10, 60)
+                rects.append((x, line * 20, x + width, line * 20 + 18))
+                x += width + rng.choice([0, 4, -2])
+        start = time.perf_counter()
+        summary = analyze_rects(rects, width=4000, height=8000)
+        assert time.perf_counter() - start < 10
+        assert summary["overlapping_pairs"] > 0 and 0 < summary["coverage"] < 1
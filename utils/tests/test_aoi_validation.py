@@ -0,0 +1,191 @@
+import io
+import os
+import sys
+import json
+import struct
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from aoi_validation import ImageSizeCache, image_size, update_aois_definition, validate_aois
+from repl_et_score import CHECKS, COMPONENT_INPUTS, check_aois, diagnose_study, score_study
+from score_cache import score_with_cache
+from watch_score import input_stamps
+
+
+def png_header(width, height):
+    ihdr = struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00"
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + ihdr + b"\x00" * 4
+
+
+def jpeg_header(width, height, sof=0xC0):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x01" * 9
+    # A Huffman table (C4) before the frame header must not be taken for one
+    dht = b"\xff\xc4" + struct.pack(">H", 5) + b"\x00\x01\x02"
+    frame = bytes([0xFF, sof]) + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    return b"\xff\xd8" + app0 + dht + frame + b"\xff\xda" + b"\x00" * 64
+
+
+@pytest.fixture
+def study(tmp_path):
+    """Two 100x50 stimuli: one listed in stimuli_metadata.json, one found by file name."""
+    (tmp_path / "stimuli" / "stimuli_raw").mkdir(parents=True)
+    (tmp_path / "stimuli" / "stimuli_raw" / "code.jpg").write_bytes(jpeg_header(100, 50))
+    (tmp_path / "stimuli" / "stimuli_raw" / "extra.png").write_bytes(png_header(100, 50))
+    with open(tmp_path / "stimuli" / "stimuli_metadata.json", "w") as f:
+        json.dump({"stimuli": [{"stimulus_id": "s1", "file_name": "code.jpg"}]}, f)
+    aois = [
+        ("a1", "s1", 0, 0, 50, 50),
+        ("a2", "s1", 25, 0, 50, 25),     # overlaps a1 by 25x25
+        ("a3", "s1", 90, 40, 20, 20),    # sticks out of the image
+        ("a4", "extra", 0, 0, 100, 50),
+        ("a5", "missing", 0, 0, 10, 10),
+    ]
+    (tmp_path / "aois").mkdir()
+    with open(tmp_path / "aois" / "aois_definition.json", "w") as f:
+        json.dump({"aois": [{"aoi_id": i, "stimulus_id": s, "label": i, "shape": "rectangle",
+                             "coordinates": {"x": x, "y": y, "width": w, "height": h}}
+                            for i, s, x, y, w, h in aois]}, f)
+    return tmp_path
+
+
+class TestImageHeaders:
+    """Test suite for header-only image size parsing."""
+
+    def test_png_and_jpeg(self):
+        """Test that sizes are read from PNG, baseline and progressive JPEG headers."""
+        assert image_size(io.BytesIO(png_header(640, 480))) == (640, 480)
+        assert image_size(io.BytesIO(jpeg_header(1920, 1080))) == (1920, 1080)
+        assert image_size(io.BytesIO(jpeg_header(33, 7, sof=0xC2))) == (33, 7)
+
+    def test_unknown_or_truncated(self):
+        """Test that other formats and truncated headers yield None."""
+        assert image_size(io.BytesIO(b"GIF89a" + b"\x00" * 20)) is None
+        assert image_size(io.BytesIO(jpeg_header(10, 10)[:30])) is None
+        assert image_size(io.BytesIO(b"")) is None
+
+
+class TestValidateAois:
+    """Test suite for content-aware AOI validation."""
+
+    def test_report(self, study):
+        """Test bounds, stimulus resolution, overlap and coverage per stimulus."""
+        report = validate_aois(str(study), ImageSizeCache())
+        assert report["unresolved"] == ["a5"]
+        assert report["out_of_bounds"] == ["a3"]
+        assert report["valid_fraction"] == 3 / 5
+        s1 = report["stimuli"]["s1"]
+        assert (s1["width"], s1["height"], s1["aoi_count"]) == (100, 50, 3)
+        assert (s1["overlapping_pairs"], s1["overlap_area"]) == (1, 625.0)
+        # a1 and a2 cover 50x50 + 25x25; a3 adds its 10x10 inside the image
+        assert s1["coverage"] == (2500 + 625 + 100) / 5000
+        assert report["stimuli"]["extra"]["coverage"] == 1.0
+
+    def test_sizes_cached_by_hash(self, study, tmp_path):
+        """Test that unchanged and duplicated images are not parsed again."""
+        cache_path = str(tmp_path / "outputs" / "image_sizes.json")
+        cache = ImageSizeCache(cache_path)
+        validate_aois(str(study), cache)
+        assert cache.parsed == 2
+        cache.save()
+
+        raw = study / "stimuli" / "stimuli_raw"
+        (raw / "copy.jpg").write_bytes((raw / "code.jpg").read_bytes())
+        with open(study / "aois" / "aois_definition.json") as f:
+            definition = json.load(f)
+        definition["aois"].append({"aoi_id": "a6", "stimulus_id": "copy", "label": "l", "shape": "rectangle",
+                                   "coordinates": {"x": 0, "y": 0, "width": 1, "height": 1}})
+        with open(study / "aois" / "aois_definition.json", "w") as f:
+            json.dump(definition, f)
+
+        reloaded = ImageSizeCache(cache_path)
+        report = validate_aois(str(study), reloaded)
+        assert reloaded.parsed == 0
+        assert report["stimuli"]["copy"]["width"] == 100
+
+    def test_check_aois_scaled_by_content(self, study):
+        """Test that invalid AOIs lower the AOI score and are reported as deductions."""
+        assert check_aois(str(study)) == 0.75 * 3 / 5
+        _scores, diagnostics = diagnose_study(str(study))
+        deductions = diagnostics["aois"]["deductions"]
+        assert "aois/aois_definition.json: 1 AOI(s) reference unknown stimuli" in deductions
+        assert "aois/aois_definition.json: 1 AOI(s) lie outside their stimulus image" in deductions
+
+    def test_image_replaced_in_place_rescored(self, study, tmp_path):
+        """Test that swapping a stimulus image under the same name invalidates the cached AOI score."""
+        cache_path = str(tmp_path / "cache" / "score_cache.json")
+        scores, _ = score_with_cache(str(study), CHECKS, COMPONENT_INPUTS, cache_path)
+        stamps = input_stamps(str(study))
+
+        # Same name and byte size, smaller image: a4 (100x50) no longer fits
+        image = study / "stimuli" / "stimuli_raw" / "extra.png"
+        stat = image.stat()
+        image.write_bytes(png_header(40, 20))
+        os.utime(image, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        assert input_stamps(str(study))["stimuli/stimuli_raw"] != stamps["stimuli/stimuli_raw"]
+        rescored, recomputed = score_with_cache(str(study), CHECKS, COMPONENT_INPUTS, cache_path)
+        assert "aois" in recomputed
+        assert rescored["aois"] == score_study(str(study))["aois"] < scores["aois"]
+
+    def test_validation_block_written(self, study):
+        """Test that totals are merged into the validation block and match the schema."""
+        import jsonschema
+        path = study / "aois" / "aois_definition.json"
+        with open(path) as f:
+            definition = json.load(f)
+        definition.update(aoi_strategy="manual", validation={"expert_review": True, "coverage_completeness": 0.0})
+        with open(path, "w") as f:
+            json.dump(definition, f)
+
+        update_aois_definition(validate_aois(str(study), ImageSizeCache()), str(path))
+        with open(path) as f:
+            validation = json.load(f)["validation"]
+        assert validation["expert_review"] is True
+        # s1: 3225 of 5000 px covered, extra: fully covered
+        assert validation["coverage_completeness"] == (3225 + 5000) / 10000
+        assert (validation["overlapping_pairs"], validation["overlap_area"]) == (1, 625.0)
+        assert (validation["aois_out_of_bounds"], validation["unresolved_aois"]) == (1, 1)
+        assert validation["stimuli"]["s1"]["aoi_count"] == 3
+
+        schema_path = os.path.join(os.path.dirname(__file__), "..", "..", "schemas", "aois_definition.schema.json")
+        with open(schema_path) as f:
+            schema = json.load(f)
+        with open(path) as f:
+            jsonschema.validate(json.load(f), schema)
+
+    def test_no_aoi_list(self, tmp_path):
+        """Test that definitions without an AOI list are not validated."""
+        (tmp_path / "aois").mkdir()
+        (tmp_path / "aois" / "aois_definition.json").write_text('{"test": "data"}')
+        assert validate_aois(str(tmp_path)) is None
+        assert check_aois(str(tmp_path)) == 0.75
+
+    def test_stimuli_without_images_not_deducted(self, study):
+        """Test that AOIs on stimuli that ship no image are reported but keep their credit."""
+        (study / "stimuli" / "stimuli_raw" / "code.jpg").unlink()
+        report = validate_aois(str(study), ImageSizeCache())
+        assert report["unchecked"] == ["a1", "a2", "a3"]
+        assert report["unchecked_stimuli"] == ["s1"]
+        assert report["valid_fraction"] == 4 / 5
+        _scores, diagnostics = diagnose_study(str(study))
+        aoi_notes = [d for d in diagnostics["aois"]["deductions"] if d.startswith("aois/aois_definition.json")]
+        assert aoi_notes == ["aois/aois_definition.json: 1 AOI(s) reference unknown stimuli"]
+
+    def test_unverifiable_aois_deducted_and_noted(self, study):
+        """Test that unreadable inputs cost the AOI credit and are reported as deductions."""
+        # Corrupt header: a JPEG whose first segment declares length 0
+        (study / "stimuli" / "stimuli_raw" / "code.jpg").write_bytes(b"\xff\xd8\xff\xe0\x00\x00" + b"\x00" * 64)
+        report = validate_aois(str(study), ImageSizeCache())
+        assert report["unreadable"] == ["a1", "a2", "a3"]
+        assert report["valid_fraction"] == 1 / 5
+        _scores, diagnostics = diagnose_study(str(study))
+        assert "aois/aois_definition.json: 3 AOI(s) have an unreadable stimulus image" \
+            in diagnostics["aois"]["deductions"]
+
+        (study / "stimuli" / "stimuli_metadata.json").write_text("{not json")
+        assert check_aois(str(study)) == 0
+        _scores, diagnostics = diagnose_study(str(study))
+        assert any("could not be validated (JSONDecodeError" in d for d in diagnostics["aois"]["deductions"])
+
+        (study / "aois" / "aois_definition.json").write_text("[]")
+        assert check_aois(str(study)) == 0
@@ -0,0 +1,67 @@
+import os
+import sys
+import json
+import csv
+import zipfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from batch_score import discover_study_roots, load_summary, score_tree
+
+
+def _make_study(root, title=True, components=("equipment",)):
+    os.makedirs(root, exist_ok=True)
+    if title:
+        with open(os.path.join(root, "metadata.json"), "w") as f:
+            json.dump({"study_title": "T", "paradigm": "P", "task_description": "D"}, f)
+    for component in components:
+        os.makedirs(os.path.join(root, component), exist_ok=True)
+
+
+class TestBatchScore:
+    """Test suite for batch scoring of study trees."""
+
+    def test_discovery(self, tmp_path):
+        """Test that study roots are found and study internals are not searched."""
+        _make_study(str(tmp_path / "a"))
+        _make_study(str(tmp_path / "group" / "b"))
+        _make_study(str(tmp_path / "c"), title=False, components=("participants", "stimuli", "aois"))
+        # Not studies: hidden, inside a component directory, or too few components
+        _make_study(str(tmp_path / ".git" / "d"))
+        _make_study(str(tmp_path / "a" / "stimuli" / "e"))
+        _make_study(str(tmp_path / "f"), title=False, components=("analysis",))
+
+        roots = [os.path.relpath(r, str(tmp_path)) for r in discover_study_roots(str(tmp_path))]
+        assert roots == ["a", "c", os.path.join("group", "b")]
+
+    def test_archives_scored(self, tmp_path):
+        """Test that study archives in the tree are discovered and scored like directories."""
+        _make_study(str(tmp_path / "a"))
+        (tmp_path / "group").mkdir()
+        with zipfile.ZipFile(str(tmp_path / "group" / "packed.zip"), "w") as zf:
+            zf.write(str(tmp_path / "a" / "metadata.json"), "packed/metadata.json")
+        (tmp_path / "group" / "notes.txt").write_text("not a study")
+
+        roots = [os.path.relpath(r, str(tmp_path)) for r in discover_study_roots(str(tmp_path))]
+        assert roots == ["a", os.path.join("group", "packed.zip")]
+        records = score_tree(str(tmp_path), str(tmp_path / "out" / "summary.jsonl"), workers=1)
+        assert [r["error"] for r in records] == ["", ""]
+        assert records[1]["metadata"] == records[0]["metadata"] == 1.0
+
+    def test_streams_jsonl_and_csv(self, tmp_path):
+        """Test parallel scoring matches serial scoring in both summary formats."""
+        for i in range(10):
+            _make_study(str(tmp_path / "studies" / f"s{i:02d}"), title=i % 2 == 0,
+                        components=("equipment", "stimuli", "aois"))
+        tree = str(tmp_path / "studies")
+
+        serial = score_tree(tree, str(tmp_path / "serial.jsonl"), workers=1)
+        parallel = score_tree(tree, str(tmp_path / "parallel.csv"), workers=2, chunksize=3)
+        assert len(serial) == 10
+        strip = lambda records: [{k: v for k, v in r.items() if k != "elapsed_s"} for r in records]
+        assert strip(serial) == strip(parallel)
+        assert serial[0]["metadata"] == 1.0 and serial[1]["metadata"] == 0
+
+        with open(str(tmp_path / "parallel.csv"), newline="") as f:
+            assert len(list(csv.DictReader(f))) == 10
+        reloaded = sorted(load_summary(str(tmp_path / "serial.jsonl")), key=lambda r: r["study_root"])
+        assert strip(reloaded) == strip(serial)
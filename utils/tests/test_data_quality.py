@@ -0,0 +1,106 @@
+import os
+import sys
+import json
+import numpy as np
+import pytest
+import jsonschema
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from data_quality import (
+    compute_quality, summarize_participants, quality_summary,
+    quality_settings_from_spec, update_validity_json
+)
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "schemas", "validity.schema.json")
+
+
+def _trial(pid, tid, x, y=None):
+    x = np.asarray(x, dtype=float)
+    y = np.zeros_like(x) if y is None else np.asarray(y, dtype=float)
+    return pid, tid, np.arange(x.size) * 10.0, x, y
+
+
+class TestDataQuality:
+    """Test suite for sliding-window data-quality metrics."""
+
+    def test_data_loss_and_precision(self):
+        """Test data loss, RMS-S2S and STD on a hand-checked trial."""
+        table = compute_quality([_trial("P01", "T1", [0, 1, np.nan, 3])], sampling_rate_hz=100)
+        row = table.iloc[0]
+        assert row["data_loss"] == pytest.approx(0.25)
+        # only the (0, 1) pair is valid
+        assert row["rms_s2s"] == pytest.approx(1.0)
+        assert row["std_precision"] == pytest.approx(np.std([0, 1, 3]))
+
+    def test_pairs_do_not_cross_trials(self):
+        """Test that sample-to-sample steps are not taken across trial boundaries."""
+        table = compute_quality([_trial("P01", "T1", [0, 0]), _trial("P01", "T2", [100, 100])],
+                                sampling_rate_hz=100)
+        assert list(table["rms_s2s"]) == [0.0, 0.0]
+
+    def test_sliding_windows_match_brute_force(self):
+        """Test cumulative-sum windows against a direct computation."""
+        rng = np.random.default_rng(1)
+        x = rng.normal(size=400)
+        x[rng.random(400) < 0.2] = np.nan
+        table = compute_quality([_trial("P01", "T1", x)], sampling_rate_hz=100,
+                                validity_threshold=0.85, window_ms=100)
+        valid = np.isfinite(x)
+        expected = sum(valid[i:i + 10].mean() < 0.85 for i in range(400 - 10 + 1))
+        assert table.iloc[0]["n_windows"] == 391
+        assert table.iloc[0]["flagged_windows"] == expected
+
+    def test_windows_follow_timestamps(self):
+        """Test that dropped samples (a timestamp gap) count against the windows spanning it."""
+        t = np.concatenate([np.arange(10), np.arange(20, 30)]) * 10.0
+        x = np.zeros(20)
+        table = compute_quality([("P01", "T1", t, x, x)], sampling_rate_hz=100,
+                                validity_threshold=0.85, window_ms=50)
+        # Starts at 0..50 and 200..250 ms are full; 60..90 ms run into the gap
+        assert table.iloc[0]["n_windows"] == 16
+        assert table.iloc[0]["flagged_windows"] == 4
+        assert table.iloc[0]["data_loss"] == 0.0
+
+    def test_participant_std_pools_squared_deviations(self):
+        """Test that participant STD pools trial sums of squares rather than averaging STDs."""
+        trials = compute_quality([_trial("P01", "T1", [0, 2]), _trial("P01", "T2", [10, 10, 10, 10])],
+                                 sampling_rate_hz=100)
+        assert list(trials["std_precision"]) == [1.0, 0.0]
+        participants = summarize_participants(trials)
+        assert participants.iloc[0]["std_precision"] == pytest.approx(np.sqrt(2 / 6))
+
+    def test_participant_summary(self):
+        """Test aggregation from trials to participants."""
+        trials = compute_quality([
+            _trial("P01", "T1", [0, 1, 2, 3]),
+            _trial("P01", "T2", [np.nan] * 4),
+            _trial("P02", "T1", [5, 5, 5, 5]),
+        ], sampling_rate_hz=100, validity_threshold=0.85, window_ms=20)
+        participants = summarize_participants(trials, 0.85).set_index("participant_id")
+        assert participants.loc["P01", "data_loss"] == pytest.approx(0.5)
+        assert participants.loc["P01", "below_threshold"]
+        assert not participants.loc["P02", "below_threshold"]
+        assert participants.loc["P01", "trials_below_threshold"] == 1
+
+    def test_settings_from_advanced_spec(self, tmp_path):
+        """Test reading threshold and window from the advanced preprocessing layout."""
+        path = str(tmp_path / "preprocessing.json")
+        with open(path, "w") as f:
+            json.dump({"preprocessing_steps": [
+                {"parameters": {"eye_tracking_validity_threshold": 0.9}},
+                {"parameters": {"data_validity_window": "250ms sliding window"}},
+            ]}, f)
+        assert quality_settings_from_spec(path) == {"validity_threshold": 0.9, "window_ms": 250.0}
+
+    def test_validity_json_stays_schema_valid(self, tmp_path):
+        """Test that the summary written to validity.json validates against its schema."""
+        path = str(tmp_path / "validity.json")
+        with open(path, "w") as f:
+            json.dump({"threats": [], "limitations": []}, f)
+        trials = compute_quality([_trial("P01", "T1", [0, np.nan, np.nan, 1])], sampling_rate_hz=100)
+        participants = summarize_participants(trials)
+        update_validity_json(quality_summary(trials, participants, 0.85, 500.0), path)
+
+        data = json.load(open(path))
+        assert data["data_quality"]["participants_below_threshold"] == ["P01"]
+        jsonschema.validate(data, json.load(open(SCHEMA_PATH)))
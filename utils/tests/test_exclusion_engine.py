@@ -0,0 +1,115 @@
+import os
+import sys
+import json
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from data_quality import compute_quality, summarize_participants, write_quality_tables
+from exclusion_engine import MAX_CACHED_TABLES, compile_criteria, excluded_participants, run_exclusions
+
+
+def _trial(pid, tid, x):
+    x = np.asarray(x, dtype=float)
+    return pid, tid, np.arange(x.size) * 10.0, x, np.zeros_like(x)
+
+
+@pytest.fixture
+def study(tmp_path):
+    """Protocol with two criteria and quality tables for three participants."""
+    protocol = {
+        "exclusion_criteria": ["incomplete session", "excessive data loss", "wore a hat"],
+        "session_structure": {"main_trials": 2},
+    }
+    protocol_path = str(tmp_path / "protocol.json")
+    with open(protocol_path, "w") as f:
+        json.dump(protocol, f)
+
+    good = [0.0] * 20
+    lossy = [0.0] * 10 + [np.nan] * 10
+    trials = compute_quality([
+        _trial("P01", "T1", good), _trial("P01", "T2", good),
+        _trial("P02", "T1", good), _trial("P02", "T2", lossy),
+        _trial("P03", "T1", good),
+    ], sampling_rate_hz=100, validity_threshold=0.85, window_ms=50)
+    quality_dir = str(tmp_path / "analysis")
+    write_quality_tables(trials, summarize_participants(trials, 0.85), quality_dir)
+    return tmp_path, protocol_path, quality_dir
+
+
+def _run(study):
+    tmp_path, protocol_path, quality_dir = study
+    return run_exclusions(protocol_path, quality_dir, str(tmp_path / "exclusions.csv"),
+                          str(tmp_path / "cache"), validity_threshold=0.85)
+
+
+class TestExclusionEngine:
+    """Test suite for protocol-driven exclusions."""
+
+    def test_criteria_compilation(self):
+        """Test that known criteria compile and unknown ones are reported."""
+        compiled, unrecognized = compile_criteria(
+            ["Excessive data loss", "data loss above 30%", "motion sickness"],
+            {"validity_threshold": 0.85, "expected_trials": None})
+        assert {c.level for c in compiled} == {"trial", "participant"}
+        assert unrecognized == ["motion sickness"]
+
+    def test_exclusion_table(self, study):
+        """Test reasons for lossy trials and incomplete sessions."""
+        exclusions, reused = _run(study)
+        assert not reused
+        rows = {tuple(r) for r in exclusions[["participant_id", "trial_id", "criterion"]].values}
+        assert ("P02", "T2", "excessive data loss") in rows
+        assert ("P03", "", "incomplete session") in rows
+        assert ("P02", "", "excessive data loss") in rows
+        assert not any(r[0] == "P01" for r in rows)
+        assert excluded_participants(exclusions) == ["P02", "P03"]
+        assert os.path.exists(str(study[0] / "exclusions.csv"))
+
+    def test_cache_reused_until_inputs_change(self, study):
+        """Test that results are cached on criteria and input hashes."""
+        first, _ = _run(study)
+        second, reused = _run(study)
+        assert reused
+        assert first.equals(second)
+
+        tmp_path, protocol_path, _ = study
+        with open(protocol_path, "w") as f:
+            json.dump({"exclusion_criteria": ["excessive data loss"]}, f)
+        third, reused = _run(study)
+        assert not reused
+        assert "incomplete session" not in set(third["criterion"])
+
+    def test_cache_keeps_latest_tables(self, study):
+        """Test that stale cached tables are removed as new ones are written."""
+        tmp_path, protocol_path, quality_dir = study
+        args = (protocol_path, quality_dir, str(tmp_path / "exclusions.csv"), str(tmp_path / "cache"))
+        thresholds = [0.5 + 0.05 * i for i in range(MAX_CACHED_TABLES + 3)]
+        for threshold in thresholds:
+            run_exclusions(*args, validity_threshold=threshold)
+        assert len(os.listdir(tmp_path / "cache")) == MAX_CACHED_TABLES
+        assert run_exclusions(*args, validity_threshold=thresholds[-1])[1]
+        assert not run_exclusions(*args, validity_threshold=thresholds[0])[1]
+
+    def test_study_settings_and_ids_from_any_cwd(self, tmp_path, monkeypatch):
+        """Test that preprocessing.json is read from the study, and ids like "NA" survive the cache."""
+        root = tmp_path / "study"
+        (root / "collection").mkdir(parents=True)
+        (root / "preprocessing").mkdir()
+        with open(root / "collection" / "protocol.json", "w") as f:
+            json.dump({"exclusion_criteria": ["excessive data loss"]}, f)
+        with open(root / "preprocessing" / "preprocessing.json", "w") as f:
+            json.dump({"steps": [{"parameters": {"eye_tracking_validity_threshold": 0.4}}]}, f)
+        trials = compute_quality([_trial("NA", "T1", [0.0] * 3 + [np.nan] * 7),
+                                  _trial("P02", "T1", [0.0] * 5 + [np.nan] * 5)], sampling_rate_hz=100)
+        quality_dir = str(root / "data" / "analysis")
+        write_quality_tables(trials, summarize_participants(trials), quality_dir)
+        monkeypatch.chdir(tmp_path)
+
+        args = (str(root / "collection" / "protocol.json"), quality_dir,
+                str(root / "exclusions.csv"), str(root / "cache"))
+        fresh, reused = run_exclusions(*args)
+        # Threshold 0.4 from the study allows 60% loss: P02 (50%) stays in
+        assert not reused and set(fresh["participant_id"]) == {"NA"}
+        cached, reused = run_exclusions(*args)
+        assert reused and cached.equals(fresh)
@@ -0,0 +1,103 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from gaze_events import detect_fixations_idt, events_to_mask
+from fixation_agreement import (
+    agreement_report, cohens_kappa_counts, kappa_from_counts, match_intervals,
+)
+from screen_geometry import ScreenGeometry
+
+GEOMETRY = ScreenGeometry(24.0, (1920, 1080), 60.0)
+
+
+def _trials():
+    rng = np.random.default_rng(5)
+    trials = []
+    for pid in ["P01", "P02"]:
+        for tid in ["T1", "T2"]:
+            n = 1500
+            t = np.arange(n) * 4.0
+            jumps = rng.random(n) < 0.02
+            x = 960 + np.cumsum(np.where(jumps, rng.normal(0, 80, n), rng.normal(0, 0.2, n)))
+            y = 540 + np.cumsum(np.where(jumps, rng.normal(0, 40, n), rng.normal(0, 0.2, n)))
+            x[100:110] = np.nan
+            trials.append((pid, tid, None, t, x, y))
+    return trials
+
+
+def _brute_force_idt(t, x, y, threshold, min_duration):
+    """Textbook I-DT: grow a window while its dispersion stays under threshold."""
+    window = int(np.ceil(min_duration / np.median(np.diff(t)))) + 1
+    fixations, i = [], 0
+    while i + window <= t.size:
+        j = i + window
+        seg_x, seg_y = x[i:j], y[i:j]
+        if np.isnan(seg_x).any() or (np.ptp(seg_x) + np.ptp(seg_y)) > threshold:
+            i += 1
+            continue
+        while j < t.size and np.isfinite(x[j]) and \
+                (np.ptp(x[i:j + 1]) + np.ptp(y[i:j + 1])) <= threshold:
+            j += 1
+        fixations.append((i, j - 1))
+        i = j
+    return fixations
+
+
+class TestFixationAgreement:
+    """Test suite for the I-VT vs I-DT agreement harness."""
+
+    def test_idt_matches_brute_force(self):
+        """Test that the vectorized I-DT finds the same fixations as the textbook loop."""
+        t, x, y = _trials()[0][3:]
+        x_deg, y_deg = GEOMETRY.px_to_deg(x, y)
+        events = detect_fixations_idt(t, x_deg, y_deg, 1.2, 80.0)
+        expected = _brute_force_idt(t, x_deg, y_deg, 1.2, 80.0)
+        assert len(expected) > 0
+        assert list(zip(events["onset_index"], events["offset_index"])) == expected
+
+    def test_events_to_mask(self):
+        """Test that event spans are marked inclusively."""
+        events = {"onset_index": np.array([1, 5]), "offset_index": np.array([2, 5])}
+        mask = events_to_mask(events, 7)
+        assert mask.tolist() == [False, True, True, False, False, True, False]
+
+    def test_kappa(self):
+        """Test Cohen's kappa on perfect, chance and known agreement."""
+        a = np.array([1, 1, 0, 0], dtype=bool)
+        assert kappa_from_counts(cohens_kappa_counts(a, a)) == pytest.approx(1.0)
+        assert kappa_from_counts(cohens_kappa_counts(a, np.array([1, 0, 1, 0], dtype=bool))) == pytest.approx(0.0)
+        counts = np.array([[20, 5], [10, 15]])
+        assert kappa_from_counts(counts) == pytest.approx(0.4)
+
+    def test_match_intervals(self):
+        """Test best-overlap matching against a brute-force search."""
+        on_a, off_a = np.array([0, 10, 30, 50]), np.array([5, 20, 40, 55])
+        on_b, off_b = np.array([3, 12, 18, 45]), np.array([8, 16, 35, 47])
+        assert match_intervals(on_a, off_a, on_b, off_b).tolist() == [0, 1, 2, -1]
+        assert match_intervals(on_a, off_a, on_b[:0], off_b[:0]).tolist() == [-1] * 4
+        # An inner interval can overlap more than the partial ones at either end
+        assert match_intervals(np.array([0]), np.array([100]),
+                               np.array([-5, 10, 95]), np.array([2, 80, 200])).tolist() == [1]
+
+        rng = np.random.default_rng(0)
+        bounds_a = np.sort(rng.choice(1000, 40, replace=False)).reshape(-1, 2)
+        bounds_b = np.sort(rng.choice(1000, 60, replace=False)).reshape(-1, 2)
+        expected = []
+        for a0, a1 in bounds_a:
+            overlaps = np.minimum(a1, bounds_b[:, 1]) - np.maximum(a0, bounds_b[:, 0])
+            expected.append(int(np.argmax(overlaps)) if overlaps.max() >= 0 else -1)
+        result = match_intervals(bounds_a[:, 0], bounds_a[:, 1], bounds_b[:, 0], bounds_b[:, 1])
+        assert result.tolist() == expected
+
+    def test_report_per_participant(self):
+        """Test that the report has one row per participant with sane measures."""
+        report = agreement_report(_trials(), GEOMETRY)
+        assert report["participant_id"].tolist() == ["P01", "P02"]
+        assert (report["n_trials"] == 2).all()
+        assert (report["n_valid_samples"] == 2 * (1500 - 10)).all()
+        assert report["kappa"].between(0.5, 1.0).all()
+        assert (report["matched_ivt"] <= report["ivt_fixations"]).all()
+        assert report["event_agreement"].between(0.0, 1.0).all()
@@ -0,0 +1,88 @@
+import os
+import sys
+import json
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from gaze_events import detect_fixations_ivt
+from fixation_sweep import ivt_defaults_from_spec, load_aoi_boxes, prepare_shared, sweep_fixations
+from screen_geometry import ScreenGeometry
+
+GEOMETRY = ScreenGeometry(24.0, (1920, 1080), 60.0)
+
+
+def _trials():
+    rng = np.random.default_rng(3)
+    trials = []
+    for pid in ["P01", "P02"]:
+        for tid, stimulus in [("T1", "S1"), ("T2", "S2")]:
+            n = 1500
+            t = np.arange(n) * 4.0
+            jumps = rng.random(n) < 0.02
+            x = 960 + np.cumsum(np.where(jumps, rng.normal(0, 80, n), rng.normal(0, 0.2, n)))
+            y = 540 + np.cumsum(np.where(jumps, rng.normal(0, 40, n), rng.normal(0, 0.2, n)))
+            trials.append((pid, tid, stimulus, t, x, y))
+    return trials
+
+
+class TestFixationSweep:
+    """Test suite for the I-VT parameter sweep."""
+
+    def test_grid_shape(self):
+        """Test one row per parameter set and trial."""
+        table = sweep_fixations(_trials(), [20, 35, 50], [60, 80], geometry=GEOMETRY, workers=2)
+        assert len(table) == 3 * 2 * 4
+        assert (table["fixation_count"] > 0).all()
+        assert set(table["velocity_threshold"]) == {20.0, 35.0, 50.0}
+
+    def test_no_trials(self):
+        """Test that an empty trial list gives empty shared arrays and an empty table."""
+        shared = prepare_shared([], GEOMETRY)
+        assert shared.t.size == shared.velocity.size == shared.trial_index.size == 0
+        assert shared.trial_ids == []
+        table = sweep_fixations([], [20, 35], [60], geometry=GEOMETRY)
+        assert table.empty and "fixation_count" in table.columns
+
+    def test_matches_per_trial_detection(self):
+        """Test that shared arrays give the same fixations as running each trial alone."""
+        geometry = GEOMETRY
+        trials = _trials()
+        table = sweep_fixations(trials, [30, 40], [80], geometry=geometry)
+        for pid, tid, _stimulus, t, x, y in trials:
+            x_deg, y_deg = geometry.px_to_deg(x, y)
+            events = detect_fixations_ivt(t, x_deg, y_deg, velocity_threshold=40, min_duration_ms=80)
+            row = table[(table["participant_id"] == pid) & (table["trial_id"] == tid)
+                        & (table["velocity_threshold"] == 40)].iloc[0]
+            assert row["fixation_count"] == len(events["onset_ms"]) > 0
+            assert row["total_fixation_duration_ms"] == pytest.approx(events["duration_ms"].sum())
+
+    def test_longer_min_duration_never_adds_fixations(self):
+        """Test monotonicity across the minimum-duration axis."""
+        table = sweep_fixations(_trials(), [35], [40, 80, 200], geometry=GEOMETRY)
+        counts = table.groupby("min_duration_ms")["fixation_count"].sum()
+        assert counts[40.0] >= counts[80.0] >= counts[200.0]
+        assert counts[40.0] > counts[200.0]
+
+    def test_aoi_measures(self):
+        """Test that a box covering the whole screen catches every fixation."""
+        boxes = {"S1": np.array([[-1e6, -1e6, 1e6, 1e6]]), "S2": np.array([[-10.0, -10.0, -5.0, -5.0]])}
+        table = sweep_fixations(_trials(), [35], [80], geometry=GEOMETRY, aoi_boxes=boxes)
+        s1 = table[table["trial_id"] == "T1"]
+        s2 = table[table["trial_id"] == "T2"]
+        assert (s1["aoi_fixation_count"] == s1["fixation_count"]).all()
+        assert (s1["aoi_dwell_ms"] == s1["total_fixation_duration_ms"]).all()
+        assert (s2["aoi_fixation_count"] == 0).all()
+
+    def test_spec_defaults_and_aoi_loading(self, tmp_path):
+        """Test reading I-VT defaults and AOI rectangles from study files."""
+        pre = str(tmp_path / "preprocessing.json")
+        with open(pre, "w") as f:
+            json.dump({"preprocessing_steps": [{"step_name": "advanced_fixation_detection", "parameters": {
+                "velocity_threshold": "30 degrees/second", "minimum_duration": "100ms"}}]}, f)
+        assert ivt_defaults_from_spec(pre) == {"velocity_threshold": 30.0, "min_duration_ms": 100.0}
+
+        aois = str(tmp_path / "aois.json")
+        with open(aois, "w") as f:
+            json.dump({"aois": [{"stimulus_id": "S1", "coordinates": {"x": 1, "y": 2, "width": 3, "height": 4}}]}, f)
+        assert np.array_equal(load_aoi_boxes(aois)["S1"], [[1, 2, 4, 6]])
@@ -0,0 +1,100 @@
+import os
+import sys
+import json
+import numpy as np
+import pytest
+
+h5py = pytest.importorskip("h5py")
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from gaze_container import (
+    GazeContainerReader, GazeContainerWriter,
+    compression_level_from_spec, trial_chunk_shape
+)
+
+
+def _trial(n, offset=0.0):
+    t = np.arange(n) * 4.0
+    return {"t": t, "x": t + offset, "y": -t}
+
+
+@pytest.fixture
+def container(tmp_path):
+    path = str(tmp_path / "processed" / "eye_tracking.h5")
+    with GazeContainerWriter(path) as writer:
+        for pid in ["P01", "P02"]:
+            for trial in ["T1", "T2"]:
+                writer.write_trial(pid, "S1", "B1", trial, _trial(1000, offset=len(pid + trial)),
+                                   attrs={"stimulus_id": f"stim_{trial}"})
+    return path
+
+
+class TestGazeContainer:
+    """Test suite for the hierarchical gaze container."""
+
+    def test_hierarchy_navigation(self, container):
+        """Test that the participant/session/block/trial tree is navigable."""
+        with GazeContainerReader(container) as reader:
+            assert reader.participants() == ["P01", "P02"]
+            assert reader.trials("P01", "S1", "B1") == ["T1", "T2"]
+            assert len(list(reader.iter_trials())) == 4
+            assert reader.trial_attrs("P02", "S1", "B1", "T2")["stimulus_id"] == "stim_T2"
+
+    def test_read_trial_roundtrip(self, container):
+        """Test that a trial reads back exactly."""
+        with GazeContainerReader(container) as reader:
+            data = reader.read_trial("P01", "S1", "B1", "T1")
+        expected = _trial(1000, offset=len("P01T1"))
+        for column in ["t", "x", "y"]:
+            assert np.array_equal(data[column], expected[column])
+
+    def test_partial_read(self, container):
+        """Test reading a column subset and a row range."""
+        with GazeContainerReader(container) as reader:
+            data = reader.read_trial("P02", "S1", "B1", "T1", columns=["y"], start=10, stop=20)
+            assert list(data) == ["y"]
+            assert np.array_equal(data["y"], -np.arange(10, 20) * 4.0)
+            with pytest.raises(KeyError):
+                reader.read_trial("P02", "S1", "B1", "T1", columns=["pupil"])
+
+    def test_datasets_are_compressed_and_chunked_per_trial(self, container):
+        """Test gzip level 6 and whole-trial chunks."""
+        with GazeContainerReader(container) as reader:
+            dataset = reader.dataset("P01", "S1", "B1", "T1")
+            assert dataset.compression == "gzip"
+            assert dataset.compression_opts == 6
+            assert dataset.chunks == (1000, 3)
+
+    def test_chunk_shape_is_capped(self):
+        """Test that very long trials are split into bounded chunks."""
+        rows, cols = trial_chunk_shape(10_000_000, 4)
+        assert cols == 4
+        assert rows * cols * 8 <= 1024 * 1024
+
+    def test_compression_level_from_spec(self, tmp_path):
+        """Test parsing the gzip level from preprocessing.json."""
+        path = str(tmp_path / "preprocessing.json")
+        with open(path, "w") as f:
+            json.dump({"output_format": {"eye_tracking": {"compression": "gzip level 4"}}}, f)
+        assert compression_level_from_spec(path) == 4
+        assert compression_level_from_spec(str(tmp_path / "missing.json")) == 6
+
+    def test_column_views_feed_chunked_detection(self, container):
+        """Test that lazy column views work with chunked fixation detection."""
+        from gaze_events import detect_fixations_ivt, detect_fixations_ivt_chunked
+        with GazeContainerReader(container) as reader:
+            key = ("P01", "S1", "B1", "T2")
+            views = [reader.column_view(*key, c) for c in ["t", "x", "y"]]
+            chunked = detect_fixations_ivt_chunked(*views, velocity_threshold=2000, chunk_samples=64)
+            data = reader.read_trial(*key)
+        expected = detect_fixations_ivt(data["t"], data["x"], data["y"], velocity_threshold=2000)
+        assert np.array_equal(chunked["onset_index"], expected["onset_index"])
+        assert len(expected["onset_index"]) == 1
+
+    def test_rewrite_trial_replaces_data(self, container):
+        """Test that writing an existing trial replaces it."""
+        with GazeContainerWriter(container) as writer:
+            writer.write_trial("P01", "S1", "B1", "T1", {"t": np.zeros(5)})
+        with GazeContainerReader(container) as reader:
+            assert reader.columns("P01", "S1", "B1", "T1") == ["t"]
+            assert len(reader.read_trial("P01", "S1", "B1", "T1")["t"]) == 5
@@ -0,0 +1,75 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from gaze_events import (
+    EVENT_FIELDS, compute_velocity, detect_fixations_ivt,
+    detect_fixations_ivt_chunked, chunk_samples_for_memory
+)
+
+
+def synthetic_recording(n=5000, seed=0):
+    """Random-walk gaze with occasional saccades and dropped samples at 250 Hz."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) * 4.0
+    jumps = rng.random(n) < 0.03
+    x = np.cumsum(np.where(jumps, rng.normal(0, 5, n), rng.normal(0, 0.01, n)))
+    y = np.cumsum(np.where(jumps, rng.normal(0, 5, n), rng.normal(0, 0.01, n)))
+    x[rng.random(n) < 0.01] = np.nan
+    return t, x, y
+
+
+class TestGazeEvents:
+    """Test suite for I-VT fixation detection."""
+
+    def test_velocity_units(self):
+        """Test that velocity is in units per second."""
+        t = np.array([0.0, 4.0, 8.0, 12.0])
+        x = np.array([0.0, 1.0, 2.0, 3.0])
+        velocity = compute_velocity(t, x, np.zeros(4))
+        assert np.isnan(velocity[0]) and np.isnan(velocity[-1])
+        assert velocity[1] == pytest.approx(250.0)
+
+    def test_single_fixation(self):
+        """Test that a steady gaze yields one fixation at its centroid."""
+        t = np.arange(50) * 4.0
+        x = np.full(50, 10.0)
+        y = np.full(50, 5.0)
+        events = detect_fixations_ivt(t, x, y, velocity_threshold=35, min_duration_ms=80)
+        assert len(events["onset_ms"]) == 1
+        assert events["x"][0] == pytest.approx(10.0)
+        assert events["onset_index"][0] == 1
+
+    def test_min_duration_filter(self):
+        """Test that short fixations are dropped."""
+        t = np.arange(10) * 4.0
+        events = detect_fixations_ivt(t, np.zeros(10), np.zeros(10), min_duration_ms=80)
+        assert len(events["onset_ms"]) == 0
+
+    @pytest.mark.parametrize("chunk_samples", [1, 2, 7, 128, 4999, 5000, 10000])
+    def test_chunked_matches_in_memory(self, chunk_samples):
+        """Test that chunked detection is identical to in-memory detection."""
+        t, x, y = synthetic_recording()
+        expected = detect_fixations_ivt(t, x, y)
+        actual = detect_fixations_ivt_chunked(t, x, y, chunk_samples=chunk_samples)
+        assert len(expected["onset_ms"]) > 10
+        for name in EVENT_FIELDS:
+            assert np.array_equal(expected[name], actual[name]), name
+
+    def test_chunked_reads_memmap(self, tmp_path):
+        """Test that chunked detection works on on-disk arrays."""
+        t, x, y = synthetic_recording(2000)
+        arrays = []
+        for name, values in [("t", t), ("x", x), ("y", y)]:
+            mm = np.memmap(str(tmp_path / f"{name}.dat"), dtype=np.float64, mode="w+", shape=values.shape)
+            mm[:] = values
+            arrays.append(mm)
+        actual = detect_fixations_ivt_chunked(*arrays, chunk_samples=300)
+        expected = detect_fixations_ivt(t, x, y)
+        assert np.array_equal(expected["onset_index"], actual["onset_index"])
+
+    def test_memory_target_sets_chunk_size(self):
+        """Test that a larger memory target gives larger chunks."""
+        assert chunk_samples_for_memory(512) > chunk_samples_for_memory(64)
@@ -0,0 +1,98 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from gaze_filtering import (
+    filter_trials, median_filter_batch, pad_trials, resample_trials,
+    savgol_coefficients, savgol_filter_batch, window_samples
+)
+
+
+def _trial(n, rate_hz=250.0, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) * 1000.0 / rate_hz
+    return {"t": t, "x": rng.normal(500, 5, n), "y": rng.normal(300, 5, n)}
+
+
+class TestGazeFiltering:
+    """Test suite for batched filtering and resampling."""
+
+    def test_savgol_preserves_polynomials(self):
+        """Test that a quadratic passes through an order-2 filter unchanged."""
+        x = np.arange(50, dtype=float) ** 2
+        filtered = savgol_filter_batch(x[None, :], 7, 2)[0]
+        assert np.allclose(filtered, x)
+        assert savgol_coefficients(5, 2).sum() == pytest.approx(1.0)
+
+    def test_savgol_matches_scipy(self):
+        """Test interior samples against scipy.signal.savgol_filter."""
+        signal = pytest.importorskip("scipy.signal")
+        batch = np.random.default_rng(0).normal(size=(3, 200))
+        expected = signal.savgol_filter(batch, 11, 3, axis=-1)
+        assert np.allclose(savgol_filter_batch(batch, 11, 3)[:, 5:-5], expected[:, 5:-5])
+
+    def test_median_removes_spike(self):
+        """Test that a single-sample spike is removed by the median filter."""
+        x = np.zeros(20)
+        x[10] = 100.0
+        assert median_filter_batch(x[None, :], 3)[0, 10] == 0.0
+
+    def test_gaps_left_untouched(self):
+        """Test gap-aware filtering: NaNs stay NaN, neighbours keep raw values."""
+        x = np.arange(30, dtype=float) + np.random.default_rng(1).normal(0, 1, 30)
+        x[15] = np.nan
+        filtered = savgol_filter_batch(x[None, :], 5, 2)[0]
+        assert np.isnan(filtered[15])
+        assert np.array_equal(filtered[13:18][[0, 1, 3, 4]], x[13:18][[0, 1, 3, 4]])
+        assert not np.array_equal(filtered[5:10], x[5:10])
+
+    def test_filter_trials_of_different_lengths(self):
+        """Test that batching ragged trials gives per-trial results."""
+        trials = [_trial(100, seed=1), _trial(37, seed=2)]
+        filtered = filter_trials(trials, savgol=(7, 2), median_window=3)
+        assert [len(t["x"]) for t in filtered] == [100, 37]
+        alone = filter_trials([trials[1]], savgol=(7, 2), median_window=3)[0]
+        assert np.allclose(filtered[1]["x"], alone["x"])
+        assert np.array_equal(filtered[0]["t"], trials[0]["t"])
+
+    def test_pad_trials(self):
+        """Test NaN padding of ragged trials."""
+        batch, lengths = pad_trials([np.ones(3), np.ones(1)])
+        assert batch.shape == (2, 3) and list(lengths) == [3, 1]
+        assert np.isnan(batch[1, 1:]).all()
+
+    def test_resample_250_to_1000(self):
+        """Test upsampling a linear signal and keeping trials separate."""
+        t = np.arange(0, 100, 4.0)
+        trials = [{"t": t, "x": t * 2, "y": -t}, {"t": t[:10] + 5000, "x": np.full(10, 7.0), "y": t[:10]}]
+        resampled = resample_trials(trials, 1000.0)
+        assert len(resampled[0]["t"]) == 97
+        assert np.allclose(resampled[0]["x"], resampled[0]["t"] * 2)
+        assert np.allclose(resampled[1]["x"], 7.0)
+        assert resampled[1]["t"][0] == 5000.0
+
+    def test_resample_does_not_bridge_gaps(self):
+        """Test that invalid samples and dropped-sample gaps give NaN."""
+        t = np.concatenate((np.arange(0, 40, 4.0), np.arange(80, 120, 4.0)))
+        x = np.arange(t.size, dtype=float)
+        x[3] = np.nan
+        resampled = resample_trials([{"t": t, "x": x, "y": x}], 500.0, source_rate_hz=250.0)[0]
+        times = resampled["t"]
+        assert np.isnan(resampled["x"][(times > 8) & (times < 16)]).all()
+        assert np.isnan(resampled["x"][(times > 36) & (times < 80)]).all()
+        assert np.isfinite(resampled["x"][times == 84.0]).all()
+
+    def test_resample_empty_trials(self):
+        """Test that trials without samples are returned unchanged, alone or among others."""
+        empty = {"t": np.empty(0), "x": np.empty(0), "y": np.empty(0)}
+        resampled = resample_trials([empty, dict(empty)], 1000.0)
+        assert [len(trial["t"]) for trial in resampled] == [0, 0]
+        mixed = resample_trials([empty, _trial(25)], 1000.0)
+        assert len(mixed[0]["t"]) == 0 and len(mixed[1]["t"]) == 97
+
+    def test_window_samples_is_odd(self):
+        """Test converting a window in ms to an odd sample count."""
+        assert window_samples(20, 250) == 5
+        assert window_samples(16, 250) % 2 == 1
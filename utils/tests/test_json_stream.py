@@ -0,0 +1,97 @@
+import io
+import os
+import sys
+import json
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from jsonschema import Draft7Validator
+from json_stream import JSONStreamError, JSONStreamReader, read_schema_ref, validate_stream
+
+SCHEMA = {
+    "type": "object",
+    "required": ["aois", "study"],
+    "additionalProperties": False,
+    "properties": {
+        "$schema": {"type": "string"},
+        "study": {"type": "string"},
+        "aois": {"type": "array", "minItems": 1, "items": {"$ref": "#/definitions/aoi"}},
+    },
+    "definitions": {
+        "aoi": {"type": "object", "required": ["id"], "properties": {"x": {"type": "number"}}},
+    },
+}
+
+
+def _stream(data, chunk_size=7):
+    return JSONStreamReader(io.BytesIO(json.dumps(data, ensure_ascii=False).encode("utf-8")), chunk_size)
+
+
+class TestJSONStreamReader:
+    """Test suite for the incremental JSON reader."""
+
+    def test_items_across_chunk_boundaries(self):
+        """Test that values split by any chunk size decode identically."""
+        data = [1.25, "olá" * 5, True, None, {"a": [1, 2]}, -3e10, 12345678]
+        for chunk_size in (1, 2, 3, 5, 64):
+            reader = _stream(data, chunk_size)
+            assert [value for value, _ in reader.iter_array()] == data
+            reader.end()
+
+    def test_offsets_are_bytes(self):
+        """Test that offsets count UTF-8 bytes, not characters."""
+        raw = '[{"n": "ção"}, {"n": 2}]'.encode("utf-8")
+        offsets = [offset for _, offset in JSONStreamReader(io.BytesIO(raw), 4).iter_array()]
+        assert offsets == [1, raw.index(b'{"n": 2}')]
+
+    def test_buffer_bounded_by_largest_item(self):
+        """Test that the reader never holds more than one item plus a chunk."""
+        item = {"id": "x" * 1000}
+        reader = _stream([item] * 500, chunk_size=256)
+        peak = 0
+        for _ in reader.iter_array():
+            peak = max(peak, len(reader._buffer))
+        assert peak < 3 * len(json.dumps(item))
+
+    def test_malformed_reports_offset(self):
+        """Test that syntax errors carry the byte offset of the problem."""
+        reader = JSONStreamReader(io.BytesIO(b'[1, {"a": tru}]'), 4)
+        with pytest.raises(JSONStreamError) as info:
+            list(reader.iter_array())
+        assert info.value.offset == 10
+
+    def test_malformed_value_fails_without_reading_ahead(self):
+        """Test that a syntax error inside buffered data is raised before reading the rest."""
+        raw = b'[{"a": tru, "b": "' + b"x" * 10 ** 6 + b'"}]'
+        f = io.BytesIO(raw)
+        with pytest.raises(JSONStreamError) as info:
+            list(JSONStreamReader(f, 64).iter_array())
+        assert info.value.offset == 7
+        assert f.tell() <= 64
+
+    def test_schema_ref_after_arrays(self):
+        """Test that $schema is found after large values without keeping them."""
+        raw = json.dumps({"aois": [{"id": i} for i in range(100)], "$schema": "s.json"}).encode()
+        assert read_schema_ref(io.BytesIO(raw)) == "s.json"
+        assert read_schema_ref(io.BytesIO(b"[1]")) is None
+
+
+class TestValidateStream:
+    """Test suite for item-by-item schema validation."""
+
+    def test_matches_whole_document_validation(self):
+        """Test that streaming finds the same violations as a full load."""
+        doc = {"aois": [{"id": 1, "x": 0}, {"x": "left"}, {"id": 3}], "study": 4, "extra": True}
+        raw = json.dumps(doc).encode()
+        errors = validate_stream(io.BytesIO(raw), Draft7Validator(SCHEMA))
+        full = Draft7Validator(SCHEMA).iter_errors(doc)
+        assert sorted(e["message"] for e in errors) == sorted(e.message for e in full)
+        by_path = {e["path"]: e["offset"] for e in errors}
+        assert by_path["$.aois[1]"] == by_path["$.aois[1].x"] == raw.index(b'{"x"')
+        assert by_path["$.study"] == raw.index(b"4")
+
+    def test_array_length_keywords(self):
+        """Test minItems on a streamed array and required on the document."""
+        errors = validate_stream(io.BytesIO(b'{"aois": []}'), Draft7Validator(SCHEMA))
+        assert {(e["path"], e["offset"]) for e in errors} == {("$.aois", 9), ("$", 0)}
+        assert any("minItems" in e["message"] for e in errors)
@@ -0,0 +1,137 @@
+import os
+import sys
+import json
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from preprocessing_checkpoints import (
+    CheckpointStore, load_stage_parameters, run_pipeline
+)
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """Two participants with one raw file each plus a preprocessing spec."""
+    inputs = {}
+    for pid in ["P01", "P02"]:
+        path = str(tmp_path / "raw" / f"{pid}.tsv")
+        _write(path, f"samples for {pid}\n")
+        inputs[pid] = [path]
+
+    spec = {
+        "steps": [
+            {"step": "import", "method": "tsv", "parameters": {"rate": 250}},
+            {"step": "fixation_detection", "method": "ivt", "parameters": {"threshold": 35}},
+        ]
+    }
+    spec_path = str(tmp_path / "preprocessing.json")
+    _write(spec_path, json.dumps(spec))
+    return tmp_path, inputs, spec_path
+
+
+def _stages(calls):
+    def ingest(paths, params):
+        calls.append("ingest")
+        return [open(p).read() for p in paths]
+
+    def fixations(data, params):
+        calls.append("fixation_detection")
+        return {"n": len(data), "threshold": params["parameters"]["threshold"]}
+
+    return {"ingest": ingest, "fixation_detection": fixations}
+
+
+class TestCheckpoints:
+    """Test suite for checkpoint/resume of preprocessing stages."""
+
+    def test_stage_parameters_from_both_layouts(self, tmp_path):
+        """Test that flat and advanced preprocessing layouts are understood."""
+        path = str(tmp_path / "pre.json")
+        _write(path, json.dumps({"preprocessing_steps": [
+            {"step_name": "blink_artifact_handling", "parameters": {"buffer": "100ms"}}
+        ]}))
+        params = load_stage_parameters(path)
+        assert params["blink_handling"]["parameters"] == {"buffer": "100ms"}
+        assert params["ingest"] == {}
+
+    def test_rerun_reuses_everything(self, corpus):
+        """Test that a second run reuses all tasks."""
+        tmp_path, inputs, spec_path = corpus
+        ckpt = str(tmp_path / "ckpt")
+        calls = []
+        first, report1 = run_pipeline(inputs, _stages(calls), spec_path, ckpt)
+        assert report1.computed == 4 and report1.reused == 0
+
+        calls.clear()
+        second, report2 = run_pipeline(inputs, _stages(calls), spec_path, ckpt)
+        assert calls == []
+        assert report2.reused == 4
+        assert first == second
+
+    def test_parameter_change_invalidates_stage_only(self, corpus):
+        """Test that changing one stage's parameters keeps upstream checkpoints."""
+        tmp_path, inputs, spec_path = corpus
+        ckpt = str(tmp_path / "ckpt")
+        run_pipeline(inputs, _stages([]), spec_path, ckpt)
+
+        spec = json.load(open(spec_path))
+        spec["steps"][1]["parameters"]["threshold"] = 40
+        _write(spec_path, json.dumps(spec))
+
+        calls = []
+        results, report = run_pipeline(inputs, _stages(calls), spec_path, ckpt)
+        assert calls == ["fixation_detection", "fixation_detection"]
+        assert report.reused == 2 and report.computed == 2
+        assert results["P01"]["threshold"] == 40
+        # Stale checkpoints are replaced rather than accumulated
+        assert len(os.listdir(os.path.join(ckpt, "P01"))) == 2
+
+    def test_input_change_invalidates_participant(self, corpus):
+        """Test that editing one participant's input only reruns that participant."""
+        tmp_path, inputs, spec_path = corpus
+        ckpt = str(tmp_path / "ckpt")
+        run_pipeline(inputs, _stages([]), spec_path, ckpt)
+        _write(inputs["P02"][0], "changed\n")
+
+        _, report = run_pipeline(inputs, _stages([]), spec_path, ckpt)
+        assert report.participants["P01"] == {"ingest": "reused", "fixation_detection": "reused"}
+        assert report.participants["P02"] == {"ingest": "computed", "fixation_detection": "computed"}
+
+    def test_crash_resumes_from_last_checkpoint(self, corpus):
+        """Test that a crash mid-run keeps finished work."""
+        tmp_path, inputs, spec_path = corpus
+        ckpt = str(tmp_path / "ckpt")
+        stages = _stages([])
+
+        def failing(data, params):
+            raise RuntimeError("crash")
+
+        with pytest.raises(RuntimeError):
+            run_pipeline(inputs, {"ingest": stages["ingest"], "fixation_detection": failing},
+                         spec_path, ckpt)
+
+        calls = []
+        _, report = run_pipeline(inputs, _stages(calls), spec_path, ckpt)
+        assert report.participants["P01"]["ingest"] == "reused"
+        assert "ingest" in calls  # P02 never got past ingest
+        assert not any(name.endswith(".tmp") for name in os.listdir(os.path.join(ckpt, "P01")))
+
+    def test_unknown_stage_rejected(self, corpus):
+        """Test that stage names outside the pipeline are rejected."""
+        tmp_path, inputs, spec_path = corpus
+        with pytest.raises(ValueError):
+            run_pipeline(inputs, {"smoothing": lambda d, p: d}, spec_path, str(tmp_path / "c"))
+
+    def test_store_roundtrip(self, tmp_path):
+        """Test that the store saves and loads values by key."""
+        store = CheckpointStore(str(tmp_path))
+        store.save("P01", "ingest", "a" * 64, {"x": 1})
+        assert store.has("P01", "ingest", "a" * 64)
+        assert not store.has("P01", "ingest", "b" * 64)
+        assert store.load("P01", "ingest", "a" * 64) == {"x": 1}
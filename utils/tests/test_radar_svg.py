@@ -0,0 +1,40 @@
+import os
+import sys
+import subprocess
+import xml.dom.minidom
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from radar_svg import CENTER, radar_svg
+
+UTILS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+class TestRadarSvg:
+    """Test suite for the dependency-free radar chart."""
+
+    def test_valid_svg(self):
+        """Test that the chart is well-formed SVG with one vertex per axis."""
+        svg = radar_svg(["A & B", "Two\nLines", "C"], [1.0, 0.5, 0.0], "Title\n50%", "#2ecc71")
+        doc = xml.dom.minidom.parseString(svg)
+        polygons = doc.getElementsByTagName("polygon")
+        # Five grid rings plus the score shape
+        assert len(polygons) == 6
+        shape = [tuple(map(float, p.split(","))) for p in polygons[-1].getAttribute("points").split()]
+        assert len(shape) == 3
+        assert shape[2] == (CENTER, CENTER)
+        assert "A &amp; B" in svg
+
+    def test_scoring_without_plotting_stack(self, tmp_path):
+        """Test that scoring and the default chart never import matplotlib or numpy."""
+        (tmp_path / "metadata.json").write_text('{"study_title": "T"}')
+        code = (
+            "import sys; sys.path.insert(0, %r)\n"
+            "import repl_et_score\n"
+            "repl_et_score.main()\n"
+            "assert 'matplotlib' not in sys.modules and 'numpy' not in sys.modules\n"
+        ) % UTILS_DIR
+        result = subprocess.run([sys.executable, "-c", code], cwd=str(tmp_path),
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert (tmp_path / "outputs" / "score.svg").exists()
+        assert not (tmp_path / "outputs" / "score.png").exists()
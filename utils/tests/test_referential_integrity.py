@@ -0,0 +1,114 @@
+import os
+import sys
+import json
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from data_quality import compute_quality, summarize_participants, write_quality_tables
+from exclusion_engine import run_exclusions
+from gaze_container import GazeContainerWriter
+from referential_integrity import CONTAINER_PATH, build_indexes, check_integrity
+
+
+def _write_json(root, relpath, data):
+    path = root / relpath
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data))
+
+
+@pytest.fixture
+def study(tmp_path):
+    """Two participants, two stimuli and an AOI table with a few bad rows."""
+    _write_json(tmp_path, "participants/participants.json",
+                {"participants": [{"participant_id": "P01"}, {"participant_id": "P02"}]})
+    _write_json(tmp_path, "stimuli/stimuli_metadata.json",
+                {"stimuli": [{"stimulus_id": "S01"}, {"stimulus_id": "S02"}]})
+    _write_json(tmp_path, "stimuli/stimuli_annotations.json",
+                {"annotations": [{"stimulus_id": "S01"}, {"stimulus_id": "S09"}]})
+    _write_json(tmp_path, "aois/aois_definition.json", {"aois": [
+        {"aoi_id": "A1", "stimulus_id": "S01", "aoi_name": "signature"},
+        {"aoi_id": "A2", "stimulus_id": "S02", "aoi_name": "loop"},
+    ]})
+    rows = ["participant_id,stimulus_id,aoi_label,dwell_time_ms"]
+    for i in range(25):
+        rows.append(f"P0{1 + i % 2},S01,signature,{i}")
+    rows[8] = "P07,S01,signature,7"       # unknown participant at data row 8
+    rows[19] = "P01,S01,loop,18"          # loop belongs to S02, data row 19
+    table = tmp_path / "analysis" / "results_tables" / "aoi_analysis.csv"
+    table.parent.mkdir(parents=True)
+    table.write_text("\n".join(rows) + "\n")
+    return tmp_path
+
+
+def _reference(report, source, key):
+    return next(r for r in report["references"] if r["source"].replace(os.sep, "/") == source and r["key"] == key)
+
+
+class TestReferentialIntegrity:
+    """Test suite for the cross-file id reference checks."""
+
+    def test_indexes(self, study):
+        """Test that each id index is built from its source file."""
+        indexes = build_indexes(str(study))
+        assert indexes.participants == {"P01", "P02"}
+        assert indexes.aoi_names == {("S01", "signature"), ("S02", "loop")}
+        assert indexes.summary()["stimuli"]["size"] == 2
+
+    def test_dangling_rows_across_chunks(self, study):
+        """Test that dangling references keep their data row numbers across chunks."""
+        report = check_integrity(str(study), chunk_rows=4)
+        table = "analysis/results_tables/aoi_analysis.csv"
+        participants = _reference(report, table, "participant_id")
+        assert (participants["checked"], participants["dangling"]) == (25, 1)
+        assert participants["examples"] == [{"row": 8, "value": "P07"}]
+        aois = _reference(report, table, "stimulus_id+aoi_label")
+        assert aois["examples"] == [{"row": 19, "value": "S01+loop"}]
+        assert _reference(report, table, "stimulus_id")["dangling"] == 0
+
+        annotations = _reference(report, "stimuli/stimuli_annotations.json", "annotations[].stimulus_id")
+        assert annotations["examples"] == [{"row": 1, "value": "S09"}]
+        assert report["dangling"] == 3
+
+    def test_gaze_container_keys(self, study):
+        """Test container participants and stimuli, and result rows pointing at unknown trials."""
+        path = study / CONTAINER_PATH
+        samples = {"t": np.arange(3.0), "x": np.zeros(3), "y": np.zeros(3)}
+        with GazeContainerWriter(str(path)) as writer:
+            writer.write_trial("P01", "s1", "b1", "t1", samples, {"stimulus_id": "S01"})
+            writer.write_trial("P03", "s1", "b1", "t1", samples, {"stimulus_id": "S05"})
+        quality = study / "data" / "analysis" / "quality_trials.csv"
+        quality.parent.mkdir(parents=True, exist_ok=True)
+        quality.write_text("participant_id,trial_id,data_loss\nP01,s1/b1/t1,0.1\nP01,s1/b1/t2,0.2\n")
+
+        report = check_integrity(str(study))
+        assert report["indexes"]["trials"]["size"] == 2
+        container = CONTAINER_PATH
+        assert _reference(report, container, "participant")["examples"] == [{"row": "P03", "value": "P03"}]
+        assert _reference(report, container, "stimulus_id")["examples"] == [{"row": "P03/s1/b1/t1", "value": "S05"}]
+        trials = _reference(report, "data/analysis/quality_trials.csv", "participant_id+trial_id")
+        assert trials["examples"] == [{"row": 2, "value": "P01+s1/b1/t2"}]
+
+    def test_exclusion_table_rows_are_not_dangling(self, study):
+        """Test that participant-level exclusions (empty trial_id) only check their participant."""
+        def trial(pid, tid, x):
+            x = np.asarray(x, dtype=float)
+            return pid, tid, np.arange(x.size) * 10.0, x, np.zeros_like(x)
+
+        good, lossy = [0.0] * 20, [0.0] * 10 + [np.nan] * 10
+        trials = compute_quality([trial("P01", "T1", good), trial("P01", "T2", lossy), trial("P02", "T1", good)],
+                                 sampling_rate_hz=100, validity_threshold=0.85, window_ms=50)
+        quality_dir = str(study / "data" / "analysis")
+        write_quality_tables(trials, summarize_participants(trials, 0.85), quality_dir)
+        protocol = study / "collection" / "protocol.json"
+        _write_json(study, "collection/protocol.json", {
+            "exclusion_criteria": ["incomplete session", "excessive data loss"],
+            "session_structure": {"main_trials": 2}})
+        exclusions, _ = run_exclusions(str(protocol), quality_dir, os.path.join(quality_dir, "exclusions.csv"),
+                                       str(study / "cache"), validity_threshold=0.85)
+        assert set(exclusions["level"]) == {"trial", "participant"}
+
+        report = check_integrity(str(study))
+        trials_ref = _reference(report, "data/analysis/exclusions.csv", "participant_id+trial_id")
+        assert (trials_ref["checked"], trials_ref["dangling"]) == (len(exclusions), 0)
+        assert _reference(report, "data/analysis/exclusions.csv", "participant_id")["dangling"] == 0
@@ -13,7 +13,7 @@ try:
         check_metadata, check_participants, check_equipment,
         check_stimuli, check_aois, check_data_quality,
         check_preprocessing, check_analysis, check_threats,
-        check_reproducibility
+        check_reproducibility, score_study, diagnose_study, write_reports
     )
 except ImportError:
     pytest.skip("repl_et_score module not available", allow_module_level=True)
@@ -215,6 +215,84 @@ class TestReplETScore:
             score = func()
             assert 0.0 <= score <= 1.0, f"Score out of bounds for {func.__name__}: {score}"
 
+class TestScoreStudy:
+    """Test suite for path-parameterised scoring."""
+    
+    def test_scores_root_without_chdir(self, temp_repo):
+        """Test that a study root is scored without changing directory."""
+        with open("ReplET/metadata.json", "w") as f:
+            json.dump({"study_title": "T", "paradigm": "P", "task_description": "D"}, f)
+        cwd = os.getcwd()
+        
+        scores = score_study("ReplET")
+        assert os.getcwd() == cwd
+        assert scores["metadata"] == 1.0
+        assert scores["equipment"] == 0
+        assert list(scores)[0] == "metadata" and len(scores) == 10
+        
+        os.chdir("ReplET")
+        try:
+            assert score_study() == scores
+        finally:
+            os.chdir(cwd)
+    
+    def test_concurrent_scoring(self, temp_repo):
+        """Test that studies scored from threads get their own scores."""
+        from concurrent.futures import ThreadPoolExecutor
+        roots = []
+        for i in range(8):
+            root = os.path.join("studies", f"study_{i}")
+            os.makedirs(os.path.join(root, "equipment"))
+            for name in ["tracker_specs.json", "screen_setup.json", "software_env.json"][:i % 4]:
+                with open(os.path.join(root, "equipment", name), "w") as f:
+                    f.write("{}")
+            roots.append(root)
+        
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(score_study, roots))
+        assert [r["equipment"] for r in results] == [[0, 0.5, 0.75, 1.0][i % 4] for i in range(8)]
+
+class TestDiagnostics:
+    """Test suite for per-check diagnostics."""
+    
+    def test_diagnostics_record_inputs_and_deductions(self, temp_repo):
+        """Test files, bytes, deductions and errors recorded for each check."""
+        with open("ReplET/metadata.json", "w") as f:
+            json.dump({"study_title": "T", "paradigm": "P"}, f)
+        with open("ReplET/validity/validity.json", "w") as f:
+            f.write("{broken")
+        
+        scores, diagnostics = diagnose_study("ReplET")
+        assert scores == {name: d["score"] for name, d in diagnostics.items()}
+        metadata = diagnostics["metadata"]
+        assert metadata["score"] == 0.5
+        assert metadata["files"] == ["metadata.json"]
+        assert metadata["bytes_read"] == os.path.getsize("ReplET/metadata.json")
+        assert metadata["deductions"] == ["metadata.json: missing or empty task_description"]
+        assert metadata["elapsed_s"] >= 0 and metadata["error"] is None
+        
+        # check_threats lets parse errors escape; diagnostics report them
+        assert diagnostics["threats"]["score"] == 0
+        assert diagnostics["threats"]["error"].startswith("JSONDecodeError")
+        assert "missing equipment/tracker_specs.json" in diagnostics["equipment"]["deductions"]
+        assert diagnostics["equipment"]["bytes_read"] == 0
+    
+    def test_diagnostics_report_and_profile(self, temp_repo):
+        """Test that diagnostics are written next to the report and profiles dumped."""
+        import pstats
+        scores, diagnostics = diagnose_study("ReplET", profile_path="out/score.prof")
+        assert pstats.Stats("out/score.prof").total_calls > 0
+        
+        write_reports(scores, "out", diagnostics=diagnostics)
+        with open("out/diagnostics.json") as f:
+            written = json.load(f)
+        assert written["checks"]["data_quality"]["deductions"] == ["missing collection/protocol.json",
+                                                                  "empty collection/logs"]
+        with open("out/report.json") as f:
+            assert json.load(f) == scores
+        with open("out/report.md") as f:
+            assert "## Diagnostics" in f.read()
+
 class TestScoreIntegration:
     """Integration tests for the complete scoring system."""
     
@@ -233,7 +311,7 @@ class TestScoreIntegration:
         # Import and run main (if available)
         try:
             from repl_et_score import main
-            main()
+            main(png=True)
             
             # Check that output files would be created
             assert mock_savefig.called
@@ -0,0 +1,98 @@
+import os
+import sys
+import json
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+import requests
+from schema_registry import SchemaRegistry, file_uri
+from validate_jsons import ValidatorCache, validate_file
+
+COMMON = {
+    "$id": "https://repl-et.example.org/schemas/common.schema.json",
+    "definitions": {"participant_id": {"type": "string", "pattern": "^P[0-9]+$"}},
+}
+PARTICIPANTS = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "type": "object",
+    "properties": {
+        "participants": {"type": "array", "items": {"$ref": "#/definitions/participant"}},
+        "lab": {"$ref": "lab.schema.json"},
+    },
+    "definitions": {
+        "participant": {
+            "type": "object",
+            "properties": {"id": {"$ref": "https://repl-et.example.org/schemas/common.schema.json#/definitions/participant_id"}},
+        },
+    },
+}
+LAB = {"type": "string", "minLength": 2}
+
+
+@pytest.fixture
+def schema_dir(tmp_path):
+    directory = tmp_path / "schemas"
+    directory.mkdir()
+    for name, schema in [("common", COMMON), ("participants", PARTICIPANTS), ("lab", LAB)]:
+        with open(directory / f"{name}.schema.json", "w") as f:
+            json.dump(schema, f)
+    return str(directory)
+
+
+@pytest.fixture
+def no_network(monkeypatch):
+    def refuse(*args, **kwargs):
+        raise AssertionError("network access attempted")
+    monkeypatch.setattr(requests, "get", refuse)
+
+
+class TestSchemaRegistry:
+    """Test suite for the offline schema registry."""
+
+    def test_refs_resolved_from_memory(self, schema_dir, tmp_path, no_network):
+        """Test $id, relative and meta-schema references without network access."""
+        registry = SchemaRegistry([schema_dir], cache_dir=str(tmp_path / "cache"))
+        validator = registry.validator(registry.locate("participants.schema.json", os.path.join(schema_dir, "x.json")))
+        assert validator.is_valid({"participants": [{"id": "P1"}], "lab": "UFBA"})
+        errors = list(validator.iter_errors({"participants": [{"id": "X"}], "lab": "U"}))
+        assert len(errors) == 2
+
+        # A schema file itself validates against the bundled draft-07 meta-schema
+        result = validate_file(os.path.join(schema_dir, "participants.schema.json"), ValidatorCache(registry))
+        assert result["status"] == "ok"
+        assert result["schema"] == "http://json-schema.org/draft-07/schema"
+
+    def test_relative_path_fallback(self, schema_dir, tmp_path):
+        """Test that a study copied elsewhere still finds the indexed schemas."""
+        registry = SchemaRegistry([schema_dir], cache_dir=str(tmp_path / "cache"))
+        copied = tmp_path / "elsewhere" / "study" / "participants" / "participants.json"
+        located = registry.locate("../schemas/participants.schema.json", str(copied))
+        assert located == file_uri(os.path.join(schema_dir, "participants.schema.json"))
+
+    def test_remote_schemas_cached_on_disk(self, tmp_path, monkeypatch):
+        """Test that a remote schema is fetched once, then served offline from the cache."""
+        url = "https://schemas.example.org/gaze.schema.json"
+        calls = []
+
+        class Response:
+            def raise_for_status(self):
+                pass
+
+            def json(self):
+                return {"type": "object", "required": ["t"]}
+
+        def fake_get(requested, timeout=None):
+            calls.append(requested)
+            return Response()
+
+        monkeypatch.setattr(requests, "get", fake_get)
+        cache_dir = str(tmp_path / "cache")
+        first = SchemaRegistry([], cache_dir=cache_dir)
+        assert first.get(url)["required"] == ["t"]
+        assert calls == [url] and first.fetched == 1
+
+        offline = SchemaRegistry([], cache_dir=cache_dir, offline=True)
+        assert not offline.validator(url).is_valid({})
+        assert calls == [url]
+        with pytest.raises(LookupError):
+            offline.get("https://schemas.example.org/other.schema.json")
@@ -0,0 +1,112 @@
+import os
+import sys
+import json
+import importlib.util
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from score_cache import load_cache, score_with_cache, scorer_source_hash
+
+INPUTS = {
+    "meta": [("metadata.json", "file")],
+    "raw": [("stimuli", "dir")],
+    "license": [("LICENSE", "exists")],
+}
+
+
+def _counting_checks(calls):
+    def make(name, value):
+        def check(root):
+            calls.append(name)
+            return value(root)
+        return check
+    return {
+        "meta": make("meta", lambda root: float(len(open(os.path.join(root, "metadata.json")).read()) > 2)),
+        "raw": make("raw", lambda root: float(len(os.listdir(os.path.join(root, "stimuli"))) > 0)),
+        "license": make("license", lambda root: float(os.path.exists(os.path.join(root, "LICENSE")))),
+    }
+
+
+class TestScoreCache:
+    """Test suite for the fingerprint score cache."""
+
+    def test_recomputes_only_changed_components(self, tmp_path):
+        """Test cache hits, touched-but-unchanged files and real changes."""
+        root = str(tmp_path)
+        (tmp_path / "metadata.json").write_text("{}")
+        (tmp_path / "stimuli").mkdir()
+        cache_path = str(tmp_path / "outputs" / "score_cache.json")
+        calls = []
+        checks = _counting_checks(calls)
+
+        scores, recomputed = score_with_cache(root, checks, INPUTS, cache_path)
+        assert recomputed == ["meta", "raw", "license"]
+        assert scores == {"meta": 0.0, "raw": 0.0, "license": 0.0}
+
+        calls.clear()
+        assert score_with_cache(root, checks, INPUTS, cache_path) == (scores, [])
+        assert calls == []
+
+        # Same content with a new mtime is still a hit
+        os.utime(tmp_path / "metadata.json", ns=(1, 1))
+        assert score_with_cache(root, checks, INPUTS, cache_path)[1] == []
+
+        (tmp_path / "metadata.json").write_text(json.dumps({"study_title": "T"}))
+        (tmp_path / "stimuli" / "s1.png").write_bytes(b"")
+        scores, recomputed = score_with_cache(root, checks, INPUTS, cache_path)
+        assert recomputed == ["meta", "raw"]
+        assert scores == {"meta": 1.0, "raw": 1.0, "license": 0.0}
+        assert set(load_cache(cache_path)["components"]) == set(INPUTS)
+
+    def test_scorer_source_change_drops_cache(self, tmp_path, monkeypatch):
+        """Test that editing the scorer or a local module it imports recomputes every component."""
+        scorer_dir = tmp_path / "scorer"
+        scorer_dir.mkdir()
+        (scorer_dir / "helper_rules.py").write_text("def weight():\n    return 1.0\n")
+        (scorer_dir / "scorer_checks.py").write_text(
+            "import os\nfrom helper_rules import weight\n\n"
+            "def check(root):\n    return weight() * os.path.exists(os.path.join(root, 'LICENSE'))\n")
+        monkeypatch.syspath_prepend(str(scorer_dir))
+        spec = importlib.util.spec_from_file_location("scorer_checks", str(scorer_dir / "scorer_checks.py"))
+        module = importlib.util.module_from_spec(spec)
+        monkeypatch.setitem(sys.modules, "scorer_checks", module)
+        spec.loader.exec_module(module)
+        monkeypatch.setitem(sys.modules, "helper_rules", sys.modules["helper_rules"])
+
+        checks = {"license": module.check}
+        inputs = {"license": INPUTS["license"]}
+        cache_path = str(tmp_path / "outputs" / "score_cache.json")
+        study = tmp_path / "study"
+        study.mkdir()
+        assert score_with_cache(str(study), checks, inputs, cache_path)[1] == ["license"]
+        assert score_with_cache(str(study), checks, inputs, cache_path)[1] == []
+        assert load_cache(cache_path)["source"] == scorer_source_hash(checks)
+
+        # Editing the scorer or an imported local module changes the hash
+        for path in (scorer_dir / "helper_rules.py", scorer_dir / "scorer_checks.py"):
+            before = scorer_source_hash(checks)
+            path.write_text(path.read_text() + "# edited\n")
+            assert scorer_source_hash(checks) != before
+            assert score_with_cache(str(study), checks, inputs, cache_path)[1] == ["license"]
+
+    def test_main_skips_unchanged_outputs(self, tmp_path, monkeypatch, capsys):
+        """Test that the scorer leaves reports alone when scores did not change."""
+        import repl_et_score
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "metadata.json").write_text(json.dumps({"study_title": "T"}))
+        # The first run would otherwise create README.md, itself a scored input
+        (tmp_path / "README.md").write_text("# Study\n")
+
+        repl_et_score.main()
+        chart = tmp_path / "outputs" / "score.svg"
+        mtime = chart.stat().st_mtime_ns
+        capsys.readouterr()
+
+        repl_et_score.main()
+        assert "unchanged" in capsys.readouterr().out
+        assert chart.stat().st_mtime_ns == mtime
+
+        (tmp_path / "LICENSE").write_text("MIT")
+        repl_et_score.main()
+        assert "Recomputed: reproducibility" in capsys.readouterr().out
+        with open(tmp_path / "outputs" / "report.json") as f:
+            assert json.load(f)["reproducibility"] == 0.5
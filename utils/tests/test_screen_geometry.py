@@ -0,0 +1,64 @@
+import os
+import sys
+import json
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from screen_geometry import ScreenGeometry, load_screen_geometry, geometry_from_setup
+
+
+@pytest.fixture
+def geometry():
+    return ScreenGeometry(24.0, (1920, 1080), 60.0)
+
+
+class TestScreenGeometry:
+    """Test suite for pixel/visual-angle conversion."""
+
+    def test_pixel_pitch(self, geometry):
+        """Test the pixel size derived from a 24 inch 1080p screen."""
+        assert geometry.cm_per_px == pytest.approx(24 * 2.54 / np.hypot(1920, 1080))
+        # about 0.026 degrees per pixel at 60 cm
+        assert geometry.deg_per_px == pytest.approx(0.0265, abs=0.001)
+
+    def test_center_is_zero_degrees(self, geometry):
+        """Test that the screen centre maps to 0 degrees."""
+        x_deg, y_deg = geometry.px_to_deg(959.5, 539.5)
+        assert x_deg == pytest.approx(0.0) and y_deg == pytest.approx(0.0)
+
+    def test_roundtrip(self, geometry):
+        """Test that deg_to_px inverts px_to_deg on arrays."""
+        x = np.array([0.0, 100.0, 1919.0])
+        y = np.array([0.0, 540.0, 1079.0])
+        back_x, back_y = geometry.deg_to_px(*geometry.px_to_deg(x, y))
+        assert np.allclose(back_x, x) and np.allclose(back_y, y)
+
+    def test_velocity_in_degrees(self, geometry):
+        """Test that pixel motion converts to angular velocity near the centre."""
+        t = np.arange(5) * 4.0
+        x = 960 + np.arange(5) * 10.0
+        velocity = geometry.velocity_deg(t, x, np.full(5, 540.0))
+        assert velocity[2] == pytest.approx(10 / 0.004 * geometry.deg_per_px, rel=0.01)
+
+    def test_size_conversion(self, geometry):
+        """Test converting an angular threshold to pixels."""
+        assert geometry.size_deg_to_px(1.0) == pytest.approx(1 / geometry.deg_per_px, rel=0.01)
+
+    def test_loaded_geometry_is_cached(self, tmp_path):
+        """Test that a setup file is parsed once and reloaded after edits."""
+        path = str(tmp_path / "screen_setup.json")
+        with open(path, "w") as f:
+            json.dump({"screen_size_inch": 24.0, "resolution_px": [1920, 1080], "distance_cm": 60.0}, f)
+        first = load_screen_geometry(path)
+        assert load_screen_geometry(path) is first
+
+        with open(path, "w") as f:
+            json.dump({"screen_size_inch": 24.0, "resolution_px": [1920, 1080], "distance_cm": 70.0}, f)
+        os.utime(path, (0, os.path.getmtime(path) + 10))
+        assert load_screen_geometry(path).distance_cm == 70.0
+
+    def test_missing_fields(self):
+        """Test that incomplete setups are rejected."""
+        with pytest.raises(ValueError):
+            geometry_from_setup({"screen_size_inch": 24.0})
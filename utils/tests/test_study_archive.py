@@ -0,0 +1,118 @@
+import os
+import sys
+import json
+import tarfile
+import zipfile
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from study_snapshot import ArchiveSnapshot, open_study
+from repl_et_score import check_metadata, main, score_study
+from update_readme_with_assessment import assess_study
+
+
+def _write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data))
+
+
+@pytest.fixture
+def study(tmp_path):
+    """Study directory with JSON components, non-empty folders and a bulky data file."""
+    root = tmp_path / "study"
+    _write_json(root / "metadata.json", {"study_title": "T", "paradigm": "P", "task_description": "D"})
+    _write_json(root / "participants" / "participants.json",
+                {"participants": [{"age": 30, "gender": "f", "handedness": "r", "vision": "normal"}]})
+    _write_json(root / "equipment" / "tracker_specs.json", {"eye_tracker": {"model": "T60XL"}})
+    _write_json(root / "stimuli" / "stimuli_metadata.json", {"stimuli": []})
+    (root / "stimuli" / "stimuli_raw").mkdir()
+    (root / "stimuli" / "stimuli_raw" / "s1.png").write_bytes(b"\x89PNG")
+    _write_json(root / "aois" / "aois_definition.json", {"aois": []})
+    (root / "aois" / "aois_visualizations").mkdir()
+    _write_json(root / "validity" / "validity.json", {"threats": [{"id": "T1"}]})
+    (root / "README.md").write_text("# Study\n")
+    (root / "LICENSE").write_text("MIT\n")
+    (root / "data").mkdir()
+    (root / "data" / "gaze.csv").write_bytes(b"t,x,y\n" * 20000)
+    return root
+
+
+def _zip(study, path):
+    # Members are wrapped in a top-level directory, as most packaging tools do
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for dirpath, dirnames, filenames in os.walk(study):
+            rel = os.path.relpath(dirpath, study.parent)
+            zf.write(dirpath, rel)
+            for name in filenames:
+                zf.write(os.path.join(dirpath, name), os.path.join(rel, name))
+    return str(path)
+
+
+def _tar(study, path):
+    # Members sit at the archive root
+    with tarfile.open(path, "w:gz") as tar:
+        for name in os.listdir(study):
+            tar.add(study / name, arcname=name)
+    return str(path)
+
+
+class TestArchiveScoring:
+    """Test suite for scoring studies packaged as archives."""
+
+    def test_scores_match_directory(self, study, tmp_path):
+        """Test that zip and tar.gz packages score exactly like the directory."""
+        expected = score_study(str(study))
+        assert expected["aois"] == 0.75 and expected["stimuli"] == 0.7
+        assert score_study(_zip(study, tmp_path / "study.zip")) == expected
+        assert score_study(_tar(study, tmp_path / "study.tar.gz")) == expected
+
+    def test_assessment_matches_directory(self, study, tmp_path):
+        """Test that README assessment scores and compliance match for archives."""
+        expected = assess_study(str(study))
+        assert assess_study(_zip(study, tmp_path / "study.zip")) == expected
+        assert assess_study(_tar(study, tmp_path / "study.tar.gz")) == expected
+
+    def test_tree_from_member_index(self, study, tmp_path):
+        """Test that wrapper directories are stripped and implicit directories exist."""
+        with ArchiveSnapshot(_zip(study, tmp_path / "study.zip")) as snapshot:
+            assert snapshot.isdir("aois/aois_visualizations")
+            assert snapshot.listdir("aois/aois_visualizations") == []
+            assert snapshot.listdir("stimuli/stimuli_raw") == ["s1.png"]
+            assert snapshot.isfile("metadata.json") and not snapshot.exists("study")
+            assert snapshot.size("data/gaze.csv") == 6 * 20000
+            with snapshot.open("stimuli/stimuli_raw/s1.png", "rb") as f:
+                assert f.read() == b"\x89PNG"
+
+    def test_only_needed_members_read(self, study, tmp_path):
+        """Test that scoring reads only the JSON members checks consult."""
+        for archive in (_zip(study, tmp_path / "study.zip"), _tar(study, tmp_path / "study.tar.gz")):
+            with open_study(archive) as snapshot:
+                score_study(snapshot)
+                # metadata, participants, AOI definition and validity JSON only
+                assert snapshot.reads == 4
+                if not archive.endswith(".zip"):
+                    # Bulk data is skipped while streaming the tar, never buffered
+                    assert "data/gaze.csv" not in snapshot._captured
+                    assert "metadata.json" in snapshot._captured
+
+    def test_cli_scores_archive_and_directory_roots(self, study, tmp_path, monkeypatch):
+        """Test that the scorer CLI takes a study directory or archive as its root."""
+        expected = score_study(str(study))
+        archive = _zip(study, tmp_path / "study.zip")
+        assert check_metadata(archive) == expected["metadata"]
+        work = tmp_path / "work"
+        work.mkdir()
+        monkeypatch.chdir(work)
+
+        main(archive)
+        with open(work / "outputs" / "report.json") as f:
+            report = json.load(f)
+        assert {k: report[k] for k in expected} == expected
+        assert not (work / "README.md").exists()
+
+        main(str(study))
+        with open(study / "outputs" / "report.json") as f:
+            report = json.load(f)
+        assert {k: report[k] for k in expected} == expected
+        assert "Compliance Checklist" in (study / "README.md").read_text()
+        assert (study / "outputs" / "score_cache.json").exists()
@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from study_snapshot import StudySnapshot
+from update_readme_with_assessment import TemplateAssessment, check_metadata_current
+
+
+@pytest.fixture
+def study(tmp_path):
+    """Small study with metadata, one equipment file and a broken JSON file."""
+    with open(tmp_path / "metadata.json", "w") as f:
+        json.dump({"study_title": "Reading order of novices",
+                   "authors": "A. Researcher", "institution": "Some University"}, f)
+    (tmp_path / "equipment").mkdir()
+    with open(tmp_path / "equipment" / "tracker_specs.json", "w") as f:
+        json.dump({"eye_tracker": {"manufacturer": "Tobii", "model": "T60XL"}}, f)
+    (tmp_path / "validity").mkdir()
+    (tmp_path / "validity" / "validity.json").write_text("{not json")
+    return tmp_path
+
+
+class TestStudySnapshot:
+    """Test suite for the shared study snapshot."""
+
+    def test_tree_queries(self, study):
+        """Test existence and listing queries against the filesystem."""
+        snapshot = StudySnapshot(str(study))
+        assert snapshot.exists("metadata.json") and snapshot.isfile("metadata.json")
+        assert snapshot.isdir("equipment") and not snapshot.isdir("metadata.json")
+        assert snapshot.exists("./equipment/tracker_specs.json")
+        assert not snapshot.exists("equipment/screen_setup.json")
+        assert not snapshot.exists("missing/file.json")
+        assert snapshot.listdir("equipment") == ["tracker_specs.json"]
+        with pytest.raises(FileNotFoundError):
+            snapshot.listdir("missing")
+
+    def test_json_parsed_once(self, study):
+        """Test that JSON files are read once, including failed parses."""
+        snapshot = StudySnapshot(str(study))
+        first = snapshot.load_json("metadata.json")
+        assert snapshot.load_json("./metadata.json") is first
+        for _ in range(2):
+            with pytest.raises(json.JSONDecodeError):
+                snapshot.load_json("validity/validity.json")
+        assert snapshot.reads == 2
+
+    def test_assessment_reads_each_file_once(self, study):
+        """Test that a full assessment opens every JSON file at most once."""
+        assessment = TemplateAssessment(str(study))
+        scores = assessment.get_all_scores()
+        compliance = assessment.analyze_template_compliance()
+        assessment.get_all_scores()
+        assert scores["Study Metadata"] == check_metadata_current(StudySnapshot(str(study)))
+        assert scores["Validity"] == 0
+        assert compliance["research_standards"]["study_design"] is True
+        assert assessment.snapshot.reads == 3
+
+
+class TestStudyIndex:
+    """Test suite for the bounded study index."""
+
+    def test_index_is_bounded(self, study):
+        """Test that excluded and non-component trees are not indexed."""
+        for relpath in [".git/objects/x.json", "examples/basic/metadata.json", "data/processed/a.json",
+                        "outputs/report.json", "notes/extra.json", "analysis/a/b/c/deep.json",
+                        "analysis/results_tables/t.json", "schemas/metadata.schema.json"]:
+            path = study / relpath
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("{}")
+
+        snapshot = StudySnapshot(str(study))
+        assert snapshot.index() == [
+            "analysis/results_tables/t.json",
+            "equipment/tracker_specs.json",
+            "metadata.json",
+            "schemas/metadata.schema.json",
+            "validity/validity.json",
+        ]
+        assert snapshot.count_files(".json", limit=2) == 2
+        assert list(snapshot.files(".json", under="schemas", recursive=False)) == ["schemas/metadata.schema.json"]
+        assert list(snapshot.files(".json", under="analysis", recursive=False)) == []
+
+    def test_open_formats_ignores_examples(self, study):
+        """Test that bundled example studies do not count towards open formats."""
+        for i in range(12):
+            path = study / "examples" / f"e{i}" / "metadata.json"
+            path.parent.mkdir(parents=True)
+            path.write_text("{}")
+        assert not TemplateAssessment(str(study))._has_open_formats()
+
+        for i in range(7):
+            (study / "equipment" / f"extra_{i}.json").write_text("{}")
+        assert TemplateAssessment(str(study))._has_open_formats()
@@ -0,0 +1,141 @@
+import os
+import sys
+import json
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from validate_jsons import ValidatorCache, find_json_files, main, validate_file, validate_files, validate_incremental
+
+SCHEMA = {
+    "type": "object",
+    "required": ["participants"],
+    "properties": {
+        "participants": {
+            "type": "array",
+            "items": {"type": "object", "required": ["id"], "properties": {"age": {"type": "number"}}},
+        },
+    },
+}
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+@pytest.fixture
+def study(tmp_path):
+    """Seventy participant files sharing one schema, one of them invalid."""
+    (tmp_path / "schemas").mkdir()
+    with open(tmp_path / "schemas" / "participants.schema.json", "w") as f:
+        json.dump(SCHEMA, f)
+    for i in range(70):
+        participants = [{"id": f"P{i}", "age": 30}]
+        if i == 7:
+            participants.append({"age": "thirty"})
+        _write(tmp_path / "participants" / f"p{i:02d}.json",
+               {"$schema": "../schemas/participants.schema.json", "participants": participants})
+    _write(tmp_path / "notes.json", {"free": "form"})
+    return tmp_path
+
+
+class TestValidateJsons:
+    """Test suite for the compiled, parallel JSON validator."""
+
+    def test_schema_compiled_once(self, study):
+        """Test that one compiled validator serves every file using the schema."""
+        paths = list(find_json_files(str(study / "participants")))
+        results, compiled = validate_files(paths, workers=1)
+        assert compiled == 1
+        assert sum(r["status"] == "ok" for r in results) == 69
+
+    def test_errors_have_json_paths(self, study):
+        """Test that every violation is reported with its location."""
+        result = validate_file(str(study / "participants" / "p07.json"), ValidatorCache())
+        assert result["status"] == "invalid"
+        assert {e["path"] for e in result["errors"]} == {"$.participants[1]", "$.participants[1].age"}
+        assert result["schema"].endswith(os.path.join("schemas", "participants.schema.json"))
+
+    def test_parallel_matches_serial(self, study):
+        """Test that sharding across processes gives the same results."""
+        paths = list(find_json_files(str(study)))
+        serial, _ = validate_files(paths, workers=1)
+        parallel, compiled = validate_files(paths, workers=2, shard_size=16)
+        assert parallel == sorted(serial, key=lambda r: r["file"])
+        # At most one compilation per shard's worker process
+        assert 1 <= compiled <= 2
+
+    def test_report_and_exit_code(self, study, tmp_path):
+        """Test the machine-readable report and a failing exit status."""
+        report_path = str(tmp_path / "out" / "report.json")
+        manifest = ["--manifest", str(tmp_path / "out" / "manifest.json")]
+        assert main([str(study), "--workers", "1", "--report", report_path] + manifest) == 1
+        with open(report_path) as f:
+            report = json.load(f)
+        assert report["summary"]["files"] == 72
+        assert (report["summary"]["invalid"], report["summary"]["skipped"]) == (1, 2)
+        assert report["summary"]["schemas_compiled"] == 1
+
+        os.remove(study / "participants" / "p07.json")
+        assert main([str(study / "participants"), "--workers", "1", "--report", report_path] + manifest) == 0
+
+    def test_large_files_are_streamed(self, study):
+        """Test that streamed validation reports the same paths, with byte offsets."""
+        path = str(study / "participants" / "p07.json")
+        whole = validate_file(path, ValidatorCache())
+        streamed = validate_file(path, ValidatorCache(), stream_threshold=0)
+        assert streamed["streamed"] and streamed["status"] == "invalid"
+        assert [e["path"] for e in streamed["errors"]] == [e["path"] for e in whole["errors"]]
+        with open(path, "rb") as f:
+            assert streamed["errors"][0]["offset"] == f.read().index(b'{"age": "thirty"}')
+
+    def test_manifest_reuses_unchanged_files(self, study, tmp_path):
+        """Test that only files whose content or schema changed are revalidated."""
+        manifest = str(tmp_path / "manifest.json")
+        paths = list(find_json_files(str(study / "participants")))
+        first, _, reused = validate_incremental(paths, manifest, workers=1)
+        assert reused == 0
+
+        # Same content with a new mtime is rehashed but still reused
+        os.utime(paths[0], ns=(0, 0))
+        _write(study / "participants" / "p03.json",
+               {"$schema": "../schemas/participants.schema.json", "participants": [{"age": 1}]})
+        results, compiled, reused = validate_incremental(paths, manifest, workers=1)
+        assert (reused, compiled) == (69, 1)
+        assert [r["file"] for r in results if r["status"] == "invalid"] == [paths[3], paths[7]]
+        assert [r for r in results if r["file"] != paths[3]] == [r for r in first if r["file"] != paths[3]]
+
+        assert validate_incremental(paths, manifest, workers=1, force=True)[2] == 0
+
+    def test_manifest_tracks_referenced_schemas(self, tmp_path):
+        """Test that editing a schema reached through $ref revalidates its users."""
+        schemas = tmp_path / "schemas"
+        _write(schemas / "participant.schema.json", {"type": "object", "required": ["id"]})
+        _write(schemas / "participants.schema.json",
+               {"type": "object", "properties": {"participants": {"type": "array",
+                                                                  "items": {"$ref": "participant.schema.json"}}}})
+        path = _write(tmp_path / "participants.json",
+                      {"$schema": "schemas/participants.schema.json", "participants": [{"id": "P1"}]})
+        manifest = str(tmp_path / "manifest.json")
+        config = {"schema_dirs": [str(schemas)]}
+        assert validate_incremental([path], manifest, 1, config)[2] == 0
+        assert validate_incremental([path], manifest, 1, config)[2] == 1
+
+        _write(schemas / "participant.schema.json", {"type": "object", "required": ["id", "age"]})
+        results, _, reused = validate_incremental([path], manifest, 1, config)
+        assert reused == 0 and results[0]["status"] == "invalid"
+
+    def test_manifest_schema_ref_from_validation_pass(self, study, tmp_path, monkeypatch):
+        """Test that the manifest records `$schema` without parsing files a second time."""
+        import validate_jsons
+        def fail(f):
+            raise AssertionError("file parsed again for its $schema")
+        monkeypatch.setattr(validate_jsons, "read_schema_ref", fail)
+        manifest = str(tmp_path / "manifest.json")
+        paths = list(find_json_files(str(study / "participants")))[:3]
+        results, _, _ = validate_incremental(paths, manifest, workers=1)
+        assert [r["schema_ref"] for r in results] == ["../schemas/participants.schema.json"] * 3
+        with open(manifest) as f:
+            entries = json.load(f)["files"]
+        assert {e["schema_ref"] for e in entries.values()} == {"../schemas/participants.schema.json"}
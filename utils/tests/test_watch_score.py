@@ -0,0 +1,57 @@
+import os
+import sys
+import json
+import time
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from watch_score import components_for_paths, input_stamps, watch
+
+
+class TestWatchScore:
+    """Test suite for incremental watch-mode scoring."""
+
+    def test_paths_map_to_components(self):
+        """Test that changed paths select only the checks that read them."""
+        assert components_for_paths(["metadata.json"]) == {"metadata"}
+        # Stimulus images also feed the AOI bounds check
+        assert components_for_paths(["stimuli/stimuli_raw", "LICENSE"]) == {"stimuli", "aois", "reproducibility"}
+        assert components_for_paths(["data/raw/gaze.csv"]) == set()
+
+    def test_stamps_track_directory_entries(self, tmp_path):
+        """Test that adding a file to a watched directory changes its stamp."""
+        (tmp_path / "stimuli" / "stimuli_raw").mkdir(parents=True)
+        before = input_stamps(str(tmp_path))
+        assert before["metadata.json"] is None
+        time.sleep(0.01)
+        (tmp_path / "stimuli" / "stimuli_raw" / "s1.png").write_bytes(b"")
+        after = input_stamps(str(tmp_path))
+        assert after["stimuli/stimuli_raw"] != before["stimuli/stimuli_raw"]
+
+    def test_rescores_on_edit(self, tmp_path):
+        """Test that an edit updates the reports for the affected component only."""
+        root = str(tmp_path)
+        updates = []
+        thread = threading.Thread(target=watch, kwargs={
+            "root": root, "interval": 0.01, "max_updates": 1,
+            "on_update": lambda scores, components, elapsed: updates.append((scores, components, elapsed)),
+        })
+        thread.start()
+        report = tmp_path / "outputs" / "report.json"
+        deadline = time.time() + 5
+        while not report.exists() and time.time() < deadline:
+            time.sleep(0.01)
+        assert json.loads(report.read_text())["metadata"] == 0
+
+        # Save atomically, as editors do, so no poll sees a half-written file
+        (tmp_path / "metadata.tmp").write_text(json.dumps(
+            {"study_title": "T", "paradigm": "P", "task_description": "D"}))
+        os.replace(tmp_path / "metadata.tmp", tmp_path / "metadata.json")
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+
+        scores, components, elapsed = updates[0]
+        assert components == {"metadata"}
+        assert elapsed < 0.1
+        assert json.loads(report.read_text())["metadata"] == 1.0
+        assert "**metadata**: 1.0" in (tmp_path / "outputs" / "report.md").read_text()
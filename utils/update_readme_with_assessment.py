@@ -11,25 +11,26 @@ import subprocess
 import re
 from pathlib import Path
 
+from study_snapshot import StudySnapshot, open_study
+
 class TemplateAssessment:
-    def __init__(self):
-        self.base_path = Path(".")
+    def __init__(self, base_path=".", snapshot=None):
+        self.base_path = Path(base_path)
         self.checklist_items = {}
+        # One snapshot per assessment: each file is listed and parsed once.
+        # base_path may also be a .zip/.tar archive of the study.
+        self.snapshot = snapshot or open_study(base_path)
+        self._scores = {}
+        
+    def _score(self, check):
+        """Score of a check_*_current function, computed once per assessment"""
+        if check not in self._scores:
+            self._scores[check] = check(self.snapshot)
+        return self._scores[check]
         
     def get_all_scores(self):
         """Get all component scores using current assessment functions"""
-        return {
-            "Study Metadata": check_metadata_current(),
-            "Participant Info": check_participants_current(),
-            "Equipment": check_equipment_current(),
-            "Stimuli": check_stimuli_current(),
-            "AOIs": check_aois_current(),
-            "Data Quality": check_data_quality_current(),
-            "Preprocessing": check_preprocessing_current(),
-            "Analysis": check_analysis_current(),
-            "Validity": check_threats_current(),
-            "Reproducibility": check_reproducibility_current()
-        }
+        return {name: self._score(check) for name, check in CURRENT_CHECKS.items()}
         
     def analyze_template_compliance(self):
         """Analyze template files to determine compliance status"""
@@ -44,27 +45,27 @@ class TemplateAssessment:
     def _check_fair_compliance(self):
         """Check FAIR principles compliance based on real data quality"""
         return {
-            "findable": self._has_metadata_with_ids() and check_metadata_current() > 0.8,
-            "accessible": self._has_open_formats() and check_metadata_current() > 0.8,
-            "interoperable": self._has_schemas() and check_metadata_current() > 0.8,
-            "reusable": self._has_rich_metadata() and check_metadata_current() > 0.8
+            "findable": self._has_metadata_with_ids() and self._score(check_metadata_current) > 0.8,
+            "accessible": self._has_open_formats() and self._score(check_metadata_current) > 0.8,
+            "interoperable": self._has_schemas() and self._score(check_metadata_current) > 0.8,
+            "reusable": self._has_rich_metadata() and self._score(check_metadata_current) > 0.8
         }
     
     def _check_research_standards(self):
         """Check general research standards compliance"""
         return {
-            "study_design": self._has_file("metadata.json") and check_metadata_current() > 0.8,
-            "equipment_reporting": self._has_equipment_specs() and check_equipment_current() > 0.8,
+            "study_design": self._has_file("metadata.json") and self._score(check_metadata_current) > 0.8,
+            "equipment_reporting": self._has_equipment_specs() and self._score(check_equipment_current) > 0.8,
             "stimuli_documentation": self._has_stimuli_docs(),
             "methodology_transparency": self._has_methodology_docs(),
-            "validity_assessment": self._has_file("validity/validity.json") and check_threats_current() > 0.8
+            "validity_assessment": self._has_file("validity/validity.json") and self._score(check_threats_current) > 0.8
         }
     
     def _check_iguidelines_compliance(self):
         """Check iGuidelines compliance"""
         return {
-            "participant_reporting": self._has_file("participants/participants.json") and check_participants_current() > 0.8,
-            "calibration_procedures": self._has_equipment_calibration() and check_equipment_current() > 0.8,
+            "participant_reporting": self._has_file("participants/participants.json") and self._score(check_participants_current) > 0.8,
+            "calibration_procedures": self._has_equipment_calibration() and self._score(check_equipment_current) > 0.8,
             "exclusion_criteria": self._has_participant_criteria(),
             "quality_metrics": self._has_quality_assessment()
         }
@@ -73,23 +74,20 @@ class TemplateAssessment:
         """Check TRRRACED framework compliance based on real data quality"""
         return {
             "transparent_reporting": self._has_comprehensive_docs(),
-            "replication_materials": self._has_file("reproducibility/reproducibility.json") and check_reproducibility_current() > 0.5,
-            "data_availability": self._has_data_sharing_info() and check_data_quality_current() > 0.5,
+            "replication_materials": self._has_file("reproducibility/reproducibility.json") and self._score(check_reproducibility_current) > 0.5,
+            "data_availability": self._has_data_sharing_info() and self._score(check_data_quality_current) > 0.5,
             "environment_specs": self._has_environment_specs()
         }
     
     def _has_file(self, filepath):
         """Check if file exists and has content"""
-        path = self.base_path / filepath
-        if not path.exists():
+        if not self.snapshot.exists(filepath):
             return False
         try:
-            if path.suffix == '.json':
-                with open(path, 'r') as f:
-                    data = json.load(f)
-                    return bool(data)  # True if not empty
+            if filepath.endswith('.json'):
+                return bool(self.snapshot.load_json(filepath))  # True if not empty
             else:
-                return path.stat().st_size > 0
+                return self.snapshot.size(filepath) > 0
         except:
             return False
     
@@ -99,16 +97,14 @@ class TemplateAssessment:
     
     def _has_open_formats(self):
         """Check if using open JSON formats"""
-        json_files = list(self.base_path.glob("**/*.json"))
-        return len(json_files) >= 10  # Should have all 10 components
+        # Should have all 10 components; bundled examples and data trees are not indexed
+        return self.snapshot.count_files(".json", limit=10) >= 10
     
     def _has_schemas(self):
         """Check if JSON schemas are present"""
-        schemas_path = self.base_path / "schemas"
-        if not schemas_path.exists():
+        if not self.snapshot.isdir("schemas"):
             return False
-        schema_files = list(schemas_path.glob("*.json"))
-        return len(schema_files) >= 10
+        return self.snapshot.count_files(".json", under="schemas", recursive=False, limit=10) >= 10
     
     def _has_rich_metadata(self):
         """Check if metadata is comprehensive"""
@@ -124,13 +120,13 @@ class TemplateAssessment:
         """Check stimuli documentation with real data"""
         return ((self._has_file("stimuli/stimuli_metadata.json") or
                 self._has_file("stimuli/stimuli_annotations.json")) and 
-                check_stimuli_current() > 0.5)
+                self._score(check_stimuli_current) > 0.5)
     
     def _has_methodology_docs(self):
         """Check methodology documentation with real data"""
         return (self._has_file("preprocessing/preprocessing.json") and
                 self._has_file("analysis/analysis.json") and
-                check_preprocessing_current() > 0.5 and check_analysis_current() > 0.5)
+                self._score(check_preprocessing_current) > 0.5 and self._score(check_analysis_current) > 0.5)
     
     def _has_equipment_calibration(self):
         """Check calibration procedures in equipment"""
@@ -138,20 +134,20 @@ class TemplateAssessment:
     
     def _has_participant_criteria(self):
         """Check participant inclusion/exclusion criteria with real data"""
-        return self._has_file("participants/participants.json") and check_participants_current() > 0.5
+        return self._has_file("participants/participants.json") and self._score(check_participants_current) > 0.5
     
     def _has_quality_assessment(self):
         """Check quality control measures with real data"""
-        return self._has_file("preprocessing/preprocessing.json") and check_preprocessing_current() > 0.5
+        return self._has_file("preprocessing/preprocessing.json") and self._score(check_preprocessing_current) > 0.5
     
     def _has_comprehensive_docs(self):
         """Check if all major components have real documentation"""
         scores = [
-            check_metadata_current(),
-            check_participants_current(),
-            check_equipment_current(),
-            check_data_quality_current(),
-            check_analysis_current()
+            self._score(check_metadata_current),
+            self._score(check_participants_current),
+            self._score(check_equipment_current),
+            self._score(check_data_quality_current),
+            self._score(check_analysis_current)
         ]
         # At least 4 out of 5 components must have real data (score > 0.5)
         return sum(score > 0.5 for score in scores) >= 4
@@ -164,22 +160,11 @@ class TemplateAssessment:
         """Check environment specifications"""
         return self._has_file("equipment/software_env.json")
 
-def get_actual_scores_and_generate_png():
+def get_actual_scores_and_generate_png(assessment=None):
     """Get actual scores and generate PNG spider graph"""
     try:
         # Calculate scores using current structure
-        scores = {
-            "Study Metadata": check_metadata_current(),
-            "Participant Info": check_participants_current(),
-            "Equipment": check_equipment_current(),
-            "Stimuli": check_stimuli_current(),
-            "AOIs": check_aois_current(),
-            "Data Quality": check_data_quality_current(),
-            "Preprocessing": check_preprocessing_current(),
-            "Analysis": check_analysis_current(),
-            "Validity": check_threats_current(),
-            "Reproducibility": check_reproducibility_current()
-        }
+        scores = (assessment or TemplateAssessment()).get_all_scores()
         
         # Generate PNG spider graph
         png_path = generate_spider_graph_png(scores)
@@ -279,14 +264,14 @@ def generate_spider_graph_png(scores):
         print(f"Error generating PNG: {e}")
         return None
 
-def check_metadata_current():
+def check_metadata_current(snapshot=None):
     """Check metadata quality - distinguish template vs real data"""
-    if not os.path.exists("metadata.json"):
+    snapshot = snapshot or StudySnapshot()
+    if not snapshot.exists("metadata.json"):
         return 0
     
     try:
-        with open("metadata.json", 'r') as f:
-            data = json.load(f)
+        data = snapshot.load_json("metadata.json")
         
         # Check if this is real data or template data
         template_indicators = [
@@ -324,14 +309,14 @@ def check_metadata_current():
     except:
         return 0
 
-def check_participants_current():
+def check_participants_current(snapshot=None):
     """Check participants data - distinguish template vs real data"""
-    if not os.path.exists("participants/participants.json"):
+    snapshot = snapshot or StudySnapshot()
+    if not snapshot.exists("participants/participants.json"):
         return 0
     
     try:
-        with open("participants/participants.json", 'r') as f:
-            data = json.load(f)
+        data = snapshot.load_json("participants/participants.json")
         
         participants = data.get("participants", [])
         
@@ -381,17 +366,17 @@ def check_participants_current():
     except:
         return 0
 
-def check_equipment_current():
+def check_equipment_current(snapshot=None):
     """Check equipment specifications - distinguish template vs real data"""
+    snapshot = snapshot or StudySnapshot()
     tracker_score = 0
     screen_score = 0
     software_score = 0
     
     # Check tracker specs
-    if os.path.exists("equipment/tracker_specs.json"):
+    if snapshot.exists("equipment/tracker_specs.json"):
         try:
-            with open("equipment/tracker_specs.json", 'r') as f:
-                data = json.load(f)
+            data = snapshot.load_json("equipment/tracker_specs.json")
             
             eye_tracker = data.get("eye_tracker", {})
             manufacturer = str(eye_tracker.get("manufacturer", "")).strip()
@@ -417,10 +402,9 @@ def check_equipment_current():
             tracker_score = 0
     
     # Check screen setup
-    if os.path.exists("equipment/screen_setup.json"):
+    if snapshot.exists("equipment/screen_setup.json"):
         try:
-            with open("equipment/screen_setup.json", 'r') as f:
-                data = json.load(f)
+            data = snapshot.load_json("equipment/screen_setup.json")
             
             # Check for real monitor data
             monitor = data.get("monitor", {})
@@ -440,10 +424,9 @@ def check_equipment_current():
             screen_score = 0
     
     # Check software environment
-    if os.path.exists("equipment/software_env.json"):
+    if snapshot.exists("equipment/software_env.json"):
         try:
-            with open("equipment/software_env.json", 'r') as f:
-                data = json.load(f)
+            data = snapshot.load_json("equipment/software_env.json")
             
             # Check for detailed software info
             os_info = data.get("operating_system", {})
@@ -462,14 +445,14 @@ def check_equipment_current():
     total_scores = [s for s in [tracker_score, screen_score, software_score] if s > 0]
     return sum(total_scores) / len(total_scores) if total_scores else 0
 
-def check_stimuli_current():
+def check_stimuli_current(snapshot=None):
     """Check stimuli metadata - distinguish template vs real data"""
-    if not os.path.exists("stimuli/stimuli_metadata.json"):
+    snapshot = snapshot or StudySnapshot()
+    if not snapshot.exists("stimuli/stimuli_metadata.json"):
         return 0
     
     try:
-        with open("stimuli/stimuli_metadata.json", 'r') as f:
-            data = json.load(f)
+        data = snapshot.load_json("stimuli/stimuli_metadata.json")
         
         stimuli = data.get("stimuli", [])
         
@@ -516,14 +499,14 @@ def check_stimuli_current():
     except:
         return 0
 
-def check_aois_current():
+def check_aois_current(snapshot=None):
     """Check AOI definitions - distinguish template vs real data"""
-    if not os.path.exists("aois/aois_definition.json"):
+    snapshot = snapshot or StudySnapshot()
+    if not snapshot.exists("aois/aois_definition.json"):
         return 0
     
     try:
-        with open("aois/aois_definition.json", 'r') as f:
-            data = json.load(f)
+        data = snapshot.load_json("aois/aois_definition.json")
         
         aois = data.get("aois", [])
         
@@ -568,22 +551,23 @@ def check_aois_current():
     except:
         return 0
 
-def check_data_quality_current():
+def check_data_quality_current(snapshot=None):
     """Check data quality - distinguish template vs real data"""
-    if not os.path.exists("collection/protocol.json"):
+    snapshot = snapshot or StudySnapshot()
+    if not snapshot.exists("collection/protocol.json"):
         return 0
     
     # For template, return very low score
     return 0.05  # Template protocol data
 
-def check_preprocessing_current():
+def check_preprocessing_current(snapshot=None):
     """Check preprocessing steps - distinguish template vs real data"""
-    if not os.path.exists("preprocessing/preprocessing.json"):
+    snapshot = snapshot or StudySnapshot()
+    if not snapshot.exists("preprocessing/preprocessing.json"):
         return 0
     
     try:
-        with open("preprocessing/preprocessing.json", 'r') as f:
-            data = json.load(f)
+        data = snapshot.load_json("preprocessing/preprocessing.json")
         
         steps = data.get("preprocessing_steps", data.get("steps", []))
         
@@ -608,14 +592,14 @@ def check_preprocessing_current():
     except:
         return 0
 
-def check_analysis_current():
+def check_analysis_current(snapshot=None):
     """Check analysis methods - distinguish template vs real data"""
-    if not os.path.exists("analysis/analysis.json"):
+    snapshot = snapshot or StudySnapshot()
+    if not snapshot.exists("analysis/analysis.json"):
         return 0
     
     try:
-        with open("analysis/analysis.json", 'r') as f:
-            data = json.load(f)
+        data = snapshot.load_json("analysis/analysis.json")
         
         methods = data.get("analysis_methods", [])
         
@@ -648,14 +632,14 @@ def check_analysis_current():
     except:
         return 0
 
-def check_threats_current():
+def check_threats_current(snapshot=None):
     """Check validity threats - distinguish template vs real data"""
-    if not os.path.exists("validity/validity.json"):
+    snapshot = snapshot or StudySnapshot()
+    if not snapshot.exists("validity/validity.json"):
         return 0
     
     try:
-        with open("validity/validity.json", 'r') as f:
-            data = json.load(f)
+        data = snapshot.load_json("validity/validity.json")
         
         threats = data.get("threats", [])
         
@@ -682,14 +666,14 @@ def check_threats_current():
     except:
         return 0
 
-def check_reproducibility_current():
+def check_reproducibility_current(snapshot=None):
     """Check reproducibility materials - distinguish template vs real data"""
-    if not os.path.exists("reproducibility/reproducibility.json"):
+    snapshot = snapshot or StudySnapshot()
+    if not snapshot.exists("reproducibility/reproducibility.json"):
         return 0
     
     try:
-        with open("reproducibility/reproducibility.json", 'r') as f:
-            data = json.load(f)
+        data = snapshot.load_json("reproducibility/reproducibility.json")
         
         materials = data.get("materials", [])
         
@@ -718,6 +702,20 @@ def check_reproducibility_current():
     except:
         return 0
 
+# Component checks in report order
+CURRENT_CHECKS = {
+    "Study Metadata": check_metadata_current,
+    "Participant Info": check_participants_current,
+    "Equipment": check_equipment_current,
+    "Stimuli": check_stimuli_current,
+    "AOIs": check_aois_current,
+    "Data Quality": check_data_quality_current,
+    "Preprocessing": check_preprocessing_current,
+    "Analysis": check_analysis_current,
+    "Validity": check_threats_current,
+    "Reproducibility": check_reproducibility_current
+}
+
 def generate_spider_graph_markdown(png_path):
     """Generate markdown for spider graph embedding"""
     return f"![Reproducibility Spider Graph]({png_path})"
@@ -768,12 +766,12 @@ def generate_scores_table_markdown(scores, overall_score):
 def update_readme_with_assessment():
     """Main function to update README with current assessment"""
     try:
-        # Get current scores and generate PNG
-        scores, png_path = get_actual_scores_and_generate_png()
-        
-        # Generate assessment
+        # One assessment (and snapshot) shared by scores, PNG and compliance
         assessment = TemplateAssessment()
         
+        # Get current scores and generate PNG
+        scores, png_path = get_actual_scores_and_generate_png(assessment)
+        
         # Calculate compliance based on scores > 0.8 threshold
         all_scores = assessment.get_all_scores()
         compliant_criteria = sum(1 for score in all_scores.values() if score > 0.8)
@@ -851,5 +849,19 @@ def update_readme_with_assessment():
         import traceback
         traceback.print_exc()
 
+def assess_study(path):
+    """Scores and compliance of a study directory or archive, without touching README.md"""
+    with open_study(path) as snapshot:
+        assessment = TemplateAssessment(path, snapshot)
+        return {
+            "scores": assessment.get_all_scores(),
+            "compliance": assessment.analyze_template_compliance(),
+        }
+
 if __name__ == "__main__":
-    update_readme_with_assessment()
\ No newline at end of file
+    import sys
+    if len(sys.argv) > 1:
+        # Assess another study (directory, .zip or .tar archive) and print the result
+        print(json.dumps(assess_study(sys.argv[1]), indent=2, ensure_ascii=False))
+    else:
+        update_readme_with_assessment()
\ No newline at end of file
@@ -1,60 +1,349 @@
 import os
+import sys
 import json
-import requests
-from jsonschema import validate, RefResolver, ValidationError
+import time
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from json_stream import read_schema_ref, validate_stream
+from schema_registry import DEFAULT_CACHE_DIR, REPO_SCHEMA_DIR, SchemaRegistry
+
+# Directories never searched for JSON files
+SKIP_DIRS = {"node_modules", "__pycache__", "outputs", "venv", "site-packages"}
+REPORT_PATH = os.path.join("outputs", "validation_report.json")
+MANIFEST_PATH = os.path.join("outputs", "validation_manifest.json")
+MANIFEST_VERSION = 1
+# Below this many files, validating in-process beats starting a pool
+MIN_PARALLEL_FILES = 64
+SHARD_SIZE = 32
+MAX_ERRORS_PER_FILE = 50
+# Files at least this large are validated item by item instead of loaded whole
+STREAM_THRESHOLD = 64 * 1024 * 1024
 
 def find_json_files(root_dir):
-    for dirpath, _, filenames in os.walk(root_dir):
-        for filename in filenames:
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d not in SKIP_DIRS)
+        for filename in sorted(filenames):
             if filename.endswith('.json'):
                 yield os.path.join(dirpath, filename)
 
-def load_schema(schema_path):
-    if schema_path.startswith('http'):
-        response = requests.get(schema_path)
-        response.raise_for_status()
-        return response.json()
-    else:
-        # Local schema file
-        if not os.path.isabs(schema_path):
-            # Resolve relative path from the JSON file's directory
-            json_dir = os.path.dirname(json_path) if 'json_path' in locals() else "."
-            schema_path = os.path.join(json_dir, schema_path)
-        with open(schema_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-
-def main():
-    root = "ReplET"
-    all_valid = True
-    for json_path in find_json_files(root):
+_default_registry = None
+
+def default_registry():
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = SchemaRegistry()
+    return _default_registry
+
+def load_schema(schema_ref, json_path=None, registry=None):
+    """Schema named by a `$schema` value; relative references resolve from ``json_path``'s directory"""
+    registry = registry or default_registry()
+    return registry.get(registry.locate(schema_ref, json_path))
+
+def schema_location(json_path, schema_url, registry=None):
+    """Canonical URI of the schema a JSON file names"""
+    return (registry or default_registry()).locate(schema_url, json_path)
+
+class ValidatorCache:
+    """Compiled validators, one per distinct schema location.
+
+    Each schema is read from the registry, checked and compiled once; every
+    file using it reuses the compiled validator.
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry or default_registry()
+        self._validators = {}
+        self._errors = {}
+        self.compiled = 0
+
+    def get(self, location):
+        if location in self._errors:
+            raise self._errors[location]
+        if location not in self._validators:
+            try:
+                self._validators[location] = self.registry.validator(location)
+                self.compiled += 1
+            except Exception as e:
+                self._errors[location] = e
+                raise
+        return self._validators[location]
+
+def _error_path(error):
+    return "$" + "".join(f"[{p}]" if isinstance(p, int) else f".{p}" for p in error.absolute_path)
+
+def validate_file(json_path, cache, stream_threshold=STREAM_THRESHOLD):
+    """Validation result for one file: status ok, invalid, error or skipped.
+
+    Results of files naming a schema carry its location ("schema") and the
+    `$schema` value as written ("schema_ref"). Files of ``stream_threshold``
+    bytes or more are streamed (see json_stream.validate_stream); their
+    errors also carry a byte "offset".
+    """
+    try:
+        if os.path.getsize(json_path) >= stream_threshold:
+            return _validate_streaming(json_path, cache)
+    except OSError:
+        pass
+    result = {"file": json_path, "schema": None, "status": "ok", "errors": []}
+    try:
         with open(json_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-        schema_url = data.get('$schema')
-        if not schema_url:
-            print(f"[WARN] {json_path} não possui campo $schema.")
+    except Exception as e:
+        result.update(status="error", errors=[{"path": "$", "message": f"{type(e).__name__}: {e}"}])
+        return result
+    schema_url = data.get('$schema') if isinstance(data, dict) else None
+    if not schema_url:
+        result["status"] = "skipped"
+        return result
+    result["schema_ref"] = schema_url
+    result["schema"] = location = schema_location(json_path, schema_url, cache.registry)
+    try:
+        validator = cache.get(location)
+    except Exception as e:
+        result.update(status="error", errors=[{"path": "$", "message": f"schema {location}: {e}"}])
+        return result
+    errors = sorted(validator.iter_errors(data), key=lambda e: list(map(str, e.absolute_path)))
+    if errors:
+        result["status"] = "invalid"
+        result["errors"] = [{"path": _error_path(e), "message": e.message} for e in errors[:MAX_ERRORS_PER_FILE]]
+    return result
+
+def _validate_streaming(json_path, cache):
+    result = {"file": json_path, "schema": None, "status": "ok", "errors": [], "streamed": True}
+    try:
+        # `$schema` may follow the large arrays, so it is located in a first pass
+        with open(json_path, 'rb') as f:
+            schema_url = read_schema_ref(f)
+    except Exception as e:
+        result.update(status="error", errors=[{"path": "$", "message": f"{type(e).__name__}: {e}",
+                                               "offset": getattr(e, "offset", 0)}])
+        return result
+    if not schema_url:
+        result["status"] = "skipped"
+        return result
+    result["schema_ref"] = schema_url
+    result["schema"] = location = schema_location(json_path, schema_url, cache.registry)
+    try:
+        validator = cache.get(location)
+    except Exception as e:
+        result.update(status="error", errors=[{"path": "$", "message": f"schema {location}: {e}"}])
+        return result
+    try:
+        with open(json_path, 'rb') as f:
+            errors = validate_stream(f, validator, MAX_ERRORS_PER_FILE)
+    except Exception as e:
+        result.update(status="error", errors=[{"path": "$", "message": f"{type(e).__name__}: {e}",
+                                               "offset": getattr(e, "offset", 0)}])
+        return result
+    if errors:
+        result.update(status="invalid", errors=errors)
+    return result
+
+# Per-process cache, so a pool worker compiles each schema once across its shards
+_process_cache = None
+
+def _validate_shard(paths, registry_config, stream_threshold=STREAM_THRESHOLD):
+    global _process_cache
+    if _process_cache is None:
+        _process_cache = ValidatorCache(SchemaRegistry(**registry_config))
+    compiled_before = _process_cache.compiled
+    results = [validate_file(path, _process_cache, stream_threshold) for path in paths]
+    return results, _process_cache.compiled - compiled_before
+
+def validate_files(paths, workers=None, shard_size=SHARD_SIZE, registry_config=None,
+                   stream_threshold=STREAM_THRESHOLD):
+    """Validate ``paths``, sharding across a process pool for large sets.
+
+    ``registry_config`` holds SchemaRegistry arguments (schema_dirs,
+    cache_dir, offline). Returns (results sorted by file, number of schema
+    compilations).
+    """
+    paths = list(paths)
+    registry_config = registry_config or {}
+    if workers == 1 or len(paths) < MIN_PARALLEL_FILES:
+        cache = ValidatorCache(SchemaRegistry(**registry_config) if registry_config else None)
+        return [validate_file(path, cache, stream_threshold) for path in paths], cache.compiled
+    # Contiguous shards keep files of one directory (and usually one schema) together
+    shards = [paths[i:i + shard_size] for i in range(0, len(paths), shard_size)]
+    results, compiled = [], 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(_validate_shard, shard, registry_config, stream_threshold) for shard in shards]):
+            shard_results, shard_compiled = future.result()
+            results.extend(shard_results)
+            compiled += shard_compiled
+    return sorted(results, key=lambda r: r["file"]), compiled
+
+# -------------------- Incremental manifest --------------------
+#
+# outputs/validation_manifest.json maps each file to the result of its last
+# validation, keyed by the file's content hash and by the hash of its schema
+# together with every schema that schema references. A file is revalidated
+# only when either changed; as in score_cache.py, (mtime, size) decide
+# whether the file needs rehashing at all.
+
+def _validator_version():
+    from importlib.metadata import version
+    return version("jsonschema")
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("jsonschema") != _validator_version():
+        return {}
+    return manifest.get("files", {})
+
+def save_manifest(entries, path=MANIFEST_PATH):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    manifest = {"version": MANIFEST_VERSION, "jsonschema": _validator_version(), "files": entries}
+    fd, tmp_path = tempfile.mkstemp(prefix=".validation_manifest-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _file_stamp(path, previous):
+    """(mtime, size, sha256) of a file, reusing ``previous``'s hash when mtime and size match."""
+    stat = os.stat(path)
+    stamp = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    if previous and all(previous.get(k) == v for k, v in stamp.items()) and "sha256" in previous:
+        stamp["sha256"] = previous["sha256"]
+    else:
+        from preprocessing_checkpoints import hash_file
+        stamp["sha256"] = hash_file(path)
+    return stamp
+
+def _schema_key(entry, path, registry):
+    """(location, transitive hash) of the schema a manifest entry's file names."""
+    if not entry.get("schema_ref"):
+        return None, None
+    location = schema_location(path, entry["schema_ref"], registry)
+    return location, registry.schema_hash(location)
+
+def validate_incremental(paths, manifest_path=MANIFEST_PATH, workers=None, registry_config=None,
+                         stream_threshold=STREAM_THRESHOLD, force=False):
+    """Like validate_files, but reusing manifest results for unchanged files and schemas.
+
+    ``force`` revalidates every file (the manifest is still updated).
+    Returns (results sorted by file, schema compilations, files reused).
+    """
+    paths = list(paths)
+    registry = SchemaRegistry(**registry_config) if registry_config else default_registry()
+    previous = load_manifest(manifest_path)
+    entries, reused, pending = {}, [], []
+    for path in paths:
+        key = os.path.abspath(path)
+        entry = None if force else previous.get(key)
+        try:
+            stamp = _file_stamp(path, entry)
+        except OSError:
+            pending.append(path)
+            continue
+        if entry and entry["sha256"] == stamp["sha256"]:
+            try:
+                current = _schema_key(entry, path, registry)
+            except Exception:
+                current = None
+            if current == (entry.get("schema"), entry.get("schema_hash")):
+                entries[key] = dict(entry, **stamp)
+                reused.append(dict(entry["result"], file=path))
+                continue
+        entries[key] = dict(stamp)
+        pending.append(path)
+
+    results, compiled = validate_files(pending, workers, registry_config=registry_config,
+                                       stream_threshold=stream_threshold)
+    for result in results:
+        key = os.path.abspath(result["file"])
+        # Unreadable files and schemas may be transient (network, permissions): never reuse them
+        if key not in entries or result["status"] == "error":
+            entries.pop(key, None)
             continue
+        entry = entries[key]
         try:
-            # Resolve schema path relative to JSON file
-            if not schema_url.startswith('http'):
-                json_dir = os.path.dirname(json_path)
-                schema_path = os.path.join(json_dir, schema_url)
-            else:
-                schema_path = schema_url
-            
-            schema = load_schema(schema_path)
-            resolver = RefResolver(base_uri=schema_url, referrer=schema)
-            validate(instance=data, schema=schema, resolver=resolver)
-            print(f"[OK] {json_path} válido.")
-        except ValidationError as e:
-            print(f"[ERRO] {json_path} inválido: {e.message}")
-            all_valid = False
-        except Exception as e:
-            print(f"[ERRO] {json_path} erro ao validar: {e}")
-            all_valid = False
-    if all_valid:
-        print("Todos os arquivos JSON são válidos!")
-    else:
+            entry["schema_ref"] = result.get("schema_ref")
+            entry["schema"], entry["schema_hash"] = _schema_key(entry, result["file"], registry)
+        except Exception:
+            entries.pop(key)
+            continue
+        entry["result"] = {k: v for k, v in result.items() if k != "file"}
+
+    # Entries of files outside this run (other roots) are kept while the files exist
+    in_run = {os.path.abspath(path) for path in paths}
+    for key, entry in previous.items():
+        if key not in in_run and os.path.exists(key):
+            entries[key] = entry
+    save_manifest(entries, manifest_path)
+    return sorted(reused + results, key=lambda r: r["file"]), compiled, len(reused)
+
+def build_report(results, compiled, elapsed, reused=0):
+    counts = {status: sum(r["status"] == status for r in results) for status in ("ok", "invalid", "error", "skipped")}
+    return {
+        "summary": dict(files=len(results), schemas_compiled=compiled, elapsed_s=round(elapsed, 4),
+                        reused=reused, revalidated=len(results) - reused, **counts),
+        "results": results,
+    }
+
+def write_report(report, path=REPORT_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate JSON files against the schemas named in their $schema")
+    parser.add_argument("roots", nargs="*", default=["."], help="Directories to search (default: current)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (1 validates in-process)")
+    parser.add_argument("--report", default=REPORT_PATH, help="Machine-readable JSON report path")
+    parser.add_argument("--offline", action="store_true", help="Never fetch remote schemas; use the cache only")
+    parser.add_argument("--schema-cache", default=DEFAULT_CACHE_DIR, help="Directory caching remote schemas")
+    parser.add_argument("--manifest", default=MANIFEST_PATH, help="Manifest of previous results to reuse")
+    parser.add_argument("--force", action="store_true", help="Revalidate every file, ignoring the manifest")
+    parser.add_argument("--stream-threshold", type=float, default=STREAM_THRESHOLD / 2**20,
+                        help="Stream files of at least this many MB item by item (default: 64)")
+    args = parser.parse_args(argv)
+
+    # Each root's own schemas/ directory takes precedence over the repository's
+    schema_dirs = [os.path.join(root, "schemas") for root in args.roots] + [REPO_SCHEMA_DIR]
+    registry_config = {"schema_dirs": schema_dirs, "cache_dir": args.schema_cache}
+    if args.offline:
+        registry_config["offline"] = True
+
+    start = time.perf_counter()
+    paths = [path for root in args.roots for path in find_json_files(root)]
+    results, compiled, reused = validate_incremental(paths, args.manifest, args.workers, registry_config,
+                                                     int(args.stream_threshold * 2**20), args.force)
+    report = build_report(results, compiled, time.perf_counter() - start, reused)
+    write_report(report, args.report)
+
+    for result in results:
+        if result["status"] == "ok":
+            print(f"[OK] {result['file']} válido.")
+        elif result["status"] == "skipped":
+            print(f"[WARN] {result['file']} não possui campo $schema.")
+        else:
+            label = "inválido" if result["status"] == "invalid" else "erro ao validar"
+            for error in result["errors"]:
+                where = f" (byte {error['offset']})" if "offset" in error else ""
+                print(f"[ERRO] {result['file']} {label}: {error['path']}{where}: {error['message']}")
+    summary = report["summary"]
+    print(f"{summary['files']} arquivo(s): {summary['reused']} reaproveitado(s), "
+          f"{summary['revalidated']} revalidado(s); {summary['schemas_compiled']} schema(s) compilado(s) "
+          f"em {summary['elapsed_s']:.2f}s. Relatório: {args.report}")
+    if summary["invalid"] or summary["error"]:
         print("Alguns arquivos JSON não passaram na validação.")
+        return 1
+    print("Todos os arquivos JSON são válidos!")
+    return 0
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())